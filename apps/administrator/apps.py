@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AdministratorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.administrator'
+
+    def ready(self):
+        from . import refcache
+        from school_api import conditional
+        refcache.connect()
+        conditional.connect()
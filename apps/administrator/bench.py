@@ -0,0 +1,144 @@
+"""Utilidades comunes para los comandos bench_*."""
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import requests
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+
+SERVERS = ('gunicorn', 'uvicorn')
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rollback():
+    """Ejecuta el bloque dentro de una transacción que siempre se revierte,
+    así un benchmark puede crear sus datos sin dejar rastro en la base."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+class QueryCounter:
+    """Cuenta las consultas ejecutadas sin guardar el SQL (sin límite de 9000)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(fn, repeat=3):
+    """Ejecuta fn `repeat` veces; devuelve (mejor tiempo en segundos, consultas)."""
+    best = None
+    for _ in range(repeat):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, counter.count
+
+
+def percentile(values, fraction):
+    """Valor en la fracción dada (0.99 = p99) de una lista no vacía."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def report(stdout, title, rows, count=None):
+    """Imprime una tabla con (nombre, segundos, consultas) por fila."""
+    stdout.write(title)
+    stdout.write(f"{'ruta':<28}{'segundos':>12}{'consultas':>12}" + (f"{'filas/s':>14}" if count else ''))
+    for name, seconds, queries in rows:
+        line = f'{name:<28}{seconds:>12.4f}{queries:>12}'
+        if count:
+            line += f'{count / seconds if seconds else 0:>14.0f}'
+        stdout.write(line)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f'El servidor terminó al iniciar (código {process.returncode}).')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError(f'El servidor no respondió en el puerto {port}.')
+
+
+def server_command(server, port, workers=2, threads=1):
+    if server == 'gunicorn':
+        return [
+            sys.executable, '-m', 'gunicorn', 'school_api.wsgi:application', '--bind', f'127.0.0.1:{port}',
+            '--workers', str(workers), '--threads', str(threads), '--log-level', 'warning',
+        ]
+    return [
+        sys.executable, '-m', 'uvicorn', 'school_api.asgi:application', '--host', '127.0.0.1',
+        '--port', str(port), '--workers', str(workers), '--log-level', 'warning',
+    ]
+
+
+@contextmanager
+def serve(server, workers=2, threads=1):
+    """Levanta gunicorn (WSGI) o uvicorn (ASGI) con la configuración de producción
+    sobre la misma base y devuelve su URL; el proceso se detiene al salir."""
+    port = free_port()
+    env = dict(os.environ, RENDER='1', RENDER_EXTERNAL_HOSTNAME='127.0.0.1')
+    process = subprocess.Popen(server_command(server, port, workers, threads), env=env, cwd=settings.BASE_DIR)
+    try:
+        _wait(port, process)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def http_fetch(base_url):
+    """fetch(ruta, authorization) -> código de estado, con una sesión
+    (conexión keep-alive) por hilo cliente; lee el cuerpo completo."""
+    local = threading.local()
+
+    def fetch(path, authorization):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session.get(base_url + path, headers={'Authorization': authorization}).status_code
+    return fetch
+
+
+def drive(fetch, items, concurrency):
+    """Ejecuta fetch(*item) para cada item con `concurrency` hilos; devuelve
+    ([(segundos, estado)], segundos de reloj de toda la carga)."""
+    def timed(item):
+        start = time.perf_counter()
+        status = fetch(*item)
+        return time.perf_counter() - start, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(timed, items))
+    return results, time.perf_counter() - started
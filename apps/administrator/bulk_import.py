@@ -0,0 +1,318 @@
+"""Importación masiva de tutores, alumnos y profesores desde CSV o NDJSON.
+
+La entrada se lee como flujo, se valida por bloques con una consulta por
+restricción y bloque (usuarios, correos, nombres, referencias) y las filas
+válidas se insertan con bulk_create. Las filas con error no detienen la
+importación: se devuelven en el reporte con su número de fila.
+"""
+import codecs
+import csv
+import json
+from datetime import date
+from itertools import islice
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User, Group
+from django.db import transaction, IntegrityError
+from django.db.models.functions import Lower
+from apps.administrator.namesGroup import ROLE_NAMES, STUDENT, TEACHER, TUTOR
+from apps.student.models import Student
+from apps.teacher.models import Teacher, Speciality
+from apps.tutor.models import Tutor
+
+FORMATS = ('csv', 'ndjson')
+DEFAULT_CHUNK_SIZE = 1000
+
+REQUIRED = 'Este campo es requerido.'
+REPEATED = 'Valor repetido en el archivo.'
+
+
+class BulkImportError(Exception):
+    """Error que impide procesar el archivo completo."""
+
+
+def detect_format(filename, file_format=None):
+    if file_format:
+        file_format = file_format.lower()
+    elif filename and filename.lower().endswith('.csv'):
+        file_format = 'csv'
+    elif filename and filename.lower().endswith(('.ndjson', '.jsonl')):
+        file_format = 'ndjson'
+
+    if file_format not in FORMATS:
+        raise BulkImportError(f'Formato no soportado, use uno de: {", ".join(FORMATS)}')
+    return file_format
+
+
+def iter_rows(stream, file_format):
+    """Genera (número de fila, datos, error) leyendo el flujo de bytes línea a línea."""
+    lines = codecs.iterdecode(stream, 'utf-8-sig')
+
+    if file_format == 'csv':
+        for number, row in enumerate(csv.DictReader(lines), start=1):
+            yield number, row, None
+        return
+
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, f'JSON inválido: {e}'
+            continue
+        if not isinstance(row, dict):
+            yield number, None, 'Cada línea debe ser un objeto JSON.'
+            continue
+        yield number, row, None
+
+
+def role_group(role):
+    """Grupo existente cuyo nombre es alias del rol (una sola consulta)."""
+    for group in Group.objects.order_by('id'):
+        if group.name.casefold() in ROLE_NAMES[role]:
+            return group
+    raise BulkImportError(f'No existe un grupo para el rol {role}.')
+
+
+class BulkImporter:
+    model = None
+    role = None
+    # campo -> (requerido, longitud máxima)
+    fields = {}
+    duplicate_name = 'Nombre existente.'
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.group = role_group(self.role)
+        # valores de bloques ya guardados; `pending` los del bloque en curso
+        self.seen = {'username': set(), 'email': set(), 'name': set()}
+        self.pending = {field: set() for field in self.seen}
+        self.report = {'created': 0, 'failed': 0, 'errors': []}
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return self.report
+            self.import_chunk(chunk)
+
+    def import_chunk(self, chunk):
+        candidates = []
+        for number, row, error in chunk:
+            if error:
+                self.fail(number, {'row': error})
+                continue
+            data, errors = self.clean(row)
+            if errors:
+                self.fail(number, errors)
+            else:
+                candidates.append((number, data))
+        if not candidates:
+            return
+
+        taken = self.taken(candidates)
+        self.pending = {field: set() for field in self.seen}
+        valid = []
+        for number, data in candidates:
+            errors = self.check(data, taken)
+            if errors:
+                self.fail(number, errors)
+            else:
+                valid.append((number, data))
+
+        if valid:
+            try:
+                with transaction.atomic():
+                    self.create([data for _, data in valid])
+            except IntegrityError as e:
+                for number, _ in valid:
+                    self.fail(number, {'error': 'Error de integridad: ' + str(e)})
+                return
+            for field, values in self.pending.items():
+                self.seen[field] |= values
+            self.report['created'] += len(valid)
+
+    def fail(self, number, errors):
+        self.report['failed'] += 1
+        self.report['errors'].append({'row': number, 'errors': errors})
+
+    def clean(self, row):
+        data, errors = {}, {}
+        for name, (required, max_length) in self.fields.items():
+            value = row.get(name)
+            value = '' if value is None else str(value).strip()
+            if not value:
+                if required:
+                    errors[name] = REQUIRED
+                continue
+            if max_length and len(value) > max_length:
+                errors[name] = f'Máximo {max_length} caracteres.'
+                continue
+            data[name] = value
+        return data, errors
+
+    def taken(self, candidates):
+        """Valores ya usados en la base para todo el bloque, una consulta por restricción."""
+        usernames = {data['username'] for _, data in candidates}
+        emails = {data['email'] for _, data in candidates}
+        names = {data['name'].lower() for _, data in candidates}
+        return {
+            'username': set(User.objects.filter(username__in=usernames).values_list('username', flat=True)),
+            'email': set(User.objects.filter(email__in=emails).values_list('email', flat=True)),
+            'name': {
+                name.lower() for name in
+                self.model.objects.annotate(name_lower=Lower('name'))
+                .filter(name_lower__in=names).values_list('name', flat=True)
+            },
+        }
+
+    def check(self, data, taken):
+        errors = {}
+        keys = {'username': data['username'], 'email': data['email'], 'name': data['name'].lower()}
+        messages = {
+            'username': 'Este nombre de usuario ya está en uso.',
+            'email': 'Este correo ya está en uso.',
+            'name': self.duplicate_name.format(name=data['name']),
+        }
+        for field, value in keys.items():
+            if value in self.seen[field] or value in self.pending[field]:
+                errors[field] = REPEATED
+            elif value in taken[field]:
+                errors[field] = messages[field]
+        if not errors:
+            for field, value in keys.items():
+                self.pending[field].add(value)
+        return errors
+
+    def create(self, rows):
+        # sin contraseña se crea inutilizable; el usuario la define con getcode/.
+        # Un hash con su propia sal por fila; el texto plano se descarta al hashear
+        users = User.objects.bulk_create([
+            User(
+                username=data['username'], email=data['email'],
+                first_name=data.get('first_name', ''), last_name=data.get('last_name', ''),
+                password=make_password(data.pop('password', None))
+            ) for data in rows
+        ])
+        User.groups.through.objects.bulk_create([
+            User.groups.through(user_id=user.id, group_id=self.group.id) for user in users
+        ])
+        return self.model.objects.bulk_create([
+            self.build(user, data) for user, data in zip(users, rows)
+        ])
+
+    def build(self, user, data):
+        raise NotImplementedError
+
+
+USER_FIELDS = {
+    'username': (True, 150),
+    'email': (True, 254),
+    'password': (False, None),
+    'first_name': (False, 150),
+    'last_name': (False, 150),
+}
+
+
+class TutorImporter(BulkImporter):
+    model = Tutor
+    role = TUTOR
+    fields = {**USER_FIELDS, 'name': (True, 255), 'phone': (True, 11), 'address': (True, 255)}
+    duplicate_name = "tutor '{name}' ya existente"
+
+    def build(self, user, data):
+        return Tutor(user=user, name=data['name'], phone=data['phone'], address=data['address'])
+
+
+class StudentImporter(BulkImporter):
+    model = Student
+    role = STUDENT
+    fields = {
+        **USER_FIELDS, 'name': (True, 255), 'phone': (True, 11), 'birthdate': (True, None),
+        'address': (True, 255), 'emergency_contact': (True, 15), 'tutor_username': (True, 150),
+    }
+    duplicate_name = 'alumno existente'
+
+    def clean(self, row):
+        data, errors = super().clean(row)
+        if 'birthdate' in data:
+            try:
+                data['birthdate'] = date.fromisoformat(data['birthdate'])
+            except ValueError:
+                errors['birthdate'] = 'Fecha inválida, use AAAA-MM-DD.'
+        return data, errors
+
+    def taken(self, candidates):
+        taken = super().taken(candidates)
+        usernames = {data['tutor_username'] for _, data in candidates}
+        self.tutors = dict(
+            Tutor.objects.filter(user__username__in=usernames).values_list('user__username', 'id')
+        )
+        return taken
+
+    def check(self, data, taken):
+        if data['tutor_username'] not in self.tutors:
+            return {'tutor_username': f"No existe un tutor con el usuario {data['tutor_username']}."}
+        return super().check(data, taken)
+
+    def build(self, user, data):
+        return Student(
+            user=user, name=data['name'], phone=data['phone'], birthdate=data['birthdate'],
+            address=data['address'], emergency_contact=data['emergency_contact'],
+            tutor_id=self.tutors[data['tutor_username']]
+        )
+
+
+class TeacherImporter(BulkImporter):
+    model = Teacher
+    role = TEACHER
+    # especialidades por nombre separadas con '|'
+    fields = {**USER_FIELDS, 'name': (True, 255), 'phone': (True, 11), 'specialities': (True, None)}
+    duplicate_name = 'profesor {name} ya existente'
+
+    def clean(self, row):
+        data, errors = super().clean(row)
+        if 'specialities' in data:
+            data['specialities'] = [name.strip() for name in data['specialities'].split('|') if name.strip()]
+        return data, errors
+
+    def taken(self, candidates):
+        taken = super().taken(candidates)
+        names = {name for _, data in candidates for name in data['specialities']}
+        self.specialities = dict(Speciality.objects.filter(name__in=names).values_list('name', 'id'))
+        return taken
+
+    def check(self, data, taken):
+        missing = [name for name in data['specialities'] if name not in self.specialities]
+        if missing:
+            return {'specialities': f"La especialidad {', '.join(missing)} no existe."}
+        return super().check(data, taken)
+
+    def create(self, rows):
+        teachers = super().create(rows)
+        Teacher.speciality.through.objects.bulk_create([
+            Teacher.speciality.through(teacher_id=teacher.id, speciality_id=self.specialities[name])
+            for teacher, data in zip(teachers, rows) for name in set(data['specialities'])
+        ])
+        return teachers
+
+    def build(self, user, data):
+        return Teacher(user=user, name=data['name'], phone=data['phone'])
+
+
+IMPORTERS = {
+    'tutors': TutorImporter,
+    'students': StudentImporter,
+    'teachers': TeacherImporter,
+}
+
+
+def import_stream(kind, stream, file_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Importa el flujo completo y devuelve el reporte {created, failed, errors}."""
+    if kind not in IMPORTERS:
+        raise BulkImportError(f'Tipo no soportado, use uno de: {", ".join(IMPORTERS)}')
+    importer = IMPORTERS[kind](chunk_size=chunk_size)
+    return importer.run(iter_rows(stream, file_format))
@@ -0,0 +1,224 @@
+"""Exportación en flujo (CSV o NDJSON) de notas, matrículas y alumnos.
+
+Las filas salen de values_list() con los joins hechos en SQL y se leen con
+iterator(chunk_size=...), por lo que la memoria usada no depende del tamaño
+de la exportación. Los filtros (grado, sección, curso y rango de fechas) se
+aplican en la consulta. Las columnas sin ruta (grado y sección de las notas)
+se completan con una consulta por bloque.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from itertools import islice
+from django.db.models import Exists, OuterRef, Subquery
+from apps.course.models import TeacherCourseAssignment
+from apps.note.models import Note
+from apps.note.serializers import resolve_pairs
+from apps.registration.models import CourseRegistration
+from apps.student.models import Student
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+CHUNK_SIZE = 2000
+# filas por escritura en la respuesta
+FLUSH_ROWS = 500
+
+
+class ExportError(Exception):
+    pass
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, time):
+        return value.strftime('%H:%M')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _int(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ExportError(f'{name} debe ser un número entero.')
+
+
+def _date(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f'{name} debe tener formato AAAA-MM-DD.')
+
+
+def parse_filters(params):
+    return {
+        'grade': _int(params, 'grade'),
+        'section': _int(params, 'section'),
+        'course': _int(params, 'course'),
+        'date_from': _date(params, 'date_from'),
+        'date_to': _date(params, 'date_to'),
+    }
+
+
+def _date_range(queryset, field, filters):
+    if filters['date_from']:
+        queryset = queryset.filter(**{f'{field}__date__gte': filters['date_from']})
+    if filters['date_to']:
+        queryset = queryset.filter(**{f'{field}__date__lte': filters['date_to']})
+    return queryset
+
+
+def _grade_sections(chunk):
+    # mismo grado/sección que NoteSerializers: primera asignación del profesor en el curso
+    resolved = resolve_pairs({(row.teacher_id, row.course_id) for row in chunk})
+    return [dict(zip(('grade', 'section'), resolved[(row.teacher_id, row.course_id)])) for row in chunk]
+
+
+def notes_export(filters):
+    queryset = Note.objects.all()
+    if filters['grade'] or filters['section']:
+        # solo al filtrar: una subconsulta con la primera asignación del par
+        first = TeacherCourseAssignment.objects.filter(
+            teacher=OuterRef('teacher'), course=OuterRef('course')
+        ).order_by('id').values('id')[:1]
+        matching = TeacherCourseAssignment.objects.all()
+        if filters['grade']:
+            matching = matching.filter(grade_id=filters['grade'])
+        if filters['section']:
+            matching = matching.filter(section_id=filters['section'])
+        queryset = queryset.alias(assignment_ref=Subquery(first)).filter(assignment_ref__in=matching.values('id'))
+    if filters['course']:
+        queryset = queryset.filter(course_id=filters['course'])
+    queryset = _date_range(queryset, 'creation_date', filters)
+
+    columns = [
+        ('id', 'id'), ('student_id', 'student_id'), ('student', 'student__name'),
+        ('course_id', 'course_id'), ('course', 'course__name'),
+        ('teacher_id', 'teacher_id'), ('teacher', 'teacher__name'),
+        ('grade', None), ('section', None),
+        ('note', 'note'), ('status_note', 'status_note'),
+        ('creation_date', 'creation_date'), ('update_date', 'update_date'),
+    ]
+    return columns, queryset, _grade_sections
+
+
+def registrations_export(filters):
+    # una fila por matrícula y asignación (LEFT JOIN: matrículas sin cursos salen con vacíos)
+    queryset = CourseRegistration.objects.all()
+    if filters['grade']:
+        queryset = queryset.filter(grade_id=filters['grade'])
+    if filters['section']:
+        queryset = queryset.filter(section_id=filters['section'])
+    if filters['course']:
+        queryset = queryset.filter(teacher_course_assignment__course_id=filters['course'])
+    queryset = _date_range(queryset, 'create_date', filters)
+
+    columns = [
+        ('id', 'id'), ('student_id', 'student_id'), ('student', 'student__name'),
+        ('grade', 'grade__name'), ('section', 'section__name'),
+        ('assignment_id', 'teacher_course_assignment__id'),
+        ('course', 'teacher_course_assignment__course__name'),
+        ('teacher', 'teacher_course_assignment__teacher__name'),
+        ('start_time', 'teacher_course_assignment__schedule__start_time'),
+        ('end_time', 'teacher_course_assignment__schedule__end_time'),
+        ('create_date', 'create_date'), ('update_date', 'update_date'),
+    ]
+    return columns, queryset, None
+
+
+def students_export(filters):
+    queryset = Student.objects.all()
+    registrations = CourseRegistration.objects.filter(student=OuterRef('pk'))
+    if filters['grade']:
+        registrations = registrations.filter(grade_id=filters['grade'])
+    if filters['section']:
+        registrations = registrations.filter(section_id=filters['section'])
+    if filters['course']:
+        registrations = registrations.filter(teacher_course_assignment__course_id=filters['course'])
+    if filters['grade'] or filters['section'] or filters['course']:
+        queryset = queryset.filter(Exists(registrations))
+    if filters['date_from']:
+        queryset = queryset.filter(creation_date__gte=filters['date_from'])
+    if filters['date_to']:
+        queryset = queryset.filter(creation_date__lte=filters['date_to'])
+
+    columns = [
+        ('id', 'id'), ('name', 'name'), ('username', 'user__username'), ('email', 'user__email'),
+        ('phone', 'phone'), ('birthdate', 'birthdate'), ('address', 'address'),
+        ('emergency_contact', 'emergency_contact'), ('tutor', 'tutor__name'),
+        ('suspended_student', 'suspended_student'),
+        ('creation_date', 'creation_date'), ('update_date', 'update_date'),
+    ]
+    return columns, queryset, None
+
+
+EXPORTS = {
+    'notes': notes_export,
+    'registrations': registrations_export,
+    'students': students_export,
+}
+
+
+def _rows(columns, queryset, resolve=None):
+    """`resolve(bloque)` devuelve por fila los valores de las columnas sin ruta."""
+    paths = [path for _, path in columns if path]
+    rows = queryset.order_by('id').values_list(*paths, named=True).iterator(chunk_size=CHUNK_SIZE)
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            return
+        computed = resolve(chunk) if resolve else [{}] * len(chunk)
+        for row, extra in zip(chunk, computed):
+            yield [_value(getattr(row, path) if path else extra[name]) for name, path in columns]
+
+
+def stream_csv(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_ndjson(columns, rows):
+    names = [name for name, _ in columns]
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(names, row)), ensure_ascii=False))
+        if len(lines) == FLUSH_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def export_stream(kind, file_format, params):
+    """Devuelve (content_type, generador de texto) para la exportación pedida."""
+    if kind not in EXPORTS:
+        raise ExportError(f'Tipo no soportado, use uno de: {", ".join(EXPORTS)}')
+    if file_format not in FORMATS:
+        raise ExportError(f'Formato no soportado, use uno de: {", ".join(FORMATS)}')
+
+    columns, queryset, resolve = EXPORTS[kind](parse_filters(params))
+    rows = _rows(columns, queryset, resolve)
+    stream = stream_csv(columns, rows) if file_format == 'csv' else stream_ndjson(columns, rows)
+    return FORMATS[file_format], stream
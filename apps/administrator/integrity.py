@@ -0,0 +1,18 @@
+"""Reconocer qué restricción única violó un IntegrityError.
+
+PostgreSQL entrega el nombre de la restricción en `diag`; SQLite y MySQL lo
+incluyen en el mensaje (índice o clave), así que se buscan ambos.
+
+Los nombres de curso, grado, sección, alumno, profesor y tutor son únicos sin
+importar mayúsculas con una restricción `<tabla>_name_lower_uniq` sobre
+LOWER(name): la base rechaza el duplicado con un índice en lugar de una
+consulta name__iexact previa, y los serializers traducen la violación con
+`violates`.
+"""
+
+
+def violates(error, constraint):
+    diag = getattr(error.__cause__, 'diag', None)
+    if getattr(diag, 'constraint_name', None) == constraint:
+        return True
+    return constraint in str(error)
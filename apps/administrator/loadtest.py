@@ -0,0 +1,194 @@
+"""Recorrido de carga sobre todas las rutas de school_api/urls.py.
+
+Cada ruta con GET se pide `requests` veces contra un servidor real (el
+comando levanta gunicorn o uvicorn con bench.serve) con `concurrency` clientes
+a la vez y un JWT del rol que la vista exige: el primer rol de
+`allowed_roles` o, si la vista no declara roles, un administrador. Los
+parámetros de la ruta se llenan con datos existentes (el primer id del modelo
+de la vista) o con valores fijos de PARAMS. Se mide latencia (p50/p95/p99) y
+throughput (requests completadas por segundo de reloj); las consultas por
+request se cuentan aparte con una request en el mismo proceso.
+
+Las rutas sin GET (altas, importaciones, envío de códigos) y el admin de
+Django (usa sesión, no JWT) se listan como omitidas.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field, asdict
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import modify_settings
+from django.urls import URLResolver, get_resolver
+from apps.administrator import namesGroup
+from apps.administrator.bench import QueryCounter, drive, percentile
+from apps.authentication.roles import issue_tokens
+from apps.student.models import Student
+from apps.teacher.models import Teacher
+from apps.tutor.models import Tutor
+
+ADMIN_USERNAME = 'loadtest-admin'
+SKIP_PREFIXES = ('admin/',)
+# valores para parámetros que no son ids
+PARAMS = {'dimension': 'students', 'kind': 'students'}
+_PARAM = re.compile(r'<(?:\w+:)?(\w+)>|\(\?P<(\w+)>[^)]*\)')
+
+
+class LoadTestError(Exception):
+    pass
+
+
+@dataclass
+class Result:
+    path: str
+    route: str
+    role: str
+    requests: int
+    concurrency: int
+    seconds: float
+    status: dict
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    queries: float
+    latencies: list = field(default_factory=list, repr=False)
+
+    def as_dict(self):
+        data = asdict(self)
+        data.pop('latencies')
+        return data
+
+
+def iter_routes(resolver=None, prefix=''):
+    """(plantilla de la ruta, callback) de todas las rutas, recorriendo los include."""
+    for pattern in (resolver or get_resolver()).url_patterns:
+        text = str(pattern.pattern).lstrip('^').rstrip('$')
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern, prefix + text)
+        elif 'format' not in text:
+            # se omiten las rutas con sufijo (.json, .api) que agregan los routers
+            yield prefix + text, pattern.callback
+
+
+def view_class(callback):
+    return getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+
+
+def supports_get(callback):
+    actions = getattr(callback, 'actions', None)
+    if actions is not None:
+        return 'get' in actions
+    cls = view_class(callback)
+    return cls is None or hasattr(cls, 'get')
+
+
+def role_for(callback):
+    roles = getattr(view_class(callback), 'allowed_roles', None)
+    return roles[0] if roles else namesGroup.ADMIN
+
+
+def _model(callback):
+    queryset = getattr(view_class(callback), 'queryset', None)
+    return queryset.model if queryset is not None else None
+
+
+def fill(route, callback):
+    """Ruta con los parámetros reemplazados, o None si falta un valor."""
+    def value(match):
+        name = match.group(1) or match.group(2)
+        if name in PARAMS:
+            return PARAMS[name]
+        model = _model(callback)
+        pk = model.objects.order_by('pk').values_list('pk', flat=True).first() if model else None
+        if pk is None:
+            raise LoadTestError(f'sin datos para {name}')
+        return str(pk)
+
+    try:
+        return '/' + _PARAM.sub(value, route)
+    except LoadTestError:
+        return None
+
+
+def tokens():
+    """{rol: 'Bearer <access>'} con un usuario con datos para cada rol."""
+    admin, _ = User.objects.get_or_create(username=ADMIN_USERNAME, defaults={'is_staff': True})
+    profiles = {
+        namesGroup.STUDENT: Student.objects.filter(courseregistration__isnull=False),
+        namesGroup.TEACHER: Teacher.objects.filter(teachercourseassignment__isnull=False),
+        namesGroup.TUTOR: Tutor.objects.filter(student__isnull=False),
+    }
+    users = {namesGroup.ADMIN: admin}
+    for role, queryset in profiles.items():
+        profile = queryset.select_related('user').order_by('id').first()
+        if profile is None:
+            raise LoadTestError('No hay datos de prueba: ejecute seed_school primero.')
+        users[role] = profile.user
+    return {role: f'Bearer {issue_tokens(user, role).access_token}' for role, user in users.items()}
+
+
+def count_queries(client, path, authorization):
+    """Consultas de una request, en el mismo proceso."""
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        response = client.get(path, HTTP_AUTHORIZATION=authorization)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    return counter.count
+
+
+def run(fetch, requests=20, concurrency=8, only=None):
+    """(resultados, omitidas) de recorrer todas las rutas; `fetch(ruta, authorization)`
+    devuelve el código de estado (bench.http_fetch) y `only` filtra por prefijo."""
+    authorization = tokens()
+    client = Client()
+    results, skipped = [], []
+    # el cliente de pruebas usa el host testserver
+    with modify_settings(ALLOWED_HOSTS={'append': 'testserver'}):
+        for route, callback in iter_routes():
+            if route.startswith(SKIP_PREFIXES) or (only and not ('/' + route).startswith(only)):
+                continue
+            if not supports_get(callback):
+                skipped.append({'route': '/' + route, 'reason': 'sin GET'})
+                continue
+            path = fill(route, callback)
+            if path is None:
+                skipped.append({'route': '/' + route, 'reason': 'sin datos para los parámetros'})
+                continue
+
+            role = role_for(callback)
+            # calentamiento: cachés y consultas preparadas
+            fetch(path, authorization[role])
+            queries = count_queries(client, path, authorization[role])
+            timings, seconds = drive(fetch, [(path, authorization[role])] * requests, concurrency)
+            latencies = [latency for latency, _ in timings]
+            statuses = Counter(status for _, status in timings)
+            results.append(Result(
+                path=path, route='/' + route, role=role, requests=requests,
+                concurrency=concurrency, seconds=seconds,
+                status={str(code): count for code, count in sorted(statuses.items())},
+                rps=requests / seconds,
+                p50_ms=percentile(latencies, 0.5) * 1000,
+                p95_ms=percentile(latencies, 0.95) * 1000,
+                p99_ms=percentile(latencies, 0.99) * 1000,
+                queries=queries,
+                latencies=latencies,
+            ))
+    return results, skipped
+
+
+def totals(results):
+    latencies = [latency for result in results for latency in result.latencies]
+    if not latencies:
+        return {}
+    requests = sum(result.requests for result in results)
+    return {
+        'requests': requests,
+        # las rutas se cargan una tras otra: el tiempo total es la suma
+        'rps': requests / sum(result.seconds for result in results),
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'queries': sum(result.queries for result in results) / len(results),
+    }
@@ -0,0 +1,80 @@
+import random
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from apps.administrator import namesGroup
+from apps.administrator.bench import drive, http_fetch, percentile, serve
+from apps.administrator.seed import seed_school
+from apps.authentication.roles import issue_tokens
+
+PREFIX = 'bench-asgi'
+# (rol, ruta síncrona DRF, ruta async)
+ROUTES = [
+    (namesGroup.STUDENT, '/student/shownote/', '/student/async/notes/'),
+    (namesGroup.STUDENT, '/student/showcourse/', '/student/async/courses/'),
+    (namesGroup.TEACHER, '/teacher/courses/', '/teacher/async/courses/'),
+    (namesGroup.TUTOR, '/tutor/student/', '/tutor/async/students/'),
+    (namesGroup.TUTOR, '/tutor/notes/', '/tutor/async/notes/'),
+]
+KINDS = {namesGroup.STUDENT: 'student', namesGroup.TEACHER: 'teacher', namesGroup.TUTOR: 'tutor'}
+
+
+class Command(BaseCommand):
+    help = ('Compara throughput y latencia p50/p99 de las lecturas de alumno, profesor y tutor: '
+            'vistas DRF bajo gunicorn (WSGI) contra vistas async bajo uvicorn (ASGI), con los mismos datos.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200,
+                            help='tamaño del colegio de prueba (se crea una sola vez con el prefijo bench-asgi)')
+        parser.add_argument('--users', type=int, default=20, help='usuarios distintos por rol en la carga')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=64)
+        parser.add_argument('--workers', type=int, default=2, help='procesos por servidor')
+        parser.add_argument('--threads', type=int, default=1, help='hilos por worker de gunicorn')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.ensure_data(options['students'])
+        plan = self.plan(options)
+
+        self.stdout.write(f"{options['requests']} requests, concurrencia {options['concurrency']}, "
+                          f"{options['workers']} workers, base {settings.DATABASES['default']['ENGINE']}")
+        self.stdout.write(f"{'servidor':<20}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errores':>10}")
+        for name, server, column in (('gunicorn (sync)', 'gunicorn', 1), ('uvicorn (async)', 'uvicorn', 2)):
+            with serve(server, options['workers'], options['threads']) as url:
+                rate, p50, p99, errors = self.load(url, [(entry[column], entry[3]) for entry in plan],
+                                                   options['concurrency'])
+            self.stdout.write(f'{name:<20}{rate:>10.0f}{p50 * 1000:>10.1f}{p99 * 1000:>10.1f}{errors:>10}')
+
+    def ensure_data(self, students):
+        if User.objects.filter(username=f'{PREFIX}-student-0').exists():
+            return
+        self.stdout.write(f'creando colegio de prueba ({students} alumnos, prefijo {PREFIX})')
+        seed_school(students=students, teachers=10, courses=10, grades=3, sections=3, prefix=PREFIX)
+
+    def plan(self, options):
+        """Misma secuencia de (rol, ruta sync, ruta async, token) para ambos servidores."""
+        tokens = {}
+        for role, kind in KINDS.items():
+            users = User.objects.filter(username__startswith=f'{PREFIX}-{kind}-').order_by('id')[:options['users']]
+            tokens[role] = [str(issue_tokens(user, role).access_token) for user in users]
+
+        rng = random.Random(options['seed'])
+        plan = []
+        for _ in range(options['requests']):
+            role, sync_path, async_path = rng.choice(ROUTES)
+            plan.append((role, sync_path, async_path, rng.choice(tokens[role])))
+        return plan
+
+    def load(self, url, requests_plan, concurrency):
+        """(requests por segundo, p50, p99, respuestas con error)."""
+        fetch = http_fetch(url)
+        items = [(path, f'Bearer {token}') for path, token in requests_plan]
+        # calentamiento: una request por ruta antes de medir
+        for item in dict(items).items():
+            fetch(*item)
+
+        results, elapsed = drive(fetch, items, concurrency)
+        latencies = [latency for latency, _ in results]
+        errors = sum(1 for _, code in results if code != 200)
+        return len(results) / elapsed, percentile(latencies, 0.5), percentile(latencies, 0.99), errors
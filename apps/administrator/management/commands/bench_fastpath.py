@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from apps.administrator.bench import rollback, measure, report
+from apps.administrator.seed import seed_school
+from apps.note.models import Note
+from apps.note.serializers import NoteSerializers, ShortNoteSerializer, NOTE_ROWS, SHORT_NOTE_ROWS
+from apps.student.models import Student
+from apps.student.serializers import StudentShortSerializer, STUDENT_SHORT_ROWS
+
+
+class Command(BaseCommand):
+    help = ('Filas por segundo de los listados de solo lectura: ModelSerializer (actual) '
+            'contra FastList sobre values_list (school_api/fastpath.py).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--courses', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        with rollback():
+            seed_school(students=options['students'], courses=options['courses'], teachers=options['courses'])
+            cases = [
+                ('notas', Note.objects.all(), NoteSerializers, NOTE_ROWS,
+                 lambda queryset: NoteSerializers.setup_eager_loading(queryset)),
+                ('notas del alumno', Note.objects.all(), ShortNoteSerializer, SHORT_NOTE_ROWS,
+                 lambda queryset: queryset.select_related('course', 'teacher', 'student')),
+                ('alumnos', Student.objects.all(), StudentShortSerializer, STUDENT_SHORT_ROWS,
+                 lambda queryset: queryset.select_related('user', 'tutor')),
+            ]
+            for title, queryset, serializer_class, fast_list, eager in cases:
+                count = queryset.count()
+                report(self.stdout, f'{title}: {count} filas', [
+                    ('serializer', *measure(lambda: serializer_class(queryset.all(), many=True).data,
+                                            options['repeat'])),
+                    ('serializer + select_related', *measure(lambda: serializer_class(eager(queryset.all()), many=True).data,
+                                                             options['repeat'])),
+                    ('values_list', *measure(lambda: fast_list.build(fast_list.values(queryset.all())),
+                                             options['repeat'])),
+                ], count=count)
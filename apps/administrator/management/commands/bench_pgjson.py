@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+from apps.administrator.bench import rollback, measure, report
+from apps.administrator.seed import seed_school
+from apps.note.models import Note
+from apps.note.serializers import NoteSerializers, note_document
+from apps.registration.models import CourseRegistration
+from apps.registration.serializers import CourseRegistrationSerializer, registration_document
+from apps.student.models import Student
+from apps.student.serializers import StudentAllSerializer, student_document
+from school_api import pgjson
+
+
+def render(serializer_class, queryset):
+    return JSONRenderer().render(serializer_class(serializer_class.setup_eager_loading(queryset), many=True).data)
+
+
+def documents(document, queryset):
+    rows = pgjson.annotate(queryset, document).values_list('doc', flat=True)
+    return b'[' + ','.join(rows).encode() + b']'
+
+
+class Command(BaseCommand):
+    help = ('Filas por segundo de los listados más pesados: serializer de DRF + JSONRenderer '
+            'contra documentos armados por PostgreSQL (school_api/pgjson.py). Requiere PostgreSQL.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--courses', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError(f'Los documentos JSON necesitan PostgreSQL (base actual: {connection.vendor}).')
+
+        with rollback():
+            seed_school(students=options['students'], courses=options['courses'], teachers=options['courses'])
+            cases = [
+                ('notas', Note.objects.all(), NoteSerializers, note_document),
+                ('matrículas', CourseRegistration.objects.all(), CourseRegistrationSerializer, registration_document),
+                ('alumnos', Student.objects.all(), StudentAllSerializer, student_document),
+            ]
+            for title, queryset, serializer_class, document in cases:
+                count = queryset.count()
+                report(self.stdout, f'{title}: {count} filas', [
+                    ('serializer + JSONRenderer', *measure(lambda: render(serializer_class, queryset.all()),
+                                                           options['repeat'])),
+                    ('json_build_object', *measure(lambda: documents(document, queryset.all()),
+                                                   options['repeat'])),
+                ], count=count)
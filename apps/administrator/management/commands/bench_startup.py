@@ -0,0 +1,26 @@
+import statistics
+from django.core.management.base import BaseCommand
+from apps.administrator.startup import cold_start, import_times
+
+
+class Command(BaseCommand):
+    help = ('Arranque en frío de un worker (django.setup() + URLconf) en procesos nuevos, '
+            'con y sin la documentación OpenAPI, y los paquetes que más tardan en importarse.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--top', type=int, default=15)
+
+    def handle(self, *args, **options):
+        cases = [('sin documentación', {'API_DOCS_ENABLED': '0'}), ('con documentación', {'API_DOCS_ENABLED': '1'})]
+        self.stdout.write(f"{'arranque':<22}{'setup':>10}{'urls':>10}{'total':>10}{'p50 total':>12}{'módulos':>10}")
+        for title, env in cases:
+            runs = [cold_start(env) for _ in range(options['repeat'])]
+            best = min(runs, key=lambda run: run['total'])
+            median = statistics.median(run['total'] for run in runs)
+            self.stdout.write(f"{title:<22}{best['setup']:>10.3f}{best['urls']:>10.3f}{best['total']:>10.3f}"
+                              f"{median:>12.3f}{best['modules']:>10}")
+
+        self.stdout.write('\nimportación por paquete (segundos, sin documentación)')
+        for name, seconds in import_times({'API_DOCS_ENABLED': '0'}, options['top']):
+            self.stdout.write(f'{name:<32}{seconds:>10.3f}')
@@ -0,0 +1,20 @@
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from school_api.openapi import generate
+
+
+class Command(BaseCommand):
+    help = ('Genera el esquema OpenAPI una vez (antes de collectstatic) para que la '
+            'documentación lo cargue como archivo estático (school_api/openapi.py).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=settings.OPENAPI_SCHEMA_FILE)
+
+    def handle(self, *args, **options):
+        output = options['output']
+        schema = generate()
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'wb') as file:
+            file.write(schema)
+        self.stdout.write(f'{output}: {len(schema)} bytes')
@@ -0,0 +1,23 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from apps.administrator.bulk_import import import_stream, detect_format, BulkImportError, IMPORTERS, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Importa tutores, alumnos o profesores desde un archivo CSV o NDJSON e imprime el reporte en JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path')
+        parser.add_argument('--format', dest='file_format', choices=['csv', 'ndjson'])
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            file_format = detect_format(options['path'], options['file_format'])
+            with open(options['path'], 'rb') as stream:
+                report = import_stream(options['kind'], stream, file_format, chunk_size=options['chunk_size'])
+        except (BulkImportError, OSError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,74 @@
+import json
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from apps.administrator import loadtest
+from apps.administrator.bench import SERVERS, http_fetch, serve
+
+
+class Command(BaseCommand):
+    help = ('Recorre todas las rutas GET con un JWT por rol contra un servidor real con clientes '
+            'concurrentes y mide req/s, latencia p50/p95/p99 y consultas por request; guarda el '
+            'resultado en JSON para comparar corridas.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='requests por ruta')
+        parser.add_argument('--concurrency', type=int, default=16, help='clientes simultáneos')
+        parser.add_argument('--server', choices=SERVERS, default='uvicorn')
+        parser.add_argument('--workers', type=int, default=2, help='procesos del servidor')
+        parser.add_argument('--threads', type=int, default=1, help='hilos por worker de gunicorn')
+        parser.add_argument('--url', help='servidor ya levantado (por ejemplo http://127.0.0.1:8000); '
+                                          'sin la opción se levanta uno con --server')
+        parser.add_argument('--only', help='solo rutas que empiezan con este prefijo, por ejemplo /student/')
+        parser.add_argument('--output', help='archivo JSON de salida (por defecto loadtest-<fecha>.json)')
+        parser.add_argument('--compare', help='JSON de una corrida anterior para mostrar diferencias')
+
+    def handle(self, *args, **options):
+        try:
+            if options['url']:
+                results, skipped = self.run(options['url'].rstrip('/'), options)
+            else:
+                with serve(options['server'], options['workers'], options['threads']) as url:
+                    results, skipped = self.run(url, options)
+        except loadtest.LoadTestError as e:
+            raise CommandError(str(e))
+
+        previous = {}
+        if options['compare']:
+            with open(options['compare']) as file:
+                previous = {row['route']: row for row in json.load(file)['routes']}
+
+        self.stdout.write(f"{'ruta':<48}{'rol':<9}{'estado':<10}{'req/s':>8}{'p50':>8}{'p95':>8}"
+                          f"{'p99':>8}{'consultas':>11}" + (f"{'Δp50':>9}{'Δconsultas':>12}" if previous else ''))
+        for result in results:
+            status = ','.join(result.status)
+            line = (f'{result.route:<48}{result.role:<9}{status:<10}{result.rps:>8.0f}{result.p50_ms:>8.1f}'
+                    f'{result.p95_ms:>8.1f}{result.p99_ms:>8.1f}{result.queries:>11.1f}')
+            before = previous.get(result.route)
+            if before:
+                line += f"{result.p50_ms - before['p50_ms']:>+9.1f}{result.queries - before['queries']:>+12.1f}"
+            self.stdout.write(line)
+        for row in skipped:
+            self.stdout.write(f"{row['route']:<48}omitida: {row['reason']}")
+
+        summary = loadtest.totals(results)
+        if summary:
+            self.stdout.write(f"total: {summary['requests']} requests, {summary['rps']:.0f} req/s, "
+                              f"p50 {summary['p50_ms']:.1f} ms, p95 {summary['p95_ms']:.1f} ms, "
+                              f"p99 {summary['p99_ms']:.1f} ms, {summary['queries']:.1f} consultas/request")
+
+        output = options['output'] or f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json"
+        with open(output, 'w') as file:
+            json.dump({
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'options': {name: options[name] for name in
+                            ('requests', 'concurrency', 'server', 'workers', 'threads', 'url', 'only')},
+                'totals': summary,
+                'routes': [result.as_dict() for result in results],
+                'skipped': skipped,
+            }, file, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'resultados en {output}'))
+
+    def run(self, url, options):
+        self.stdout.write(f"{url}: {options['requests']} requests por ruta, concurrencia {options['concurrency']}")
+        return loadtest.run(http_fetch(url), requests=options['requests'],
+                            concurrency=options['concurrency'], only=options['only'])
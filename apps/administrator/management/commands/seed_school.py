@@ -0,0 +1,37 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from apps.administrator.seed import seed_school
+
+
+class Command(BaseCommand):
+    help = 'Genera un colegio de prueba completo con bulk_create (usuarios, grupos, alumnos, notas, ...).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--teachers', type=int, default=20)
+        parser.add_argument('--courses', type=int, default=10)
+        parser.add_argument('--grades', type=int, default=6)
+        parser.add_argument('--sections', type=int, default=3)
+        parser.add_argument('--students-per-tutor', type=int, default=2)
+        parser.add_argument('--no-notes', action='store_true')
+        parser.add_argument('--prefix', default='seed', help='prefijo de usuarios y nombres; debe ser nuevo')
+        parser.add_argument('--seed', type=int, default=0, help='semilla de las notas')
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=f"{options['prefix']}-").exists():
+            raise CommandError(f"Ya existen datos con el prefijo {options['prefix']}; use otro --prefix.")
+
+        start = time.perf_counter()
+        school = seed_school(
+            students=options['students'], teachers=options['teachers'], courses=options['courses'],
+            grades=options['grades'], sections=options['sections'],
+            students_per_tutor=options['students_per_tutor'], with_notes=not options['no_notes'],
+            with_groups=True, prefix=options['prefix'], seed=options['seed'],
+        )
+        elapsed = time.perf_counter() - start
+
+        for name in ('grades', 'sections', 'specialities', 'schedules', 'courses', 'teachers', 'tutors',
+                     'students', 'assignments', 'registrations', 'notes'):
+            self.stdout.write(f'{name:<15}{len(getattr(school, name)):>10}')
+        self.stdout.write(self.style.SUCCESS(f'colegio creado en {elapsed:.2f} s'))
@@ -42,4 +42,30 @@ def TutorNames():
         'legal guardian', 'legal guardians', 'academic tutor', 'legal representative', 
         'representative', 'parent', 'parents', 'guardian parent', 'primary guardian',
         'custodian', 'custodians', 'sponsor', 'mentor'
-        }
\ No newline at end of file
+        }
+
+#roles canónicos que viajan en el token
+STUDENT = 'student'
+TEACHER = 'teacher'
+TUTOR = 'tutor'
+ADMIN = 'admin'
+
+#alias de cada rol en minúsculas (casefold), se calculan una sola vez al importar
+ROLE_NAMES = {
+    STUDENT: frozenset(name.casefold() for name in StudentNames()),
+    TEACHER: frozenset(name.casefold() for name in TeacherNames()),
+    TUTOR: frozenset(name.casefold() for name in TutorNames()),
+    ADMIN: frozenset(name.casefold() for name in AdminNames()),
+}
+
+#índice alias -> rol; si un alias se repite ('responsible') gana el primer rol
+ALIAS_INDEX = {}
+for _role, _names in ROLE_NAMES.items():
+    for _name in _names:
+        ALIAS_INDEX.setdefault(_name, _role)
+
+def resolve_role(group_name):
+    """Rol canónico para el nombre de un grupo, o None si no es un alias conocido."""
+    if not group_name:
+        return None
+    return ALIAS_INDEX.get(group_name.casefold())
@@ -0,0 +1,172 @@
+"""Caché versionada de datos de referencia (grados, secciones, especialidades y horarios).
+
+Cada tabla se guarda completa en la caché bajo `refcache:<tabla>:<versión>`.
+La versión vive en `refcache:<tabla>:version` y se reemplaza por un valor nuevo
+cuando se guarda o borra una fila (señales post_save/post_delete, aplicado al
+confirmar la transacción), así que ninguna copia vieja vuelve a leerse.
+
+La versión solo llega a los demás workers si la caché es compartida (Redis).
+Con la caché local del proceso la versión vence a los LOCAL_TIMEOUT segundos,
+así que un worker que no vio el cambio lo lee a más tardar en ese plazo. Una
+fila que no está en la copia (por ejemplo creada con bulk_create, que no
+dispara señales) se busca en la base y la tabla se vuelve a cargar.
+
+Dentro de una transacción abierta se consulta la base directamente: la copia en
+caché no vería los cambios aún sin confirmar.
+"""
+import uuid
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.db.models.signals import post_save, post_delete
+from rest_framework import serializers
+from apps.course.models import CourseSchedule
+from apps.grade.models import Grade
+from apps.section.models import Section
+from apps.teacher.models import Speciality
+from school_api.db_router import shared_cache
+
+MODELS = {
+    'grade': Grade,
+    'section': Section,
+    'speciality': Speciality,
+    'schedule': CourseSchedule,
+}
+TIMEOUT = 60 * 60 * 24
+# vigencia de la versión cuando la caché no se comparte entre procesos
+LOCAL_TIMEOUT = getattr(settings, 'REFCACHE_LOCAL_TIMEOUT', 60)
+
+# aciertos, fallos y consultas directas por tabla
+stats = Counter()
+# copia del proceso: tabla -> (versión, {id: instancia})
+_local = {}
+
+
+def _version_key(label):
+    return f'refcache:{label}:version'
+
+
+def _version_timeout():
+    return None if shared_cache() else LOCAL_TIMEOUT
+
+
+def version(label):
+    key = _version_key(label)
+    current = cache.get(key)
+    if current is None:
+        cache.add(key, uuid.uuid4().hex, _version_timeout())
+        current = cache.get(key)
+    return current
+
+
+def bump(label):
+    """Invalida la tabla en todos los procesos que comparten la caché."""
+    cache.set(_version_key(label), uuid.uuid4().hex, _version_timeout())
+    _local.pop(label, None)
+
+
+def _load(label):
+    model = MODELS[label]
+    names = [field.attname for field in model._meta.concrete_fields]
+    # siempre de la principal: tras un cambio la réplica puede ir atrasada y la
+    # copia vieja quedaría guardada bajo la versión nueva
+    return [tuple(row) for row in model.objects.using(DEFAULT_DB_ALIAS).order_by('pk').values_list(*names)]
+
+
+def _build(label, rows):
+    model = MODELS[label]
+    names = [field.attname for field in model._meta.concrete_fields]
+    return {instance.pk: instance for instance in (model.from_db('default', names, row) for row in rows)}
+
+
+def table(label):
+    """{id: instancia} de la tabla completa."""
+    if connection.in_atomic_block:
+        stats[f'{label}.bypass'] += 1
+        return _build(label, _load(label))
+
+    current = version(label)
+    local = _local.get(label)
+    if local and local[0] == current:
+        stats[f'{label}.hit'] += 1
+        return local[1]
+
+    key = f'refcache:{label}:{current}'
+    rows = cache.get(key)
+    if rows is None:
+        stats[f'{label}.miss'] += 1
+        rows = _load(label)
+        cache.set(key, rows, TIMEOUT)
+    else:
+        stats[f'{label}.hit'] += 1
+    instances = _build(label, rows)
+    _local[label] = (current, instances)
+    return instances
+
+
+def many(label, pks):
+    """{id: instancia} de los ids pedidos; los que faltan en la copia se buscan
+    en la base con una consulta y, si aparecen, la tabla se invalida."""
+    instances = table(label)
+    found = {pk: instances[pk] for pk in pks if pk in instances}
+    missing = [pk for pk in pks if pk not in instances]
+    if missing:
+        stats[f'{label}.stale'] += 1
+        rows = {instance.pk: instance for instance in MODELS[label].objects.using(DEFAULT_DB_ALIAS).filter(pk__in=missing)}
+        if rows and not connection.in_atomic_block:
+            bump(label)
+        found.update(rows)
+    return found
+
+
+def get(label, pk):
+    try:
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    return many(label, [pk]).get(pk)
+
+
+def find_by_name(label, name):
+    """Primera fila cuyo nombre coincide sin importar mayúsculas, o None."""
+    name = name.casefold()
+    for instance in table(label).values():
+        if instance.name.casefold() == name:
+            return instance
+    return None
+
+
+def display(label, pk):
+    """Texto de la fila (str del modelo), por ejemplo el horario de una asignación."""
+    instance = get(label, pk)
+    return str(instance) if instance else None
+
+
+def _changed(sender, **kwargs):
+    for label, model in MODELS.items():
+        if model is sender:
+            transaction.on_commit(lambda label=label: bump(label))
+
+
+def connect():
+    for model in MODELS.values():
+        post_save.connect(_changed, sender=model, dispatch_uid=f'refcache-save-{model._meta.label}')
+        post_delete.connect(_changed, sender=model, dispatch_uid=f'refcache-delete-{model._meta.label}')
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField que busca primero en la caché de referencia y, si
+    no encuentra la fila, consulta la base como el campo original."""
+
+    def __init__(self, table, **kwargs):
+        self.table = table
+        kwargs.setdefault('queryset', MODELS[table].objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, bool):
+            instance = get(self.table, data)
+            if instance is not None:
+                return instance
+        return super().to_internal_value(data)
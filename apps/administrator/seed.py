@@ -0,0 +1,190 @@
+"""Generador de datos de prueba con bulk_create.
+
+Crea un colegio completo (usuarios, tutores, alumnos, profesores, cursos,
+asignaciones, matrículas y notas) de forma determinista a partir de una
+semilla, para benchmarks y pruebas de carga.
+"""
+import random
+import string
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, time
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User, Group
+from django.db import transaction
+from apps.teacher.models import Teacher, Speciality
+from apps.tutor.models import Tutor
+from apps.student.models import Student
+from apps.grade.models import Grade
+from apps.section.models import Section
+from apps.course.models import Course, CourseSchedule, TeacherCourseAssignment
+from apps.registration.models import CourseRegistration
+from apps.note.models import Note
+from apps.note import aggregates
+
+BATCH_SIZE = 1000
+# jornada en la que se reparten las franjas: de 6:00 a 22:00
+DAY_START = 6 * 60
+DAY_MINUTES = 16 * 60
+
+
+@dataclass
+class School:
+    grades: list = field(default_factory=list)
+    sections: list = field(default_factory=list)
+    specialities: list = field(default_factory=list)
+    schedules: list = field(default_factory=list)
+    courses: list = field(default_factory=list)
+    teachers: list = field(default_factory=list)
+    tutors: list = field(default_factory=list)
+    students: list = field(default_factory=list)
+    assignments: list = field(default_factory=list)
+    registrations: list = field(default_factory=list)
+    notes: list = field(default_factory=list)
+
+
+def _users(prefix, kind, count):
+    # contraseña inutilizable: el hash real costaría cientos de ms por usuario
+    password = make_password(None)
+    users = [
+        User(username=f'{prefix}-{kind}-{i}', email=f'{prefix}-{kind}-{i}@ejemplo.com', password=password)
+        for i in range(count)
+    ]
+    return User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+
+
+def _time(minutes):
+    return time(minutes // 60, minutes % 60)
+
+
+# grupo de cada tipo de usuario (alias reconocidos por namesGroup)
+GROUPS = {'students': 'Alumnos', 'teachers': 'Profesores', 'tutors': 'Tutores'}
+
+
+def _add_groups(school):
+    through = User.groups.through
+    links = []
+    for attr, name in GROUPS.items():
+        group, _ = Group.objects.get_or_create(name=name)
+        links.extend(through(user_id=person.user_id, group_id=group.id) for person in getattr(school, attr))
+    through.objects.bulk_create(links, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+@transaction.atomic
+def seed_school(students=100, teachers=5, courses=5, grades=2, sections=2, students_per_tutor=2,
+                with_notes=True, with_groups=False, prefix='seed', seed=0):
+    """Crea un colegio y devuelve un School con todos los objetos creados.
+
+    Cada grado/sección recibe todos los cursos en franjas consecutivas que no se
+    traslapan para el grado/sección ni para el profesor (de una hora o más
+    cortas si no caben en la jornada); los alumnos se reparten en orden entre grados y secciones, se matriculan
+    en todas las asignaciones de su grado/sección y tienen una nota por curso.
+    Con `with_groups` los usuarios se agregan a los grupos Alumnos, Profesores y
+    Tutores.
+    """
+    rng = random.Random(seed)
+    school = School()
+    sections = min(sections, len(string.ascii_uppercase))
+
+    school.grades = Grade.objects.bulk_create([Grade(name=f'{prefix} grado {i + 1}') for i in range(grades)])
+    # las secciones son una letra: se reutilizan las que ya existen
+    names = string.ascii_uppercase[:sections]
+    existing = {section.name: section for section in Section.objects.filter(name__in=names)}
+    Section.objects.bulk_create([Section(name=name) for name in names if name not in existing])
+    existing.update({section.name: section for section in Section.objects.filter(name__in=names)})
+    school.sections = [existing[name] for name in names]
+    school.specialities = Speciality.objects.bulk_create(
+        [Speciality(name=f'{prefix} especialidad {i}') for i in range(courses)]
+    )
+    school.courses = Course.objects.bulk_create([
+        Course(name=f'{prefix} curso {i}', speciality=school.specialities[i]) for i in range(courses)
+    ])
+    school.teachers = Teacher.objects.bulk_create([
+        Teacher(user=user, name=f'{prefix} profesor {i}', phone='55550000')
+        for i, user in enumerate(_users(prefix, 'teacher', teachers))
+    ], batch_size=BATCH_SIZE)
+
+    # el profesor de un curso rota por sección para repartir la carga; cada
+    # asignación toma la primera franja libre para su grado/sección y su profesor
+    speciality_links = set()
+    busy = defaultdict(set)
+    slots = []
+    for grade_index, grade in enumerate(school.grades):
+        for section_index, section in enumerate(school.sections):
+            for course_index, course in enumerate(school.courses):
+                teacher = school.teachers[(course_index + grade_index * sections + section_index) % teachers]
+                slot = 0
+                while slot in busy[teacher] or slot in busy[(grade, section)]:
+                    slot += 1
+                busy[teacher].add(slot)
+                busy[(grade, section)].add(slot)
+                slots.append(slot)
+                speciality_links.add((teacher.id, course.speciality_id))
+                school.assignments.append(TeacherCourseAssignment(
+                    teacher=teacher, course=course, grade=grade, section=section
+                ))
+
+    count = max(slots, default=0) + 1
+    minutes = min(60, DAY_MINUTES // count)
+    if not minutes:
+        raise ValueError(f'{count} franjas no caben en la jornada: use menos cursos o más profesores.')
+    school.schedules = CourseSchedule.objects.bulk_create([
+        CourseSchedule(start_time=_time(DAY_START + i * minutes), end_time=_time(DAY_START + (i + 1) * minutes))
+        for i in range(count)
+    ])
+    for assignment, slot in zip(school.assignments, slots):
+        assignment.schedule = school.schedules[slot]
+    school.assignments = TeacherCourseAssignment.objects.bulk_create(school.assignments, batch_size=BATCH_SIZE)
+    Teacher.speciality.through.objects.bulk_create([
+        Teacher.speciality.through(teacher_id=teacher_id, speciality_id=speciality_id)
+        for teacher_id, speciality_id in sorted(speciality_links)
+    ], batch_size=BATCH_SIZE)
+
+    tutors = max(1, -(-students // max(students_per_tutor, 1)))
+    school.tutors = Tutor.objects.bulk_create([
+        Tutor(user=user, name=f'{prefix} tutor {i}', phone='55550000', address=f'zona {i % 20 + 1}')
+        for i, user in enumerate(_users(prefix, 'tutor', tutors))
+    ], batch_size=BATCH_SIZE)
+
+    school.students = Student.objects.bulk_create([
+        Student(
+            user=user, name=f'{prefix} alumno {i}', phone='55550000',
+            birthdate=date(2008 + i % 8, i % 12 + 1, i % 28 + 1), address=f'zona {i % 20 + 1}',
+            emergency_contact='55550000', tutor=school.tutors[i // max(students_per_tutor, 1) % tutors]
+        )
+        for i, user in enumerate(_users(prefix, 'student', students))
+    ], batch_size=BATCH_SIZE)
+
+    by_group = {}
+    for assignment in school.assignments:
+        by_group.setdefault((assignment.grade_id, assignment.section_id), []).append(assignment)
+    groups = [(grade, section) for grade in school.grades for section in school.sections]
+
+    placements = [groups[i % len(groups)] for i in range(students)]
+    school.registrations = CourseRegistration.objects.bulk_create([
+        CourseRegistration(student=student, grade=grade, section=section)
+        for student, (grade, section) in zip(school.students, placements)
+    ], batch_size=BATCH_SIZE)
+
+    through = CourseRegistration.teacher_course_assignment.through
+    links = []
+    notes = []
+    for registration, student in zip(school.registrations, school.students):
+        for assignment in by_group[(registration.grade_id, registration.section_id)]:
+            links.append(through(courseregistration_id=registration.id, teachercourseassignment_id=assignment.id))
+            if with_notes:
+                value = Decimal(rng.randint(0, 10000)) / 100
+                notes.append(Note(
+                    student=student, course_id=assignment.course_id, teacher_id=assignment.teacher_id,
+                    note=value, status_note=value >= 60
+                ))
+    through.objects.bulk_create(links, batch_size=BATCH_SIZE)
+    school.notes = Note.objects.bulk_create(notes, batch_size=BATCH_SIZE)
+    # bulk_create no dispara señales
+    aggregates.notes_changed([(None, aggregates.snapshot(note)) for note in school.notes])
+
+    if with_groups:
+        _add_groups(school)
+
+    return school
@@ -0,0 +1,54 @@
+"""Arranque en frío de un worker, medido en procesos nuevos.
+
+Cada medición lanza un intérprete limpio que hace lo mismo que un worker de
+gunicorn/uvicorn antes de su primera respuesta: django.setup() (settings y
+apps) y la carga del URLconf con todas las vistas y serializers.
+"""
+import json
+import os
+import subprocess
+import sys
+from django.conf import settings
+
+SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls = time.perf_counter()
+print(json.dumps({"setup": setup - start, "urls": urls - setup, "total": urls - start,
+                  "modules": len(sys.modules), "drf_yasg": "drf_yasg" in sys.modules}))
+'''
+
+
+def _environ(env):
+    environ = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'school_api.settings')}
+    environ.update(env or {})
+    return environ
+
+
+def cold_start(env=None):
+    """Tiempos (segundos) de un proceso nuevo: setup, urls y total, más los módulos cargados."""
+    result = subprocess.run([sys.executable, '-c', SCRIPT], env=_environ(env), cwd=settings.BASE_DIR,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_times(env=None, limit=15):
+    """Los `limit` paquetes de primer nivel que más tardan en importarse
+    (python -X importtime, suma del tiempo propio de sus módulos), como [(paquete, segundos)]."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', SCRIPT], env=_environ(env),
+                            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True)
+    packages = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        own, _, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        if own.isdigit():
+            package = name.split('.')[0]
+            packages[package] = packages.get(package, 0) + int(own) / 1e6
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]
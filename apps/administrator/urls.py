@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import StudentViewSet, StudentShortListApiView, StudentNoteViewSet, RegistrationStudentViewSet, TeacherViewSet, SpecialityViewSet, TutorViewSet, CourseViewSet, GradeViewSet, CourseScheduleView, TeacherCourseAssignmentView
+from .views import StudentViewSet, StudentShortListApiView, StudentNoteViewSet, RegistrationStudentViewSet, TeacherViewSet, SpecialityViewSet, TutorViewSet, CourseViewSet, GradeViewSet, CourseScheduleView, TeacherCourseAssignmentView, BulkImportApiView, ExportApiView, GradebookApiView, TimetableValidateApiView
 
 router = DefaultRouter()
 router.register(r'course', CourseViewSet, basename='course')
@@ -17,6 +17,10 @@ router.register(r'teacher-course-assignment', TeacherCourseAssignmentView, basen
 urlpatterns = [
     path('', include('apps.authentication.urls')),
     path('short-student', StudentShortListApiView.as_view(), name="short-student"),
+    path('import/<str:kind>/', BulkImportApiView.as_view(), name="bulk-import"),
+    path('export/<str:kind>/', ExportApiView.as_view(), name="export"),
+    path('gradebook/<str:dimension>/', GradebookApiView.as_view(), name="gradebook"),
+    path('timetable/validate/', TimetableValidateApiView.as_view(), name="timetable-validate"),
     path('', include('apps.section.urls')),
     path('', include(router.urls))
 ]
@@ -1,7 +1,8 @@
 from django.db import transaction, IntegrityError
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, generics, status
 from rest_framework.response import Response
-from apps.student.serializers import Student, StudentAllSerializer, StudentShortSerializer
+from apps.student.serializers import Student, StudentAllSerializer, StudentShortSerializer, student_document
 from apps.registration.serializers import CourseRegistration, CourseRegistrationSerializer
 from apps.note.serializers import NoteSerializers, Note
 from apps.tutor.serializers import Tutor, TutorStudentSerializer
@@ -10,30 +11,38 @@ from apps.course.serializers import CourseSerializer, Course, CourseSchedule, Co
 from apps.grade.serializers import Grade, GradeSerializer
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.permissions import IsAdminUser
+from rest_framework.parsers import MultiPartParser
+from school_api.conditional import ConditionalGetMixin
+from school_api.sparse import SparseQuerysetMixin
+from school_api.pgjson import DocumentListMixin
+from .bulk_import import import_stream, detect_format, BulkImportError, DEFAULT_CHUNK_SIZE
+from .exports import export_stream, ExportError
+from apps.note.aggregates import gradebook, GradebookError
+from apps.course.timetable import validate_timetable, TimetableError
 
 #cursos generales
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(SparseQuerysetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminUser]
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
 
 #horarios para cursos
-class CourseScheduleView(viewsets.ModelViewSet):
+class CourseScheduleView(SparseQuerysetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminUser]
     queryset = CourseSchedule.objects.all()
     serializer_class = CourseScheduleSerializer
 
 #asignación de cursos a profesor
-class TeacherCourseAssignmentView(viewsets.ModelViewSet):
+class TeacherCourseAssignmentView(SparseQuerysetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminUser]
     queryset =  TeacherCourseAssignment.objects.all()
     serializer_class = TeacherCourseAssignmentSerializer
 
 #Matricula alumnos
-class RegistrationStudentViewSet(viewsets.ModelViewSet):
+class RegistrationStudentViewSet(SparseQuerysetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """Administrador:  
     acceso completo - CRUD para manipular matriculas
     """
@@ -45,7 +54,7 @@ class RegistrationStudentViewSet(viewsets.ModelViewSet):
     serializer_class = CourseRegistrationSerializer
 
 #Alumno
-class StudentViewSet(viewsets.ModelViewSet):
+class StudentViewSet(SparseQuerysetMixin, ConditionalGetMixin, DocumentListMixin, viewsets.ModelViewSet):
     """Administrador:
     acceso completo - CRUD para manipular alumnos
     """
@@ -54,9 +63,10 @@ class StudentViewSet(viewsets.ModelViewSet):
 
     queryset = Student.objects.all()
     serializer_class = StudentAllSerializer
+    document = staticmethod(student_document)
 
 
-class StudentShortListApiView(generics.ListAPIView):
+class StudentShortListApiView(SparseQuerysetMixin, ConditionalGetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminUser]
 
@@ -64,15 +74,15 @@ class StudentShortListApiView(generics.ListAPIView):
     serializer_class = StudentShortSerializer
 
 #nota alumno
-class StudentNoteViewSet(viewsets.ModelViewSet):
+class StudentNoteViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminUser]
 
-    queryset = Note.objects.all()
+    queryset = NoteSerializers.setup_eager_loading(Note.objects.all())
     serializer_class = NoteSerializers
 
 #tutor
-class TutorViewSet(viewsets.ModelViewSet):
+class TutorViewSet(SparseQuerysetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminUser]
 
@@ -80,14 +90,14 @@ class TutorViewSet(viewsets.ModelViewSet):
     serializer_class = TutorStudentSerializer
 
 # views.py
-class TeacherViewSet(viewsets.ModelViewSet):
+class TeacherViewSet(SparseQuerysetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminUser]
 
     queryset = Teacher.objects.all()
     serializer_class = TeacherSerializer
 
-class GradeViewSet(viewsets.ModelViewSet):
+class GradeViewSet(SparseQuerysetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminUser]
 
@@ -95,7 +105,7 @@ class GradeViewSet(viewsets.ModelViewSet):
     serializer_class = GradeSerializer
 
 #especialidad
-class SpecialityViewSet(viewsets.ModelViewSet):
+class SpecialityViewSet(SparseQuerysetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminUser]
 
@@ -119,7 +129,91 @@ class SpecialityViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+#importación masiva de tutores, alumnos y profesores
+class BulkImportApiView(generics.GenericAPIView):
+    """Administrador:
+    POST multipart con `file` (CSV o NDJSON), `file_format` opcional si la
+    extensión no lo indica. Devuelve el reporte de filas creadas y con error.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, kind):
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'error': 'archivo requerido'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            file_format = detect_format(upload.name, request.data.get('file_format'))
+            chunk_size = int(request.data.get('chunk_size', DEFAULT_CHUNK_SIZE))
+            report = import_stream(kind, upload, file_format, chunk_size=max(chunk_size, 1))
+        except (BulkImportError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(report, status=status.HTTP_200_OK)
+
+#exportación de notas, matrículas y alumnos
+class ExportApiView(generics.GenericAPIView):
+    """Administrador:
+    GET con `file_format` (csv o ndjson) y filtros opcionales grade, section,
+    course, date_from y date_to. La respuesta se envía en flujo.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, kind):
+        file_format = request.query_params.get('file_format', 'csv')
+        try:
+            content_type, stream = export_stream(kind, file_format, request.query_params)
+        except ExportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{kind}.{file_format}"'
+        return response
+
 
 from django.http import HttpResponse
 def home_page_view(request):
     return HttpResponse("Hello, World!")
+
+#promedios y aprobación desde los acumulados de notas
+class GradebookApiView(generics.GenericAPIView):
+    """Administrador:
+    GET por dimensión (students, courses o sections) con filtros opcionales
+    student, course, grade y section. Una sola consulta agrupada.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, dimension):
+        try:
+            rows = gradebook(dimension, request.query_params)
+        except GradebookError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(rows, status=status.HTTP_200_OK)
+
+#validación de un horario completo
+class TimetableValidateApiView(generics.GenericAPIView):
+    """Administrador:
+    POST {"assignments": [{id?, teacher, course, grade, section, schedule}], "replace": false}.
+    Devuelve los traslapes de profesor, grado/sección y alumnos en una sola pasada.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        assignments = request.data.get('assignments')
+        if not isinstance(assignments, list):
+            return Response({'error': 'assignments debe ser una lista'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            conflicts = validate_timetable(assignments, replace=bool(request.data.get('replace', False)))
+        except TimetableError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'valid': not conflicts,
+            'conflicts': [conflict.as_dict() for conflict in conflicts],
+        }, status=status.HTTP_200_OK)
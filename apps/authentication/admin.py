@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import EmailVerification
+from .models import EmailVerification, OutboxEmail
 
 # Register your models here.
-admin.site.register(EmailVerification)
\ No newline at end of file
+admin.site.register(EmailVerification)
+admin.site.register(OutboxEmail)
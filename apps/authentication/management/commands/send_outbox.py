@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.authentication import outbox
+
+
+class Command(BaseCommand):
+    help = 'Envía los correos encolados en la bandeja de salida (por lotes, con reintentos).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--interval', type=float, default=5, help='segundos de espera cuando no hay correos')
+        parser.add_argument('--once', action='store_true', help='envía lo pendiente y termina (para cron o pruebas)')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = outbox.deliver(batch_size=options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'enviados: {sent}, con error: {failed}')
+            # un lote lleno indica que quedan más correos vencidos
+            if sent + failed >= options['batch_size']:
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
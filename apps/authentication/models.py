@@ -24,3 +24,43 @@ class EmailVerification(models.Model):
         Verifica si el código es válido (no expirado).
         """
         return timezone.now() < self.expiration_date and not self.verificated
+
+
+class RoleEpoch(models.Model):
+    """Versión de los grupos del usuario; los tokens con una época anterior
+    dejan de autorizar por rol."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='role_epoch')
+    epoch = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'role_epoch'
+
+    def __str__(self):
+        return f'{self.user_id} - {self.epoch}'
+
+
+class OutboxEmail(models.Model):
+    """Correo pendiente de enviar. Las vistas solo lo encolan; el comando
+    send_outbox lo entrega (ver outbox.py)."""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'pendiente'), (SENT, 'enviado'), (FAILED, 'fallido')]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    creation_date = models.DateTimeField(auto_now_add=True)
+    sent_date = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'outbox_email'
+        indexes = [models.Index(fields=['status', 'next_attempt'], name='outbox_due_idx')]
+
+    def __str__(self):
+        return f'{", ".join(self.to)} - {self.subject} ({self.status})'
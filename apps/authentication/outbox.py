@@ -0,0 +1,86 @@
+"""Bandeja de salida de correos.
+
+`enqueue` guarda el correo en la base dentro de la transacción de la request y
+vuelve de inmediato; el comando `send_outbox` llama a `deliver`, que toma los
+correos vencidos por lotes y los envía por una sola conexión SMTP. Un envío
+fallido se reintenta con espera exponencial (OUTBOX_RETRY_BASE segundos, el
+doble en cada intento, hasta OUTBOX_RETRY_MAX) y después de
+OUTBOX_MAX_ATTEMPTS intentos queda como fallido con el último error.
+
+Las filas del lote se bloquean con SELECT ... FOR UPDATE SKIP LOCKED, así que
+varios workers pueden correr a la vez sin enviar dos veces el mismo correo
+(en SQLite no hay bloqueo por fila: usar un solo worker).
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from .models import OutboxEmail
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(subject, message, from_email, recipient_list):
+    return OutboxEmail.objects.create(subject=subject, body=message, from_email=from_email, to=list(recipient_list))
+
+
+def backoff(attempts):
+    """Segundos de espera antes del intento siguiente a `attempts` fallidos."""
+    base = _setting('OUTBOX_RETRY_BASE', 30)
+    return min(base * 2 ** (attempts - 1), _setting('OUTBOX_RETRY_MAX', 60 * 60))
+
+
+def _failed(email, error, now):
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    if email.attempts >= _setting('OUTBOX_MAX_ATTEMPTS', 5):
+        email.status = OutboxEmail.FAILED
+    else:
+        email.next_attempt = now + timedelta(seconds=backoff(email.attempts))
+
+
+def deliver(batch_size=100, connection=None):
+    """Envía un lote de correos vencidos; devuelve (enviados, fallidos)."""
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+            status=OutboxEmail.PENDING, next_attempt__lte=now
+        ).order_by('next_attempt', 'id')[:batch_size])
+        if not emails:
+            return 0, 0
+
+        sent = failed = 0
+        connection = connection or get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            # sin servidor de correo: todo el lote espera al siguiente intento
+            for email in emails:
+                _failed(email, e, now)
+            failed = len(emails)
+        else:
+            try:
+                for email in emails:
+                    message = EmailMessage(email.subject, email.body, email.from_email, email.to,
+                                           connection=connection)
+                    try:
+                        message.send()
+                    except Exception as e:
+                        _failed(email, e, now)
+                        failed += 1
+                    else:
+                        email.attempts += 1
+                        email.status = OutboxEmail.SENT
+                        email.sent_date = timezone.now()
+                        email.last_error = ''
+                        sent += 1
+            finally:
+                connection.close()
+
+        OutboxEmail.objects.bulk_update(
+            emails, ['status', 'attempts', 'next_attempt', 'last_error', 'sent_date'], batch_size=batch_size
+        )
+    return sent, failed
@@ -1,14 +1,43 @@
+from rest_framework import exceptions
 from rest_framework.permissions import BasePermission
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from apps.administrator.namesGroup import resolve_role
+from .roles import ROLE_CLAIM, EPOCH_CLAIM, epoch_matches
 
 class IsInGroup(BasePermission):
+    """Autoriza con el rol firmado en el token, sin consultar los grupos del
+    usuario. Si los grupos cambiaron después de emitir el token (época
+    distinta) se niega el acceso hasta volver a iniciar sesión.
+    """
     def has_permission(self, request, view):
         if not request.user.is_authenticated:
             return False
-        
-        #obtener nombre del grupo de usuario
-        user_groups = request.user.groups.values_list('name', flat=True)
 
-        #grupos permitidos
-        allowed_groups = view.allowed_groups if hasattr(view, 'allowed_groups') else []
+        #roles permitidos
+        allowed_roles = view.allowed_roles if hasattr(view, 'allowed_roles') else []
 
-        return any(group in user_groups for group in allowed_groups)
+        token = request.auth
+        if token is None or token.get(ROLE_CLAIM) is None:
+            # tokens emitidos antes del claim de rol
+            user_groups = request.user.groups.values_list('name', flat=True)
+            return any(resolve_role(group) in allowed_roles for group in user_groups)
+
+        if not epoch_matches(request.user.pk, token.get(EPOCH_CLAIM)):
+            return False
+
+        return token[ROLE_CLAIM] in allowed_roles
+
+
+def authorize(request, view):
+    """Autentica con JWTAuthentication y autoriza con IsInGroup igual que una
+    vista de DRF, para las vistas que no lo son (async_views). Devuelve el
+    Request de DRF o lanza NotAuthenticated / AuthenticationFailed /
+    PermissionDenied. Consulta la base: desde código async se llama con
+    sync_to_async."""
+    drf_request = Request(request, authenticators=[JWTAuthentication()])
+    if not drf_request.user.is_authenticated:
+        raise exceptions.NotAuthenticated()
+    if not IsInGroup().has_permission(drf_request, view):
+        raise exceptions.PermissionDenied()
+    return drf_request
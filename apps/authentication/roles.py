@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import RoleEpoch
+
+ROLE_CLAIM = 'role'
+EPOCH_CLAIM = 'role_epoch'
+
+
+def _epoch_key(user_id):
+    return f'role-epoch:{user_id}'
+
+
+def load_role_epoch(user_id):
+    """Época leída de la base; deja el valor en la caché."""
+    epoch = RoleEpoch.objects.filter(user_id=user_id).values_list('epoch', flat=True).first() or 0
+    cache.set(_epoch_key(user_id), epoch, getattr(settings, 'ROLE_EPOCH_CACHE_TIMEOUT', 60))
+    return epoch
+
+
+def get_role_epoch(user_id):
+    """Época actual de los grupos del usuario. Se cachea unos segundos para no
+    consultar la base en cada request (ROLE_EPOCH_CACHE_TIMEOUT)."""
+    epoch = cache.get(_epoch_key(user_id))
+    return load_role_epoch(user_id) if epoch is None else epoch
+
+
+def epoch_matches(user_id, epoch):
+    """True si la época del token es la actual. Un token más nuevo que la
+    caché (el rol cambió en otro worker y se volvió a iniciar sesión) se
+    compara con la base antes de rechazarlo."""
+    current = get_role_epoch(user_id)
+    if isinstance(epoch, int) and epoch > current:
+        current = load_role_epoch(user_id)
+    return epoch == current
+
+
+def bump_role_epoch(user):
+    """Invalida los roles de todos los tokens emitidos para el usuario."""
+    RoleEpoch.objects.get_or_create(user=user)
+    RoleEpoch.objects.filter(user=user).update(epoch=F('epoch') + 1)
+
+    key = _epoch_key(user.pk)
+    cache.delete(key)
+    # otra request pudo cachear la época anterior antes del commit
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def issue_tokens(user, role):
+    """Refresh token (y su access token) con el rol y la época firmados."""
+    refresh = RefreshToken.for_user(user)
+    refresh[ROLE_CLAIM] = role
+    # de la base: la caché de este worker puede no haber visto el último cambio
+    refresh[EPOCH_CLAIM] = load_role_epoch(user.pk)
+    return refresh
@@ -1,10 +1,14 @@
 from django.contrib.auth.models import User, Group
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenObtainSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from django.contrib.auth.models import update_last_login
 from rest_framework import serializers
 from django.contrib.auth.models import Group
 from django.db import IntegrityError
 from .models import EmailVerification
+from .roles import issue_tokens, bump_role_epoch
+from apps.administrator.namesGroup import resolve_role
 
 class EmailVerificationSerializer(serializers.ModelSerializer):
     user=serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
@@ -24,16 +28,26 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     group = serializers.CharField(write_only=True)
 
     def validate(self, attrs):
-        data = super().validate(attrs)
+        # solo autentica; los tokens se emiten abajo con el rol ya resuelto
+        data = TokenObtainSerializer.validate(self, attrs)
 
         user = self.user
         request_group = attrs.get('group')
 
-        if not user.groups.filter(name__iexact=request_group).exists():
+        group_name = user.groups.filter(name__iexact=request_group).values_list('name', flat=True).first()
+        if group_name is None:
             raise serializers.ValidationError({"group": f"{user}, no es - {request_group}"})
 
+        role = resolve_role(group_name)
+        refresh = issue_tokens(user, role)
+        data['refresh'] = str(refresh)
+        data['access'] = str(refresh.access_token)
+        data['role'] = role
+
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
+
         return data
-    pass
 
 class GroupSerializer(serializers.ModelSerializer):
     class Meta:
@@ -153,6 +167,8 @@ class UserSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError({'is_superuser': 'El usuario no puede ser superusuario si no está en el grupo Admin.'})
                          
         instance.groups.set([group_id])
+        # los tokens emitidos con el rol anterior dejan de autorizar
+        bump_role_epoch(instance)
                 
         instance.save()
         return instance
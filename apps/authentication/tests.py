@@ -1,3 +1,191 @@
-from django.test import TestCase
+import io
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User, Group
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.administrator import namesGroup
+from .serializers import UserSerializer
+from .models import OutboxEmail
+from . import outbox, roles
 
-# Create your tests here.
+
+class RoleClaimTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.grupo_alumno = Group.objects.create(name='Alumno')
+        self.grupo_tutor = Group.objects.create(name='tutor')
+        self.user = User.objects.create(username='ana', email='ana@ejemplo.com', first_name='Ana', last_name='Pérez')
+        self.user.set_password('clave-segura-123')
+        self.user.save()
+        self.user.groups.add(self.grupo_alumno)
+        self.client = APIClient()
+
+    def login(self, group='alumno'):
+        response = self.client.post('/api/token/', {
+            'username': 'ana', 'password': 'clave-segura-123', 'group': group
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_indice_de_alias(self):
+        self.assertEqual(namesGroup.resolve_role('ESTUDIANTES'), namesGroup.STUDENT)
+        self.assertEqual(namesGroup.resolve_role('Profesor'), namesGroup.TEACHER)
+        self.assertEqual(namesGroup.resolve_role('apoderado'), namesGroup.TUTOR)
+        self.assertIsNone(namesGroup.resolve_role('desconocido'))
+
+    def test_token_lleva_el_rol(self):
+        data = self.login()
+        self.assertEqual(data['role'], namesGroup.STUDENT)
+
+    def test_grupo_incorrecto(self):
+        response = self.client.post('/api/token/', {
+            'username': 'ana', 'password': 'clave-segura-123', 'group': 'tutor'
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('group', response.data)
+
+    def test_autoriza_sin_consultar_grupos(self):
+        data = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {data['access']}")
+
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get('/student/showtutor/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('auth_group' in query['sql'] for query in contexto.captured_queries))
+
+    def test_rol_distinto_no_autoriza(self):
+        data = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {data['access']}")
+        self.assertEqual(self.client.get('/tutor/student/').status_code, 403)
+
+    def test_cambio_de_grupo_invalida_el_token(self):
+        data = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {data['access']}")
+        self.assertEqual(self.client.get('/student/showtutor/').status_code, 200)
+
+        serializer = UserSerializer(self.user, data={'group': self.grupo_tutor.id}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        self.assertEqual(self.client.get('/student/showtutor/').status_code, 403)
+
+        # un nuevo inicio de sesión emite el rol actualizado
+        self.client.credentials()
+        data = self.login('tutor')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {data['access']}")
+        self.assertEqual(self.client.get('/tutor/student/').status_code, 200)
+
+
+    def test_cambio_de_rol_y_nuevo_inicio_con_cache_vieja(self):
+        self.login()
+        serializer = UserSerializer(self.user, data={'group': self.grupo_tutor.id}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        # otro worker guardó la época anterior en su caché local antes del cambio
+        cache.set(roles._epoch_key(self.user.pk), 0)
+
+        data = self.login('tutor')
+        self.assertEqual(AccessToken(data['access'])[roles.EPOCH_CLAIM], 1)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {data['access']}")
+        self.assertEqual(self.client.get('/tutor/student/').status_code, 200)
+
+        cache.set(roles._epoch_key(self.user.pk), 0)
+        self.assertEqual(self.client.get('/tutor/student/').status_code, 200)
+
+
+class CountingBackend(EmailBackend):
+    """locmem que cuenta las conexiones abiertas y falla para ciertos destinatarios."""
+    opened = 0
+    reject = set()
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.reject:
+                raise ConnectionError('destinatario rechazado')
+        return super().send_messages(messages)
+
+
+class UnreachableBackend(EmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('sin servidor de correo')
+
+
+class OutboxTestCase(TestCase):
+    def setUp(self):
+        CountingBackend.opened = 0
+        CountingBackend.reject = set()
+        self.user = User.objects.create(username='ana', email='ana@ejemplo.com')
+        self.client = APIClient()
+
+    def test_getcode_solo_encola(self):
+        response = self.client.post('/getcode/', {'email': 'ana@ejemplo.com'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mail.outbox, [])
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.to, ['ana@ejemplo.com'])
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+
+        call_command('send_outbox', '--once', stdout=io.StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('código de verificación', mail.outbox[0].body)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.SENT)
+        self.assertIsNotNone(email.sent_date)
+
+    @override_settings(EMAIL_BACKEND='apps.authentication.tests.CountingBackend')
+    def test_lote_por_una_conexion(self):
+        for i in range(5):
+            outbox.enqueue('asunto', 'cuerpo', 'escuela@ejemplo.com', [f'alumno{i}@ejemplo.com'])
+
+        self.assertEqual(outbox.deliver(batch_size=10), (5, 0))
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(outbox.deliver(), (0, 0))
+
+    @override_settings(EMAIL_BACKEND='apps.authentication.tests.CountingBackend', OUTBOX_MAX_ATTEMPTS=2)
+    def test_reintento_con_espera_y_fallo_final(self):
+        CountingBackend.reject = {'malo@ejemplo.com'}
+        bueno = outbox.enqueue('asunto', 'cuerpo', 'escuela@ejemplo.com', ['bueno@ejemplo.com'])
+        malo = outbox.enqueue('asunto', 'cuerpo', 'escuela@ejemplo.com', ['malo@ejemplo.com'])
+
+        self.assertEqual(outbox.deliver(), (1, 1))
+        malo.refresh_from_db()
+        self.assertEqual(malo.status, OutboxEmail.PENDING)
+        self.assertEqual(malo.attempts, 1)
+        self.assertIn('destinatario rechazado', malo.last_error)
+        self.assertGreater(malo.next_attempt, timezone.now() + timedelta(seconds=outbox.backoff(1) - 5))
+        # todavía no vence: no se reintenta
+        self.assertEqual(outbox.deliver(), (0, 0))
+
+        OutboxEmail.objects.filter(pk=malo.pk).update(next_attempt=timezone.now())
+        self.assertEqual(outbox.deliver(), (0, 1))
+        malo.refresh_from_db()
+        self.assertEqual(malo.status, OutboxEmail.FAILED)
+        bueno.refresh_from_db()
+        self.assertEqual(bueno.status, OutboxEmail.SENT)
+
+    @override_settings(EMAIL_BACKEND='apps.authentication.tests.UnreachableBackend')
+    def test_servidor_caido_pospone_el_lote(self):
+        for i in range(3):
+            outbox.enqueue('asunto', 'cuerpo', 'escuela@ejemplo.com', [f'alumno{i}@ejemplo.com'])
+
+        self.assertEqual(outbox.deliver(), (0, 3))
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.PENDING, attempts=1).count(), 3)
+
+    def test_espera_exponencial_acotada(self):
+        self.assertEqual([outbox.backoff(n) for n in (1, 2, 3)], [30, 60, 120])
+        self.assertEqual(outbox.backoff(20), 60 * 60)
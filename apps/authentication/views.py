@@ -1,5 +1,4 @@
 from django.db import transaction
-from django.core.mail import send_mail
 from django.conf import settings
 from datetime import timedelta
 from django.utils import timezone
@@ -13,13 +12,15 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.permissions import IsAdminUser
 from apps.tutor.models import Tutor
-from apps.administrator.namesGroup import AdminNames
+from apps.administrator.namesGroup import ROLE_NAMES, ADMIN
 from .serializers import EmailVerification, EmailVerificationSerializer
+from . import outbox
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
 class SendEmailCodeConfirmation(generics.GenericAPIView):
+    @transaction.atomic
     def post(self, request, *args, **kwargs):
         email = self.request.data.get('email')
         if not email:
@@ -58,10 +59,8 @@ class SendEmailCodeConfirmation(generics.GenericAPIView):
         email_from = settings.EMAIL_HOST_USER
         recipient_list = [user.email]
         
-        try:
-            send_mail(subject, message, email_from, recipient_list)
-        except Exception as e:
-            raise serializers.ValidationError({'error': f'Error al enviar el correo: {str(e)}'})
+        # solo se encola: el comando send_outbox lo envía fuera de la request
+        outbox.enqueue(subject, message, email_from, recipient_list)
         
 class ConfirmCodeEmail(generics.GenericAPIView):
     serializer_class = EmailVerificationSerializer
@@ -134,7 +133,7 @@ class  UserViewSet(viewsets.ModelViewSet):
         if user.is_superuser and User.objects.filter(is_superuser=True).count() == 1:
             return Response({'error': 'No se puede eliminar el único usuario administrador'}, status=status.HTTP_400_BAD_REQUEST)
 
-        ADMIN_NAME_SET = {name for name in AdminNames()}
+        ADMIN_NAME_SET = ROLE_NAMES[ADMIN]
         if user.groups.filter(name__iexact=ADMIN_NAME_SET).exists() and User.objects.filter(groups__name__iexact="admin").count() == 1:
             return Response(
                 {'error': 'No se puede eliminar el único usuario del grupo Admin.'}, 
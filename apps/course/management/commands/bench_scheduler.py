@@ -0,0 +1,44 @@
+import math
+from django.core.management.base import BaseCommand
+from apps.course import scheduler
+
+
+def synthetic(sections, courses, slots, overlapping=False):
+    """Problema sin base de datos: `sections` secciones, cada una con todos los cursos,
+    horarios de una hora y los profesores justos por curso más uno."""
+    per_course = math.ceil(sections / slots) + 1
+    eligible, teacher = {}, 0
+    for course in range(courses):
+        eligible[course] = list(range(teacher, teacher + per_course))
+        teacher += per_course
+    schedules = {slot: (420 + slot * 60, 480 + slot * 60) for slot in range(slots)}
+    if overlapping:
+        schedules.update({slots + slot: (450 + slot * 120, 570 + slot * 120) for slot in range(slots // 2)})
+    return scheduler.Problem(
+        cells=[(0, section, course) for section in range(sections) for course in range(courses)],
+        eligible=eligible,
+        slots=schedules,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Mide el generador de horarios con cientos de secciones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sections', default='10,100,300,600', help='tamaños separados por coma')
+        parser.add_argument('--courses', type=int, default=8)
+        parser.add_argument('--slots', type=int, default=9)
+        parser.add_argument('--overlapping', action='store_true', help='agrega horarios de dos horas que se traslapan')
+        parser.add_argument('--budget', type=float, default=10.0)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'secciones':>10}{'celdas':>10}{'sin asignar':>14}{'intentos':>10}{'segundos':>12}{'traslapes':>11}")
+        for size in [int(value) for value in options['sections'].split(',')]:
+            problem = synthetic(size, options['courses'], options['slots'], options['overlapping'])
+            solution = scheduler.solve(problem, budget=options['budget'], seed=options['seed'])
+            self.stdout.write(
+                f'{size:>10}{len(problem.cells):>10}{len(solution.unplaced):>14}'
+                f'{solution.attempts:>10}{solution.seconds:>12.3f}'
+                f'{scheduler.count_conflicts(problem, solution):>11}'
+            )
@@ -0,0 +1,50 @@
+from django.db.models import Q
+from django.core.management.base import BaseCommand
+from apps.administrator.bench import rollback, measure, report
+from apps.administrator.seed import seed_school
+from apps.course.models import TeacherCourseAssignment
+from apps.course import timetable
+
+
+def per_assignment(assignments):
+    """Validación como en el serializador anterior, pero por rango: una consulta
+    por asignación y recurso (profesor y grado/sección)."""
+    conflicts = 0
+    for assignment in assignments:
+        schedule = assignment.schedule
+        overlapping = TeacherCourseAssignment.objects.filter(
+            schedule__start_time__lt=schedule.end_time, schedule__end_time__gt=schedule.start_time
+        ).exclude(id=assignment.id)
+        conflicts += overlapping.filter(teacher_id=assignment.teacher_id).count()
+        conflicts += overlapping.filter(
+            Q(grade_id=assignment.grade_id) & Q(section_id=assignment.section_id)).count()
+    return conflicts
+
+
+class Command(BaseCommand):
+    help = 'Compara validar un horario completo consulta por consulta contra el barrido de intervalos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--courses', type=int, default=8)
+        parser.add_argument('--grades', type=int, default=6)
+        parser.add_argument('--sections', type=int, default=4)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        with rollback():
+            seed_school(students=options['students'], courses=options['courses'], teachers=options['courses'],
+                        grades=options['grades'], sections=options['sections'], with_notes=False)
+            assignments = list(TeacherCourseAssignment.objects.select_related('schedule'))
+            entries = [
+                {'id': a.id, 'teacher': a.teacher_id, 'course': a.course_id, 'grade': a.grade_id,
+                 'section': a.section_id, 'schedule': a.schedule_id}
+                for a in assignments
+            ]
+
+            report(self.stdout, f'{len(assignments)} asignaciones', [
+                ('consulta por asignación', *measure(lambda: per_assignment(assignments), options['repeat'])),
+                ('barrido (horario completo)', *measure(lambda: timetable.validate_timetable(entries), options['repeat'])),
+                ('barrido sin alumnos', *measure(
+                    lambda: timetable.find_conflicts(timetable.proposed_slots(entries)), options['repeat'])),
+            ], count=len(assignments))
@@ -0,0 +1,38 @@
+from itertools import product
+from django.core.management.base import BaseCommand, CommandError
+from apps.course import scheduler
+
+
+class Command(BaseCommand):
+    help = 'Genera las asignaciones de profesor, curso y horario que faltan sin traslapes y las guarda en bloque.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grade', type=int, action='append', help='grado a llenar (repetible)')
+        parser.add_argument('--section', type=int, action='append', help='sección a llenar (repetible)')
+        parser.add_argument('--course', type=int, action='append', help='curso a incluir (repetible), por defecto todos')
+        parser.add_argument('--budget', type=float, default=5.0, help='segundos de búsqueda')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--max-attempts', type=int)
+        parser.add_argument('--allow-partial', action='store_true', help='guardar aunque queden celdas sin asignar')
+        parser.add_argument('--dry-run', action='store_true', help='no guardar')
+
+    def handle(self, *args, **options):
+        if bool(options['grade']) != bool(options['section']):
+            raise CommandError('Indique --grade y --section juntos, o ninguno.')
+        groups = set(product(options['grade'], options['section'])) if options['grade'] else None
+
+        problem = scheduler.load_problem(groups, options['course'])
+        solution = scheduler.solve(problem, budget=options['budget'], seed=options['seed'],
+                                   max_attempts=options['max_attempts'])
+        self.stdout.write(
+            f'{len(solution.assignments)} asignaciones, {len(solution.unplaced)} sin asignar '
+            f'({solution.attempts} intentos, {solution.seconds:.2f}s)'
+        )
+        for grade, section, course in solution.unplaced:
+            self.stdout.write(f'  sin asignar: grado={grade} sección={section} curso={course}')
+
+        if solution.unplaced and not options['allow_partial']:
+            raise CommandError('No se encontró un horario completo; aumente --budget o use --allow-partial.')
+        if not options['dry_run']:
+            scheduler.save(solution)
+            self.stdout.write(self.style.SUCCESS('Asignaciones guardadas.'))
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0001_initial'),
+        ('grade', '0002_grade_grade_update_id_idx'),
+        ('section', '0002_section_section_update_id_idx'),
+        ('teacher', '0002_teacher_teacher_update_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['update_date', 'id'], name='course_update_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teachercourseassignment',
+            index=models.Index(fields=['update_time', 'id'], name='tca_update_id_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:30
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0002_course_course_update_id_idx_and_more'),
+        ('teacher', '0003_name_lower_uniq'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='course',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='course_name_lower_uniq'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from apps.teacher.models import Speciality, Teacher
 from apps.grade.models import Grade
 from apps.section.models import Section
@@ -23,6 +24,8 @@ class Course(models.Model):
     
     class Meta:
         db_table = 'course'
+        indexes = [models.Index(fields=['update_date', 'id'], name='course_update_id_idx')]
+        constraints = [models.UniqueConstraint(Lower('name'), name='course_name_lower_uniq')]
     
     def __str__(self): return f"{self.name}"
 
@@ -38,6 +41,7 @@ class TeacherCourseAssignment(models.Model):
     class Meta: 
         db_table = 'teacher_course_assignment'
         unique_together = ('course', 'grade', 'section', 'schedule')
+        indexes = [models.Index(fields=['update_time', 'id'], name='tca_update_id_idx')]
 
     def __str__(self):
         return f"{self.course} - {self.teacher} ({self.grade} {self.section} : {self.schedule})"
@@ -0,0 +1,265 @@
+"""Generador automático de horarios (TeacherCourseAssignment).
+
+Cada celda (grado, sección, curso) necesita un profesor con la especialidad
+del curso y un horario que no se traslape con otro curso de la sección ni con
+otra clase del profesor. Los horarios ocupados se guardan como máscaras de
+bits: cada horario tiene la máscara de los horarios con los que choca, así que
+comprobar si un horario está libre es un AND.
+
+La búsqueda es voraz (primero las celdas con menos profesores posibles); si
+una celda no cabe se intenta liberar un horario con un intercambio de Kempe, y
+si aun así quedan celdas se reinicia en otro orden aleatorio hasta agotar el
+tiempo. La semilla hace que el resultado sea reproducible. Las asignaciones ya guardadas se respetan como ocupadas.
+"""
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from django.db import transaction
+from apps.registration.models import CourseRegistration
+from apps.teacher.models import Teacher
+from .models import Course, CourseSchedule, TeacherCourseAssignment
+
+
+@dataclass
+class Problem:
+    # (grado, sección, curso) por asignar
+    cells: list
+    # curso -> [profesores con la especialidad]
+    eligible: dict
+    # horario -> (inicio, fin) en minutos
+    slots: dict
+    # ocupación ya guardada: [(profesor, grado, sección, horario)]
+    fixed: list = field(default_factory=list)
+
+
+@dataclass
+class Solution:
+    # [(grado, sección, curso, profesor, horario)]
+    assignments: list
+    # celdas sin asignar
+    unplaced: list
+    attempts: int
+    seconds: float
+
+    @property
+    def complete(self):
+        return not self.unplaced
+
+
+def conflict_masks(slots):
+    """{horario: máscara de bits de los horarios que se traslapan con él (incluido él)}."""
+    order = sorted(slots, key=lambda pk: slots[pk])
+    bits = {pk: 1 << index for index, pk in enumerate(order)}
+    masks = {pk: bits[pk] for pk in order}
+    # barrido por inicio: solo se comparan horarios que empiezan antes de que termine el actual
+    for index, pk in enumerate(order):
+        start, end = slots[pk]
+        for other in order[index + 1:]:
+            if slots[other][0] >= end:
+                break
+            masks[pk] |= bits[other]
+            masks[other] |= bits[pk]
+    return bits, masks
+
+
+class _State:
+    """Ocupación de una solución parcial: por profesor y por sección, qué celda
+    usa cada horario (None para las asignaciones ya guardadas, que no se mueven)."""
+
+    def __init__(self, problem, masks):
+        self.masks = masks
+        self.assignments = []
+        self.teacher_at = defaultdict(dict)
+        self.section_at = defaultdict(dict)
+        self.teacher_busy = defaultdict(int)
+        self.section_busy = defaultdict(int)
+        for teacher, grade, section, slot in problem.fixed:
+            self.occupy(None, teacher, (grade, section), slot)
+
+    def occupy(self, index, teacher, group, slot):
+        self.teacher_at[teacher][slot] = index
+        self.section_at[group][slot] = index
+        self.teacher_busy[teacher] |= self.masks[slot]
+        self.section_busy[group] |= self.masks[slot]
+
+    def place(self, grade, section, course, teacher, slot):
+        self.assignments.append([grade, section, course, teacher, slot])
+        self.occupy(len(self.assignments) - 1, teacher, (grade, section), slot)
+
+    def _refresh(self, teacher, group):
+        self.teacher_busy[teacher] = 0
+        for slot in self.teacher_at[teacher]:
+            self.teacher_busy[teacher] |= self.masks[slot]
+        self.section_busy[group] = 0
+        for slot in self.section_at[group]:
+            self.section_busy[group] |= self.masks[slot]
+
+    def swap_chain(self, teacher, a, b):
+        """Intercambia los horarios a y b en la cadena alterna que empieza en el
+        profesor con el horario a (cadena de Kempe). En un grafo bipartito la
+        cadena nunca llega a la sección que tiene a libre, así que al terminar el
+        profesor queda con a libre. Solo se usa con horarios que no se traslapan
+        con ningún otro; devuelve False si la cadena toca una asignación guardada."""
+        chain, vertex, color, on_teacher = [], teacher, a, True
+        while True:
+            table = self.teacher_at if on_teacher else self.section_at
+            index = table[vertex].get(color)
+            if index is None:
+                if color in table[vertex]:
+                    return False
+                break
+            chain.append(index)
+            grade, section, _, cell_teacher, _ = self.assignments[index]
+            vertex = (grade, section) if on_teacher else cell_teacher
+            color = b if color == a else a
+            on_teacher = not on_teacher
+
+        for index in chain:
+            grade, section, _, cell_teacher, slot = self.assignments[index]
+            del self.teacher_at[cell_teacher][slot]
+            del self.section_at[(grade, section)][slot]
+        for index in chain:
+            cell = self.assignments[index]
+            cell[4] = b if cell[4] == a else a
+            self.teacher_at[cell[3]][cell[4]] = index
+            self.section_at[(cell[0], cell[1])][cell[4]] = index
+        for index in chain:
+            grade, section, _, cell_teacher, _ = self.assignments[index]
+            self._refresh(cell_teacher, (grade, section))
+        return True
+
+
+def _repair(state, group, teachers, slots, bits, isolated):
+    """Cuando no hay profesor y horario libres a la vez, intenta liberar uno con
+    un intercambio de Kempe entre un horario libre de la sección (a) y uno libre
+    del profesor (b)."""
+    section_free = [slot for slot in slots if slot in isolated and not state.section_busy[group] & bits[slot]]
+    for teacher in teachers:
+        teacher_free = [slot for slot in slots if slot in isolated and not state.teacher_busy[teacher] & bits[slot]]
+        for a in section_free:
+            for b in teacher_free:
+                if a != b and state.swap_chain(teacher, a, b):
+                    return teacher, a
+    return None
+
+
+def _attempt(problem, bits, masks, rng, shuffle):
+    state = _State(problem, masks)
+    # horarios que no chocan con ningún otro: se pueden intercambiar sin revisar terceros
+    isolated = {slot for slot in problem.slots if masks[slot] == bits[slot]}
+
+    cells = list(problem.cells)
+    if shuffle:
+        rng.shuffle(cells)
+    # las celdas más restringidas primero; el orden aleatorio desempata
+    cells.sort(key=lambda cell: len(problem.eligible.get(cell[2], ())))
+    slots = sorted(problem.slots, key=lambda pk: problem.slots[pk])
+
+    unplaced = []
+    for grade, section, course in cells:
+        group = (grade, section)
+        busy = state.section_busy[group]
+        free = [slot for slot in slots if not busy & bits[slot]]
+        teachers = list(problem.eligible.get(course, ()))
+        if shuffle:
+            rng.shuffle(teachers)
+        teachers.sort(key=lambda teacher: len(state.teacher_at[teacher]))
+
+        choice = next(
+            ((teacher, slot) for teacher in teachers for slot in free if not state.teacher_busy[teacher] & bits[slot]),
+            None
+        )
+        if choice is None:
+            choice = _repair(state, group, teachers, slots, bits, isolated)
+        if choice is None:
+            unplaced.append((grade, section, course))
+            continue
+        state.place(grade, section, course, *choice)
+    return [tuple(cell) for cell in state.assignments], unplaced
+
+
+def solve(problem, budget=5.0, seed=0, max_attempts=None):
+    """Busca un horario sin traslapes; devuelve la mejor solución encontrada en `budget` segundos.
+
+    Con la misma semilla cada intento es idéntico; `max_attempts` fija además la
+    cantidad de intentos para que el resultado no dependa de la velocidad.
+    """
+    rng = random.Random(seed)
+    bits, masks = conflict_masks(problem.slots)
+    started = time.perf_counter()
+    best, attempts = None, 0
+    while True:
+        attempts += 1
+        assignments, unplaced = _attempt(problem, bits, masks, rng, shuffle=attempts > 1)
+        if best is None or len(unplaced) < len(best[1]):
+            best = (assignments, unplaced)
+        if not unplaced or time.perf_counter() - started >= budget:
+            break
+        if max_attempts and attempts >= max_attempts:
+            break
+    return Solution(best[0], best[1], attempts, time.perf_counter() - started)
+
+
+def count_conflicts(problem, solution):
+    """Traslapes de profesor o sección en la solución (incluidas las asignaciones guardadas)."""
+    bits, masks = conflict_masks(problem.slots)
+    busy, conflicts = defaultdict(int), 0
+    occupied = [(teacher, (grade, section), slot) for teacher, grade, section, slot in problem.fixed]
+    occupied += [(teacher, (grade, section), slot) for grade, section, _, teacher, slot in solution.assignments]
+    for teacher, group, slot in occupied:
+        for key in (('teacher', teacher), ('section', group)):
+            if busy[key] & bits[slot]:
+                conflicts += 1
+            busy[key] |= masks[slot]
+    return conflicts
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute + value.second / 60
+
+
+def load_problem(groups=None, course_ids=None):
+    """Arma el problema desde la base.
+
+    `groups` son los pares (grado, sección) a llenar; por defecto los que ya
+    tienen matrículas o asignaciones. Las celdas que ya tienen asignación no se
+    vuelven a generar.
+    """
+    if groups is None:
+        groups = set(CourseRegistration.objects.values_list('grade_id', 'section_id'))
+        groups |= set(TeacherCourseAssignment.objects.values_list('grade_id', 'section_id'))
+    courses = Course.objects.all() if course_ids is None else Course.objects.filter(id__in=course_ids)
+    courses = dict(courses.values_list('id', 'speciality_id'))
+
+    by_speciality = defaultdict(list)
+    for teacher_id, speciality_id in Teacher.speciality.through.objects.order_by('teacher_id').values_list(
+        'teacher_id', 'speciality_id'
+    ):
+        by_speciality[speciality_id].append(teacher_id)
+
+    existing = list(TeacherCourseAssignment.objects.values_list(
+        'teacher_id', 'grade_id', 'section_id', 'course_id', 'schedule_id'
+    ))
+    done = {(grade, section, course) for _, grade, section, course, _ in existing}
+    return Problem(
+        cells=[
+            (grade, section, course) for grade, section in sorted(groups) for course in sorted(courses)
+            if (grade, section, course) not in done
+        ],
+        eligible={course: by_speciality[speciality] for course, speciality in courses.items()},
+        slots={
+            pk: (_minutes(start), _minutes(end))
+            for pk, start, end in CourseSchedule.objects.values_list('id', 'start_time', 'end_time')
+        },
+        fixed=[(teacher, grade, section, slot) for teacher, grade, section, _, slot in existing],
+    )
+
+
+@transaction.atomic
+def save(solution):
+    return TeacherCourseAssignment.objects.bulk_create([
+        TeacherCourseAssignment(grade_id=grade, section_id=section, course_id=course, teacher_id=teacher,
+                                schedule_id=slot)
+        for grade, section, course, teacher, slot in solution.assignments
+    ], batch_size=1000)
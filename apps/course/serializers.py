@@ -1,8 +1,13 @@
 from rest_framework import serializers
 from django.db import transaction, IntegrityError
-from .models import Course, CourseSchedule, TeacherCourseAssignment, Grade
-from apps.teacher.models import Speciality, Teacher
+from .models import Course, CourseSchedule, TeacherCourseAssignment
+from apps.teacher.models import Teacher
 from apps.registration.models import CourseRegistration
+from apps.administrator import refcache
+from apps.administrator.refcache import CachedPrimaryKeyRelatedField
+from . import timetable
+from apps.administrator.integrity import violates
+from school_api.sparse import SparseFieldsMixin, Eager
 
 class CourseofStudent(serializers.ModelSerializer):
     teacher = serializers.SerializerMethodField()  
@@ -47,12 +52,14 @@ class CourseofStudent(serializers.ModelSerializer):
     def get_schedule(self, obj):
         teacher_course_assignment = obj.teacher_course_assignment.first()
         if teacher_course_assignment:
-            return str(teacher_course_assignment.schedule)
+            return refcache.display('schedule', teacher_course_assignment.schedule_id)
         return None
 
 
-class CourseSerializer(serializers.ModelSerializer):
-    speciality = serializers.PrimaryKeyRelatedField(queryset=Speciality.objects.all(), required=True)
+class CourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    speciality = CachedPrimaryKeyRelatedField('speciality', required=True)
+    # el nombre sale de refcache, sin consulta
+    expandable_fields = {'speciality': Eager()}
 
     class Meta:
         model = Course
@@ -67,54 +74,63 @@ class CourseSerializer(serializers.ModelSerializer):
         super(CourseSerializer, self).__init__(*args, **kwargs)
         
         if self.instance:
-            for field in ['name', 'speciality']:
+            # con ?fields= algunos campos no están
+            for field in [name for name in ['name', 'speciality'] if name in self.fields]:
                 self.fields[field].required = False
                 self.fields[field].allow_blank = True
 
 
-    def validate(self, data):
-        name = data.get('name')
-        instance = self.instance 
-        
-        if instance:
-            # Verifica si el nombre ya existe
-            if name and Course.objects.filter(name__iexact=name).exclude(id=instance.id).exists():
-                raise serializers.ValidationError({'error': f'el curso {name} ya existe'})
-        else:
-            if name and Course.objects.filter(name__iexact=name).exists():
-                raise serializers.ValidationError({'error': f"curso: {name} ya existe."})
-        return data
-    
-    @transaction.atomic
+    # el nombre único (sin importar mayúsculas) lo garantiza course_name_lower_uniq
     def create(self, validated_data):
-        return super().create(validated_data)
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError as e:
+            if violates(e, 'course_name_lower_uniq'):
+                raise serializers.ValidationError({'error': f"curso: {validated_data['name']} ya existe."})
+            raise serializers.ValidationError({'error': 'Error de integridad: ' + str(e)})
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError as e:
+            if violates(e, 'course_name_lower_uniq'):
+                raise serializers.ValidationError({'error': f"el curso {validated_data['name']} ya existe"})
+            raise serializers.ValidationError({'error': 'Error de integridad: ' + str(e)})
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        if instance.speciality: 
-            representation['speciality'] = {instance.speciality.name}
+        speciality = refcache.get('speciality', instance.speciality_id) if self.expanded('speciality') else None
+        if speciality:
+            representation['speciality'] = {speciality.name}
         
-        representation['creation_date'] = instance.creation_date.strftime('%Y-%m-%d %H:%M:%S')
-        representation['update_date'] = instance.update_date.strftime('%Y-%m-%d %H:%M:%S')
+        for date in ['creation_date', 'update_date']:
+            if date in representation:
+                representation[date] = getattr(instance, date).strftime('%Y-%m-%d %H:%M:%S')
 
         return representation
 
 
-class CourseScheduleSerializer(serializers.ModelSerializer):
+class CourseScheduleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = CourseSchedule
         fields = '__all__'
 
-class TeacherCourseAssignmentSerializer(serializers.ModelSerializer):
+class TeacherCourseAssignmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     teacher = serializers.PrimaryKeyRelatedField(queryset=Teacher.objects.all(), required=True)
     course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all(), required=True)
-    grade = serializers.PrimaryKeyRelatedField(queryset=Grade.objects.all(), required=True)
-    schedule = serializers.PrimaryKeyRelatedField(queryset=CourseSchedule.objects.all(), required=True)
+    grade = CachedPrimaryKeyRelatedField('grade', required=True)
+    section = CachedPrimaryKeyRelatedField('section', required=True)
+    schedule = CachedPrimaryKeyRelatedField('schedule', required=True)
+    expandable_fields = {name: Eager(select=(name,)) for name in ['teacher', 'course', 'grade', 'section', 'schedule']}
 
     class Meta:
         model = TeacherCourseAssignment
         fields = ['id', 'teacher', 'course', 'grade', 'section', 'schedule', 'create_time', 'update_time']
         read_only_fields = ['id', 'create_time', 'update_time']
+        # unique_together se revisa en validate(), después de timetable, para dar el mensaje por campo
+        validators = []
     
     def validate(self, data):
             instance = self.instance  # Puede ser None si es una creación
@@ -126,26 +142,45 @@ class TeacherCourseAssignmentSerializer(serializers.ModelSerializer):
 
             # Validar que el profesor tenga la especialidad requerida para el curso
             if teacher and course:
-                if not teacher.speciality.filter(id=course.speciality.id).exists():
-                    raise serializers.ValidationError(
-                        f"El profesor {teacher.name} no está especializado en {course.speciality.name}."
-                    )
-
-            # Validar traslape de horarios
-            if teacher and schedule and grade and section:
-                overlapping_assignment = TeacherCourseAssignment.objects.filter(
-                    teacher=teacher,
-                    schedule=schedule,
-                    grade=grade,
-                    section=section
-                ).exclude(id=instance.id if instance else None)
-
-                if overlapping_assignment.exists():
-                    raise serializers.ValidationError(
-                        f"El profesor {teacher.name} ya tiene una asignación en el horario {schedule} para {grade} {section}."
-                    )
+                if not teacher.speciality.filter(id=course.speciality_id).exists():
+                    raise serializers.ValidationError({'teacher':
+                        f"El profesor {teacher.name} no está especializado en {refcache.get('speciality', course.speciality_id).name}."
+                    })
+
+            # Validar traslape de horarios con profesor, grado/sección y alumnos
+            if teacher and course and schedule and grade and section:
+                slot = timetable.Slot(
+                    'p0', instance.id if instance else None,
+                    teacher.id, course.id, grade.id, section.id, schedule.id
+                )
+                try:
+                    conflicts = timetable.conflicts_for(slot)
+                except timetable.TimetableError as e:
+                    raise serializers.ValidationError({'schedule': str(e)})
+                for conflict in conflicts:
+                    other = conflict.second if conflict.first == slot else conflict.first
+                    raise serializers.ValidationError({'schedule': self.conflict_message(conflict, other, teacher)})
+
+            # unique_together del modelo
+            if course and schedule and grade and section:
+                duplicated = TeacherCourseAssignment.objects.filter(course=course, grade=grade, section=section, schedule=schedule)
+                if instance:
+                    duplicated = duplicated.exclude(pk=instance.pk)
+                if duplicated.exists():
+                    raise serializers.ValidationError({'schedule': 'Ya existe una asignación de este curso en el mismo grado, sección y horario.'})
 
             return data
+
+    @staticmethod
+    def conflict_message(conflict, other, teacher):
+        schedule = refcache.display('schedule', other.schedule_id)
+        grade = refcache.get('grade', other.grade_id)
+        section = refcache.get('section', other.section_id)
+        if conflict.resource == timetable.TEACHER:
+            return f"El profesor {teacher.name} ya tiene una asignación en el horario {schedule} para {grade} {section}."
+        if conflict.resource == timetable.SECTION:
+            return f"{grade} {section} ya tiene un curso en el horario {schedule}."
+        return f"Un alumno matriculado en esta asignación ya tiene un curso en el horario {schedule}."
     
     @transaction.atomic
     def create(self, validated_data):
@@ -169,16 +204,16 @@ class TeacherCourseAssignmentSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         representation =  super().to_representation(instance)
 
-        if instance.teacher: representation['teacher'] = {instance.teacher.name}
-        if instance.course: representation['course'] = {instance.course.name}
-        if instance.grade: representation['grade'] = {instance.grade.name}
-        if instance.section: representation['section'] = {instance.section.name}
-        if  instance.schedule: representation['schedule'] = {
+        for name in ['teacher', 'course', 'grade', 'section']:
+            related = getattr(instance, name) if self.expanded(name) else None
+            if related: representation[name] = {related.name}
+        if self.expanded('schedule') and instance.schedule: representation['schedule'] = {
             'start_time': instance.schedule.start_time.strftime('%H:%M'),
             'end_time': instance.schedule.end_time.strftime('%H:%M')
         }
 
-        representation['create_time'] = instance.create_time.strftime('%Y-%m-%d %H:%M:%S')
-        representation['update_time'] = instance.update_time.strftime('%Y-%m-%d %H:%M:%S')
+        for date in ['create_time', 'update_time']:
+            if date in representation:
+                representation[date] = getattr(instance, date).strftime('%Y-%m-%d %H:%M:%S')
 
         return representation
\ No newline at end of file
@@ -1,12 +1,22 @@
+import io
+from unittest import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 from django.contrib.auth.models import User
 from apps.teacher.models import Teacher
 from apps.grade.models import Grade
 from apps.section.models import Section
 from apps.course.models import Course, Speciality, CourseSchedule, TeacherCourseAssignment
+from apps.registration.models import CourseRegistration
+from apps.student.models import Student
+from apps.tutor.models import Tutor
 from rest_framework.exceptions import ValidationError
 from datetime import time
+from rest_framework.test import APIClient
 from .serializers import TeacherCourseAssignmentSerializer
+from . import scheduler, timetable
+from apps.administrator import refcache
 
 class TeacherCourseAssignmentSerializerTestCase(TestCase):
     def setUp(self):
@@ -64,6 +74,55 @@ class TeacherCourseAssignmentSerializerTestCase(TestCase):
             f"El profesor {self.profesor_juan.name} no está especializado en {curso_historia.speciality.name}."
         )
 
+    def test_horario_creado_sin_senal(self):
+        horario = CourseSchedule.objects.bulk_create([CourseSchedule(start_time=time(13, 0), end_time=time(14, 0))])[0]
+        data = {
+            'teacher': self.profesor_juan.id,
+            'course': self.curso_matematicas.id,
+            'grade': self.grado_1.id,
+            'section': self.seccion_a.id,
+            'schedule': horario.id
+        }
+        serializer = TeacherCourseAssignmentSerializer(data=data)
+        # copia de la caché de referencia anterior al bulk_create (no dispara señales)
+        table = refcache.table
+        stale = lambda label: {pk: row for pk, row in table(label).items() if (label, pk) != ('schedule', horario.id)}
+        with mock.patch.object(refcache, 'table', side_effect=stale):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_error_de_horario_es_de_validacion(self):
+        data = {
+            'teacher': self.profesor_juan.id,
+            'course': self.curso_matematicas.id,
+            'grade': self.grado_1.id,
+            'section': self.seccion_a.id,
+            'schedule': self.horario_7_9.id
+        }
+        serializer = TeacherCourseAssignmentSerializer(data=data)
+        with mock.patch.object(timetable, 'conflicts_for', side_effect=timetable.TimetableError('No existe el horario 1.')):
+            self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['schedule'][0], 'No existe el horario 1.')
+
+    def test_unique_together_sin_timetable(self):
+        TeacherCourseAssignment.objects.create(
+            teacher=self.profesor_juan, course=self.curso_matematicas,
+            grade=self.grado_1, section=self.seccion_a, schedule=self.horario_7_9
+        )
+        data = {
+            'teacher': self.profesor_juan.id,
+            'course': self.curso_matematicas.id,
+            'grade': self.grado_1.id,
+            'section': self.seccion_a.id,
+            'schedule': self.horario_7_9.id
+        }
+        serializer = TeacherCourseAssignmentSerializer(data=data)
+        with mock.patch.object(timetable, 'conflicts_for', return_value=[]):
+            self.assertFalse(serializer.is_valid())
+        self.assertEqual(
+            serializer.errors['schedule'][0],
+            'Ya existe una asignación de este curso en el mismo grado, sección y horario.'
+        )
+
     def test_crear_asignacion_con_traslape_de_horario(self):
         # Crear una asignación inicial
         TeacherCourseAssignment.objects.create(
@@ -173,3 +232,128 @@ class TeacherCourseAssignmentSerializerTestCase(TestCase):
         updated_assignment = serializer.save()
         self.assertEqual(updated_assignment.teacher, profesor_maria)
         self.assertEqual(updated_assignment.schedule, self.horario_11_12)
+
+
+class TimetableTestCase(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', email='admin@ejemplo.com', is_staff=True)
+        self.especialidad = Speciality.objects.create(name='Matemáticas')
+        self.profesor = Teacher.objects.create(user=User.objects.create(username='juan', email='juan@ejemplo.com'),
+                                               name='Profesor Juan')
+        self.profesor.speciality.add(self.especialidad)
+        self.grado = Grade.objects.create(name='1° básico')
+        self.seccion_a = Section.objects.create(name='A')
+        self.seccion_b = Section.objects.create(name='B')
+        self.curso = Course.objects.create(name='Matemáticas', speciality=self.especialidad)
+        self.horario_7_9 = CourseSchedule.objects.create(start_time=time(7, 0), end_time=time(9, 0))
+        self.horario_8_10 = CourseSchedule.objects.create(start_time=time(8, 0), end_time=time(10, 0))
+        self.horario_9_10 = CourseSchedule.objects.create(start_time=time(9, 0), end_time=time(10, 0))
+        self.asignacion = TeacherCourseAssignment.objects.create(
+            teacher=self.profesor, course=self.curso, grade=self.grado, section=self.seccion_a, schedule=self.horario_7_9
+        )
+
+    def datos(self, seccion, horario):
+        return {'teacher': self.profesor.id, 'course': self.curso.id, 'grade': self.grado.id,
+                'section': seccion.id, 'schedule': horario.id}
+
+    def test_rangos_traslapados_con_otro_horario(self):
+        serializer = TeacherCourseAssignmentSerializer(data=self.datos(self.seccion_b, self.horario_8_10))
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('schedule', serializer.errors)
+
+    def test_rangos_contiguos_no_chocan(self):
+        serializer = TeacherCourseAssignmentSerializer(data=self.datos(self.seccion_b, self.horario_9_10))
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_traslape_de_alumno_en_otra_seccion(self):
+        tutor = Tutor.objects.create(user=User.objects.create(username='tutor', email='t@ejemplo.com'),
+                                     name='Tutor', phone='5555', address='zona 1')
+        alumno = Student.objects.create(user=User.objects.create(username='ana', email='a@ejemplo.com'), name='Ana',
+                                        phone='5555', birthdate='2012-01-01', address='zona 1',
+                                        emergency_contact='5555', tutor=tutor)
+        otro = Teacher.objects.create(user=User.objects.create(username='eva', email='e@ejemplo.com'), name='Eva')
+        otra = TeacherCourseAssignment.objects.create(
+            teacher=otro, course=self.curso, grade=self.grado, section=self.seccion_b, schedule=self.horario_9_10
+        )
+        matricula = CourseRegistration.objects.create(student=alumno, grade=self.grado, section=self.seccion_a)
+        matricula.teacher_course_assignment.set([self.asignacion, otra])
+
+        conflictos = timetable.validate_timetable([{
+            'id': otra.id, 'teacher': otro.id, 'course': self.curso.id, 'grade': self.grado.id,
+            'section': self.seccion_b.id, 'schedule': self.horario_8_10.id
+        }])
+        self.assertEqual([(c.resource, c.key) for c in conflictos], [(timetable.STUDENT, alumno.id)])
+
+    def test_validar_horario_completo_por_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        propuesta = [self.datos(self.seccion_b, self.horario_8_10), self.datos(self.seccion_b, self.horario_9_10)]
+
+        with self.assertNumQueries(3):
+            response = client.post('/ad/timetable/validate/', {'assignments': propuesta}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['valid'])
+        pares = {(c['resource'], c['first'], c['second']) for c in response.data['conflicts']}
+        self.assertEqual(pares, {
+            ('teacher', str(self.asignacion.id), 'p0'), ('teacher', 'p0', 'p1'), ('section', 'p0', 'p1'),
+        })
+
+        response = client.post('/ad/timetable/validate/', {'assignments': propuesta, 'replace': True}, format='json')
+        self.assertEqual(len(response.data['conflicts']), 2)
+
+        response = client.post('/ad/timetable/validate/', {'assignments': [{'teacher': 'x'}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class SchedulerTestCase(TestCase):
+    def setUp(self):
+        self.grado = Grade.objects.create(name='1° básico')
+        self.secciones = [Section.objects.create(name=name) for name in 'ABC']
+        self.horarios = [CourseSchedule.objects.create(start_time=time(7 + i, 0), end_time=time(8 + i, 0))
+                         for i in range(4)]
+        self.cursos = []
+        for i, nombre in enumerate(['Matemáticas', 'Historia', 'Física']):
+            especialidad = Speciality.objects.create(name=nombre)
+            self.cursos.append(Course.objects.create(name=nombre, speciality=especialidad))
+            for j in range(2):
+                profesor = Teacher.objects.create(
+                    user=User.objects.create(username=f'p{i}{j}', email=f'p{i}{j}@ejemplo.com'), name=f'Profesor {i}{j}')
+                profesor.speciality.add(especialidad)
+        self.grupos = {(self.grado.id, seccion.id) for seccion in self.secciones}
+
+    def test_genera_horario_completo_sin_traslapes(self):
+        problema = scheduler.load_problem(self.grupos)
+        solucion = scheduler.solve(problema, budget=1, seed=0)
+        self.assertTrue(solucion.complete)
+
+        # un solo INSERT dentro del savepoint
+        with self.assertNumQueries(3):
+            scheduler.save(solucion)
+        self.assertEqual(TeacherCourseAssignment.objects.count(), 9)
+        self.assertEqual(timetable.validate_timetable([]), [])
+        for asignacion in TeacherCourseAssignment.objects.select_related('teacher', 'course'):
+            self.assertTrue(asignacion.teacher.speciality.filter(id=asignacion.course.speciality_id).exists())
+
+    def test_misma_semilla_mismo_resultado(self):
+        problema = scheduler.load_problem(self.grupos)
+        primera = scheduler.solve(problema, seed=7, max_attempts=3)
+        segunda = scheduler.solve(problema, seed=7, max_attempts=3)
+        self.assertEqual(primera.assignments, segunda.assignments)
+
+    def test_respeta_asignaciones_guardadas(self):
+        profesor = Teacher.objects.filter(speciality=self.cursos[0].speciality).first()
+        TeacherCourseAssignment.objects.create(teacher=profesor, course=self.cursos[0], grade=self.grado,
+                                               section=self.secciones[0], schedule=self.horarios[0])
+        problema = scheduler.load_problem(self.grupos)
+        self.assertEqual(len(problema.cells), 8)
+
+        scheduler.save(scheduler.solve(problema, budget=1))
+        self.assertEqual(TeacherCourseAssignment.objects.count(), 9)
+        self.assertEqual(timetable.validate_timetable([]), [])
+
+    def test_comando_sin_solucion_completa(self):
+        CourseSchedule.objects.exclude(id=self.horarios[0].id).delete()
+        with self.assertRaises(CommandError):
+            call_command('generate_timetable', '--grade', str(self.grado.id), '--section', str(self.secciones[0].id),
+                         '--budget', '0.1', stdout=io.StringIO())
+        self.assertFalse(TeacherCourseAssignment.objects.exists())
@@ -0,0 +1,181 @@
+"""Detección de traslapes de horario entre asignaciones de cursos.
+
+Cada asignación ocupa el intervalo [inicio, fin) de su horario en tres tipos de
+recurso: su profesor, su grado/sección y cada alumno matriculado en ella. Los
+intervalos de cada recurso se ordenan por inicio y se recorren una vez
+manteniendo un heap con los que siguen abiertos, así que validar un horario
+completo cuesta O(n log n + conflictos) y dos consultas (asignaciones y
+matrículas), sin importar cuántas asignaciones se propongan.
+"""
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass
+from django.db.models import Q
+from apps.administrator import refcache
+from apps.registration.models import CourseRegistration
+from .models import TeacherCourseAssignment
+
+TEACHER = 'teacher'
+SECTION = 'section'
+STUDENT = 'student'
+# orden en que se informan los conflictos de una misma asignación
+RESOURCES = (TEACHER, SECTION, STUDENT)
+
+
+class TimetableError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Slot:
+    """Asignación existente (`id`) o propuesta (`ref` = 'p<posición>')."""
+    ref: str
+    id: int
+    teacher_id: int
+    course_id: int
+    grade_id: int
+    section_id: int
+    schedule_id: int
+
+
+@dataclass(frozen=True)
+class Conflict:
+    resource: str
+    # id del profesor o alumno, o (grado, sección)
+    key: object
+    first: Slot
+    second: Slot
+
+    def as_dict(self):
+        return {
+            'resource': self.resource,
+            'key': list(self.key) if isinstance(self.key, tuple) else self.key,
+            'first': self.first.ref,
+            'second': self.second.ref,
+            'first_schedule': self.first.schedule_id,
+            'second_schedule': self.second.schedule_id,
+        }
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute + value.second / 60
+
+
+def intervals(schedule_ids):
+    """{schedule_id: (inicio, fin)} en minutos desde la caché de referencia
+    (los horarios que no están en la copia se buscan en la base)."""
+    schedules = refcache.many('schedule', set(schedule_ids))
+    missing = set(schedule_ids) - set(schedules)
+    if missing:
+        raise TimetableError(f'No existe el horario {", ".join(str(pk) for pk in sorted(missing))}.')
+    return {
+        pk: (_minutes(schedules[pk].start_time), _minutes(schedules[pk].end_time))
+        for pk in set(schedule_ids)
+    }
+
+
+def sweep(items):
+    """items: (inicio, fin, slot) de un mismo recurso. Genera cada par que se traslapa.
+
+    Intervalos semiabiertos: 7:00-9:00 y 9:00-10:00 no chocan.
+    """
+    active = []
+    for order, (start, end, slot) in enumerate(sorted(items, key=lambda item: (item[0], item[1]))):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, _, other in active:
+            yield other, slot
+        heapq.heappush(active, (end, order, slot))
+
+
+def find_conflicts(slots, students=None):
+    """Conflictos entre todas las asignaciones dadas.
+
+    `students` es {id de asignación: [ids de alumnos]} para revisar también a
+    los alumnos; las propuestas sin id no tienen alumnos todavía.
+    """
+    times = intervals([slot.schedule_id for slot in slots])
+    resources = defaultdict(list)
+    for slot in slots:
+        start, end = times[slot.schedule_id]
+        resources[(TEACHER, slot.teacher_id)].append((start, end, slot))
+        resources[(SECTION, (slot.grade_id, slot.section_id))].append((start, end, slot))
+        for student_id in (students or {}).get(slot.id, ()):
+            resources[(STUDENT, student_id)].append((start, end, slot))
+
+    conflicts = []
+    for (resource, key), items in resources.items():
+        if len(items) > 1:
+            conflicts.extend(Conflict(resource, key, first, second) for first, second in sweep(items))
+    conflicts.sort(key=lambda conflict: (RESOURCES.index(conflict.resource), conflict.first.ref, conflict.second.ref))
+    return conflicts
+
+
+def existing_slots(queryset=None, exclude_ids=()):
+    queryset = TeacherCourseAssignment.objects.all() if queryset is None else queryset
+    rows = queryset.exclude(id__in=exclude_ids).values_list(
+        'id', 'teacher_id', 'course_id', 'grade_id', 'section_id', 'schedule_id'
+    )
+    return [Slot(str(row[0]), *row) for row in rows]
+
+
+def enrolled_students(student_ids=None):
+    """{id de asignación: [ids de alumnos]} en una consulta."""
+    through = CourseRegistration.teacher_course_assignment.through
+    rows = through.objects.all()
+    if student_ids is not None:
+        rows = rows.filter(courseregistration__student_id__in=student_ids)
+    students = defaultdict(list)
+    for assignment_id, student_id in rows.values_list('teachercourseassignment_id', 'courseregistration__student_id'):
+        students[assignment_id].append(student_id)
+    return students
+
+
+def proposed_slots(entries):
+    """Convierte las filas propuestas ({id?, teacher, course, grade, section, schedule}) en Slots."""
+    slots = []
+    for position, entry in enumerate(entries):
+        try:
+            slots.append(Slot(
+                f'p{position}', int(entry['id']) if entry.get('id') else None,
+                *(int(entry[name]) for name in ('teacher', 'course', 'grade', 'section', 'schedule'))
+            ))
+        except (KeyError, TypeError, ValueError):
+            raise TimetableError(
+                f'Fila {position}: teacher, course, grade, section y schedule deben ser números enteros.'
+            )
+    return slots
+
+
+def validate_timetable(entries, replace=False):
+    """Valida un horario propuesto completo junto con las asignaciones guardadas.
+
+    Las propuestas con id reemplazan a esa asignación guardada. Con `replace`
+    solo se revisan las propuestas entre sí (el horario propuesto sustituye al
+    actual). Devuelve la lista de conflictos.
+    """
+    proposed = proposed_slots(entries)
+    current = [] if replace else existing_slots(exclude_ids=[slot.id for slot in proposed if slot.id])
+    return find_conflicts(current + proposed, enrolled_students())
+
+
+def conflicts_for(slot):
+    """Conflictos de una sola asignación (nueva o modificada) contra las guardadas.
+
+    Solo se cargan las asignaciones que comparten profesor, grado/sección o
+    alumnos con ella (tres consultas).
+    """
+    student_ids = []
+    if slot.id:
+        student_ids = list(CourseRegistration.objects.filter(
+            teacher_course_assignment=slot.id).values_list('student_id', flat=True))
+    related = TeacherCourseAssignment.objects.filter(
+        Q(teacher_id=slot.teacher_id) | Q(grade_id=slot.grade_id, section_id=slot.section_id)
+        | Q(courseregistration__student_id__in=student_ids)
+    ).distinct()
+    current = existing_slots(related, exclude_ids=[slot.id] if slot.id else [])
+    students = enrolled_students(student_ids) if student_ids else {}
+    return [
+        conflict for conflict in find_conflicts(current + [slot], students)
+        if slot in (conflict.first, conflict.second)
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grade', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['update_date', 'id'], name='grade_update_id_idx'),
+        ),
+    ]
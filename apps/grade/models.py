@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 
 class Grade(models.Model):
     name = models.CharField(max_length=255)
@@ -8,5 +9,7 @@ class Grade(models.Model):
 
     class Meta: 
         db_table = 'grade'
+        indexes = [models.Index(fields=['update_date', 'id'], name='grade_update_id_idx')]
+        constraints = [models.UniqueConstraint(Lower('name'), name='grade_name_lower_uniq')]
     
     def __str__(self): return self.name
\ No newline at end of file
@@ -1,9 +1,12 @@
 from rest_framework import serializers
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from rest_framework.settings import api_settings
 from .models import Grade
+from apps.administrator.integrity import violates
+from school_api.sparse import SparseFieldsMixin
 
 
-class GradeSerializer(serializers.ModelSerializer):
+class GradeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Grade
         fields = ['id', 'name', 'description', 'creation_date', 'update_date']
@@ -12,34 +15,32 @@ class GradeSerializer(serializers.ModelSerializer):
             'name': {'required': True}
         }
 
-    def validate(self, data):
-        instance = self.instance
-        name = data.get('name', instance.name if instance else None)
-        description = data.get('description', instance.description if instance else None)
-
-        if not instance:
-            if name and Grade.objects.filter(name__iexact=name).exists():
-                raise serializers.ValidationError(f'El grado: {name} ya existe.')
-
-        else:
-            if name and Grade.objects.filter(name__iexact=name).exclude(id=instance.id).exists():
-                raise serializers.ValidationError(f'{name} ya existe.')
-            
-        return data
-    
+    # el nombre único (sin importar mayúsculas) lo garantiza grade_name_lower_uniq
     def create(self, validated_data):
         try:
-            grade = Grade.objects.create(**validated_data)
-            grade.save()
+            with transaction.atomic():
+                grade = Grade.objects.create(**validated_data)
             return grade
         except IntegrityError as e:
+            if violates(e, 'grade_name_lower_uniq'):
+                raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [f"El grado: {validated_data['name']} ya existe."]})
             raise serializers.ValidationError({'error': 'Error de integridad'+str(e)})
-        except ValueError: 
+        except ValueError as e:
             raise serializers.ValidationError({'error': 'Error de valor: ' + str(e)})
 
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError as e:
+            if violates(e, 'grade_name_lower_uniq'):
+                raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [f"{validated_data['name']} ya existe."]})
+            raise serializers.ValidationError({'error': 'Error de integridad'+str(e)})
+
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        representation['creation_date'] = instance.creation_date.strftime('%Y-%m-%d %H:%M:%S')
-        representation['update_date'] = instance.update_date.strftime('%Y-%m-%d %H:%M:%S')
+        for date in ['creation_date', 'update_date']:
+            if date in representation:
+                representation[date] = getattr(instance, date).strftime('%Y-%m-%d %H:%M:%S')
         return representation
\ No newline at end of file
@@ -1,3 +1,38 @@
 from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from .models import Grade
 
-# Create your tests here.
+
+class GradeNameUniqueTestCase(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', email='admin@ejemplo.com', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        Grade.objects.create(name='Primero')
+
+    def test_nombre_repetido_sin_importar_mayusculas(self):
+        response = self.client.post('/ad/grade/', {'name': 'PRIMERO'}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['non_field_errors'], ['El grado: PRIMERO ya existe.'])
+        self.assertEqual(Grade.objects.count(), 1)
+
+    def test_renombrar_a_nombre_existente(self):
+        segundo = Grade.objects.create(name='Segundo')
+        response = self.client.patch(f'/ad/grade/{segundo.id}/', {'name': 'primero'}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['non_field_errors'], ['primero ya existe.'])
+        segundo.refresh_from_db()
+        self.assertEqual(segundo.name, 'Segundo')
+
+    def test_sin_consulta_previa_por_nombre(self):
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.post('/ad/grade/', {'name': 'Tercero'}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        # la unicidad la revisa el índice LOWER(name), no un SELECT ... LIKE antes del INSERT
+        self.assertFalse(any('LIKE' in query['sql'].upper() for query in contexto.captured_queries))
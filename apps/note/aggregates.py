@@ -0,0 +1,198 @@
+"""Mantenimiento incremental de NoteAggregate.
+
+Cada nota suma (1, nota, aprobada) a la fila de su clave
+(alumno, curso, grado, sección). Al crear, modificar o borrar una nota se
+aplica la diferencia con UPDATE ... SET count = count + n, sin recalcular.
+rebuild() recalcula todo con una consulta agrupada y check() compara lo
+guardado con ese recálculo.
+
+Cambiar el grado/sección de una asignación no mueve los acumulados
+existentes; en ese caso se corre rebuild_gradebook.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction, IntegrityError
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from apps.course.models import TeacherCourseAssignment
+from .models import Note, NoteAggregate
+
+ZERO = Decimal('0')
+
+
+def resolve_groups(pairs):
+    """{(teacher_id, course_id): (grade_id, section_id)} con la primera asignación por id."""
+    resolved = dict.fromkeys(pairs, (None, None))
+    if not pairs:
+        return resolved
+    assignments = TeacherCourseAssignment.objects.filter(
+        teacher_id__in={teacher for teacher, _ in pairs},
+        course_id__in={course for _, course in pairs}
+    ).order_by('-id').values_list('teacher_id', 'course_id', 'grade_id', 'section_id')
+    for teacher_id, course_id, grade_id, section_id in assignments:
+        if (teacher_id, course_id) in resolved:
+            resolved[(teacher_id, course_id)] = (grade_id, section_id)
+    return resolved
+
+
+def snapshot(note):
+    """Valores de la nota que afectan a los acumulados."""
+    return {
+        'student_id': note.student_id, 'course_id': note.course_id, 'teacher_id': note.teacher_id,
+        'note': Decimal(note.note), 'status_note': bool(note.status_note),
+    }
+
+
+def notes_changed(changes):
+    """Aplica una lista de (antes, después) de notas; cualquiera puede ser None."""
+    items = [item for change in changes for item in change if item]
+    groups = resolve_groups({(item['teacher_id'], item['course_id']) for item in items})
+
+    deltas = defaultdict(lambda: [0, ZERO, 0])
+    for old, new in changes:
+        for sign, item in ((-1, old), (1, new)):
+            if not item:
+                continue
+            grade_id, section_id = groups[(item['teacher_id'], item['course_id'])]
+            delta = deltas[(item['student_id'], item['course_id'], grade_id, section_id)]
+            delta[0] += sign
+            delta[1] += sign * item['note']
+            delta[2] += sign * int(item['status_note'])
+
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+    with transaction.atomic():
+        existing = set(NoteAggregate.objects.filter(
+            student_id__in={key[0] for key in deltas}, course_id__in={key[1] for key in deltas}
+        ).values_list('student_id', 'course_id', 'grade_id', 'section_id'))
+        # claves nuevas en un solo INSERT; si otra transacción se adelantó, se aplica una por una
+        new = [key for key in deltas if key not in existing and deltas[key][0] > 0]
+        try:
+            with transaction.atomic():
+                NoteAggregate.objects.bulk_create([
+                    NoteAggregate(count=deltas[key][0], total=deltas[key][1], passed=deltas[key][2], **_key_filter(key))
+                    for key in new
+                ])
+        except IntegrityError:
+            new = []
+        for key, (count, total, passed) in deltas.items():
+            if key not in new:
+                _apply(key, count, total, passed)
+
+
+def _key_filter(key):
+    student_id, course_id, grade_id, section_id = key
+    return {'student_id': student_id, 'course_id': course_id, 'grade_id': grade_id, 'section_id': section_id}
+
+
+def _apply(key, count, total, passed):
+    rows = NoteAggregate.objects.filter(**_key_filter(key))
+    updated = rows.update(count=F('count') + count, total=F('total') + total, passed=F('passed') + passed)
+    if not updated:
+        try:
+            with transaction.atomic():
+                NoteAggregate.objects.create(count=count, total=total, passed=passed, **_key_filter(key))
+        except IntegrityError:
+            # otra transacción creó la fila primero
+            rows.update(count=F('count') + count, total=F('total') + total, passed=F('passed') + passed)
+    rows.filter(count__lte=0).delete()
+
+
+def compute():
+    """Recalcula todos los acumulados desde Note: {clave: (count, total, passed)}."""
+    assignment = TeacherCourseAssignment.objects.filter(
+        teacher=OuterRef('teacher'), course=OuterRef('course')
+    ).order_by('id')
+    rows = Note.objects.annotate(
+        grade_ref=Subquery(assignment.values('grade_id')[:1]),
+        section_ref=Subquery(assignment.values('section_id')[:1]),
+    ).values('student_id', 'course_id', 'grade_ref', 'section_ref').annotate(
+        n=Count('id'), sum_note=Sum('note'), n_passed=Count('id', filter=Q(status_note=True))
+    ).order_by()
+    return {
+        (row['student_id'], row['course_id'], row['grade_ref'], row['section_ref']):
+            (row['n'], Decimal(row['sum_note']), row['n_passed'])
+        for row in rows
+    }
+
+
+def stored():
+    return {
+        (row[0], row[1], row[2], row[3]): (row[4], row[5], row[6])
+        for row in NoteAggregate.objects.values_list(
+            'student_id', 'course_id', 'grade_id', 'section_id', 'count', 'total', 'passed'
+        )
+    }
+
+
+@transaction.atomic
+def rebuild():
+    """Reemplaza todos los acumulados con el recálculo completo; devuelve las filas creadas."""
+    expected = compute()
+    NoteAggregate.objects.all().delete()
+    NoteAggregate.objects.bulk_create([
+        NoteAggregate(count=count, total=total, passed=passed, **_key_filter(key))
+        for key, (count, total, passed) in expected.items()
+    ], batch_size=1000)
+    return len(expected)
+
+
+def check():
+    """Diferencias entre lo guardado y el recálculo: lista de (clave, guardado, esperado)."""
+    expected, current = compute(), stored()
+    return [
+        (key, current.get(key), expected.get(key))
+        for key in sorted(set(expected) | set(current), key=str)
+        if current.get(key) != expected.get(key)
+    ]
+
+
+DIMENSIONS = {
+    'students': ('student_id', 'student__name'),
+    'courses': ('course_id', 'course__name'),
+    'sections': ('grade_id', 'grade__name', 'section_id', 'section__name'),
+}
+
+
+FILTERS = ('student', 'course', 'grade', 'section')
+
+
+class GradebookError(Exception):
+    pass
+
+
+def gradebook(dimension, params=None, queryset=None):
+    """Promedio, aprobación y cantidad de notas agrupadas por la dimensión, en una consulta.
+
+    `params` admite los filtros student, course, grade y section (ids).
+    """
+    if dimension not in DIMENSIONS:
+        raise GradebookError(f'Dimensión no soportada, use una de: {", ".join(DIMENSIONS)}')
+    queryset = NoteAggregate.objects.all() if queryset is None else queryset
+    for name in FILTERS:
+        value = (params or {}).get(name)
+        if value in (None, ''):
+            continue
+        try:
+            queryset = queryset.filter(**{f'{name}_id': int(value)})
+        except ValueError:
+            raise GradebookError(f'{name} debe ser un número entero.')
+
+    fields = DIMENSIONS[dimension]
+    rows = queryset.values(*fields).annotate(
+        n=Sum('count'), sum_note=Sum('total'), n_passed=Sum('passed')
+    ).order_by(*fields)
+
+    result = []
+    for row in rows:
+        n = row.pop('n')
+        sum_note = row.pop('sum_note')
+        n_passed = row.pop('n_passed')
+        row.update({
+            'notes': n,
+            'average': round(Decimal(sum_note) / n, 2) if n else None,
+            'passed': n_passed,
+            'pass_rate': round(Decimal(n_passed) / n, 4) if n else None,
+        })
+        result.append(row)
+    return result
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class NoteConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.note'
+
+    def ready(self):
+        from . import signals
+        signals.connect()
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from apps.administrator.bench import rollback, measure, report
+from apps.administrator.seed import seed_school
+from apps.note.models import Note
+from apps.note.serializers import NoteSerializers
+from apps.course.models import TeacherCourseAssignment
+
+
+class LegacyNoteSerializer(NoteSerializers):
+    """Búsqueda por fila de grado y sección, tal como estaba antes del resolutor."""
+
+    def get_grade(self, obj):
+        assignment = TeacherCourseAssignment.objects.filter(teacher=obj.teacher, course=obj.course).first()
+        return assignment.grade.name if assignment else None
+
+    def get_section(self, obj):
+        assignment = TeacherCourseAssignment.objects.filter(teacher=obj.teacher, course=obj.course).first()
+        return assignment.section.name if assignment else None
+
+
+class Command(BaseCommand):
+    help = 'Compara la serialización de notas con grado/sección por fila (antes) contra la resolución en bloque.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--courses', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        with rollback():
+            seed_school(students=options['students'], courses=options['courses'], teachers=options['courses'])
+            count = Note.objects.count()
+
+            def per_row():
+                LegacyNoteSerializer(Note.objects.all(), many=True).data
+
+            def batched():
+                NoteSerializers(NoteSerializers.setup_eager_loading(Note.objects.all()), many=True).data
+
+            report(self.stdout, f'{count} notas', [
+                ('por fila (antes)', *measure(per_row, options['repeat'])),
+                ('resolución por lote', *measure(batched, options['repeat'])),
+            ], count=count)
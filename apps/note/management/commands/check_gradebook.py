@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from apps.note import aggregates
+
+
+class Command(BaseCommand):
+    help = 'Compara los acumulados de notas con un recálculo completo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20, help='diferencias a mostrar')
+
+    def handle(self, *args, **options):
+        differences = aggregates.check()
+        for key, current, expected in differences[:options['limit']]:
+            self.stdout.write(f'alumno={key[0]} curso={key[1]} grado={key[2]} sección={key[3]}: '
+                              f'guardado={current} esperado={expected}')
+        if differences:
+            raise CommandError(f'{len(differences)} acumulados no coinciden; corra rebuild_gradebook.')
+        self.stdout.write(self.style.SUCCESS('Acumulados consistentes.'))
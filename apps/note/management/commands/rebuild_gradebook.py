@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.note import aggregates
+
+
+class Command(BaseCommand):
+    help = 'Recalcula desde cero los acumulados de notas (NoteAggregate).'
+
+    def handle(self, *args, **options):
+        rows = aggregates.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{rows} acumulados recalculados.'))
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0002_course_course_update_id_idx_and_more'),
+        ('note', '0001_initial'),
+        ('student', '0002_student_student_update_id_idx'),
+        ('teacher', '0002_teacher_teacher_update_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['update_date', 'id'], name='note_update_id_idx'),
+        ),
+    ]
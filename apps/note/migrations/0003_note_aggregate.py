@@ -0,0 +1,36 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0002_course_course_update_id_idx_and_more'),
+        ('grade', '0002_grade_grade_update_id_idx'),
+        ('note', '0002_note_note_update_id_idx'),
+        ('section', '0002_section_section_update_id_idx'),
+        ('student', '0002_student_student_update_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('passed', models.PositiveIntegerField(default=0)),
+                ('update_date', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='course.course')),
+                ('grade', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='grade.grade')),
+                ('section', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='section.section')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='student.student')),
+            ],
+            options={
+                'db_table': 'note_aggregate',
+                'constraints': [models.UniqueConstraint(fields=('student', 'course', 'grade', 'section'), name='note_aggregate_key'), models.UniqueConstraint(condition=models.Q(('grade__isnull', True)), fields=('student', 'course'), name='note_aggregate_key_without_grade')],
+            },
+        ),
+    ]
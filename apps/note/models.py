@@ -16,9 +16,37 @@ class Note(models.Model):
     creation_date = models.DateTimeField(auto_now_add=True)
     update_date = models.DateTimeField(auto_now=True)
     
-    class Meta: db_table = 'note'
+    class Meta:
+        db_table = 'note'
+        indexes = [models.Index(fields=['update_date', 'id'], name='note_update_id_idx')]
 
     def __str__(self):
         return f"{self.student.name} - {self.course.name}: {'Aprobado' if self.status_note else 'No aprobado'}"
 
 
+
+class NoteAggregate(models.Model):
+    """Acumulados de notas por alumno, curso, grado y sección. Se mantienen con
+    señales de Note (ver aggregates.py); grado y sección son los de la
+    asignación del profesor en el curso y quedan vacíos si no existe."""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    course = models.ForeignKey('course.Course', on_delete=models.CASCADE)
+    grade = models.ForeignKey('grade.Grade', on_delete=models.CASCADE, null=True)
+    section = models.ForeignKey('section.Section', on_delete=models.CASCADE, null=True)
+    count = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    passed = models.PositiveIntegerField(default=0)
+    update_date = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'note_aggregate'
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'course', 'grade', 'section'], name='note_aggregate_key'),
+            models.UniqueConstraint(
+                fields=['student', 'course'], condition=models.Q(grade__isnull=True),
+                name='note_aggregate_key_without_grade'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} - {self.course_id}: {self.count}"
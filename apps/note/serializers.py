@@ -1,10 +1,15 @@
 from rest_framework import serializers
-from django.db import IntegrityError, transaction
-from .models import Note
+from django.db import IntegrityError, transaction, models
+from django.db.models import F, FilteredRelation, Min, Q, Subquery
+from django.utils import timezone
+from .models import Note, validate_nota
+from . import aggregates
 from apps.registration.models import CourseRegistration
 from apps.course.models import Course, TeacherCourseAssignment
 from apps.student.models import Student
 from apps.teacher.models import Teacher
+from school_api.fastpath import FastList, Column, Computed, as_set, strftime, field_format
+from school_api import pgjson
 
 class ShortNoteSerializer(serializers.ModelSerializer):
     course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all())
@@ -28,6 +33,51 @@ class ShortNoteSerializer(serializers.ModelSerializer):
         representation['creation_date'] = instance.creation_date.strftime('%Y-%m-%d %H:%M:%S')
         return representation
 
+# misma salida que ShortNoteSerializer, para listados (school_api/fastpath.py)
+SHORT_NOTE_ROWS = FastList(
+    Column('student', 'student__name', as_set),
+    Column('course', 'course__name', as_set),
+    Column('note', format=field_format(Note, 'note')),
+    Column('status_note'),
+    Column('teacher', 'teacher__name', as_set),
+    Column('creation_date', format=strftime),
+)
+
+def resolve_grade_section(notes):
+    """Devuelve {(teacher_id, course_id): (grado, sección)} para todas las notas
+    con una sola consulta. Igual que antes se toma la primera asignación (por id)
+    del profesor en el curso; si no hay asignación el valor es (None, None).
+    """
+    return resolve_pairs({(note.teacher_id, note.course_id) for note in notes})
+
+
+def resolve_pairs(pairs):
+    """Igual que resolve_grade_section a partir de los pares (teacher_id, course_id)."""
+    resolved = dict.fromkeys(pairs, (None, None))
+    if not pairs:
+        return resolved
+
+    assignments = TeacherCourseAssignment.objects.filter(
+        teacher_id__in={teacher for teacher, _ in pairs},
+        course_id__in={course for _, course in pairs}
+    ).order_by('-id').values_list('teacher_id', 'course_id', 'grade__name', 'section__name')
+
+    # orden descendente: la última escritura por par es la asignación con menor id
+    for teacher_id, course_id, grade, section in assignments:
+        if (teacher_id, course_id) in resolved:
+            resolved[(teacher_id, course_id)] = (grade, section)
+    return resolved
+
+
+class NoteListSerializer(serializers.ListSerializer):
+    """Resuelve grado y sección de toda la página antes de serializar cada nota."""
+
+    def to_representation(self, data):
+        notes = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.grade_sections.update(resolve_grade_section(notes))
+        return super().to_representation(notes)
+
+
 #serializador para notas del estudiante
 class NoteSerializers(serializers.ModelSerializer):
     course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all())
@@ -46,18 +96,28 @@ class NoteSerializers(serializers.ModelSerializer):
             'teacher': {'required': True},
             'note': {'required': True}
         }
+        list_serializer_class = NoteListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (teacher_id, course_id) -> (grado, sección), lo llena NoteListSerializer
+        self.grade_sections = {}
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('course', 'student', 'teacher')
+
+    def grade_section(self, obj):
+        key = (obj.teacher_id, obj.course_id)
+        if key not in self.grade_sections:
+            self.grade_sections.update(resolve_grade_section([obj]))
+        return self.grade_sections[key]
 
     def get_grade(self, obj):
-        teacher_course_assignment = TeacherCourseAssignment.objects.filter(teacher=obj.teacher, course=obj.course).first()
-        if teacher_course_assignment:
-            return teacher_course_assignment.grade.name
-        return None
+        return self.grade_section(obj)[0]
     
     def get_section(self, obj):
-        teacher_course_assignment = TeacherCourseAssignment.objects.filter(teacher=obj.teacher, course=obj.course).first()
-        if teacher_course_assignment:
-            return teacher_course_assignment.section.name  
-        return None
+        return self.grade_section(obj)[1]
 
     def validate(self, data):
         instance = self.instance
@@ -106,4 +166,145 @@ class NoteSerializers(serializers.ModelSerializer):
         representation['creation_date'] = instance.creation_date.strftime('%Y-%m-%d %H:%M:%S')
         representation['update_date'] = instance.update_date.strftime('%Y-%m-%d %H:%M:%S')
         return representation 
-            
\ No newline at end of file
+
+
+class NoteRows(FastList):
+    def complete(self, rows, data):
+        names = [name for name in ('grade', 'section') if name in data[0]]
+        if not names:
+            return
+        resolved = resolve_pairs({(row.teacher, row.course) for row in rows})
+        for row, item in zip(rows, data):
+            grade, section = resolved[(row.teacher, row.course)]
+            item.update((name, value) for name, value in (('grade', grade), ('section', section)) if name in names)
+
+
+# misma salida que NoteSerializers, para listados
+NOTE_ROWS = NoteRows(
+    Column('id'),
+    Column('course', 'course__name', as_set),
+    Column('note', format=field_format(Note, 'note')),
+    Column('status_note'),
+    Column('student', 'student__name', as_set),
+    Column('teacher', 'teacher__name', as_set),
+    Computed('grade'),
+    Computed('section'),
+    Column('creation_date', format=strftime),
+    Column('update_date', format=strftime),
+    # ids para resolver grado y sección
+    hidden=('teacher', 'course'),
+)
+
+
+def note_joins():
+    """La asignación de resolve_pairs (la primera por id del profesor en el curso)
+    como un LEFT JOIN: la subconsulta de los primeros ids no depende de la fila,
+    así que la base la calcula una vez por consulta."""
+    first = TeacherCourseAssignment.objects.values('teacher', 'course').annotate(first=Min('id')).values('first')
+    return {'assignment': FilteredRelation('teacher__teachercourseassignment', condition=Q(
+        teacher__teachercourseassignment__course=F('course'),
+        teacher__teachercourseassignment__id__in=Subquery(first),
+    ))}
+
+
+@pgjson.joins(note_joins)
+def note_document():
+    """NoteSerializers armado por PostgreSQL (school_api/pgjson.py)."""
+    return pgjson.JSONBuild(
+        id='id',
+        course=pgjson.as_set('course__name'),
+        note=pgjson.as_text('note'),
+        status_note='status_note',
+        student=pgjson.as_set('student__name'),
+        teacher=pgjson.as_set('teacher__name'),
+        grade='assignment__grade__name',
+        section='assignment__section__name',
+        creation_date=pgjson.to_char('creation_date', pgjson.DATE_FORMAT),
+        update_date=pgjson.to_char('update_date', pgjson.DATE_FORMAT),
+    )
+            
+
+class NoteEntrySerializer(serializers.Serializer):
+    student = serializers.IntegerField()
+    note = serializers.DecimalField(max_digits=5, decimal_places=2, validators=[validate_nota])
+    status_note = serializers.BooleanField(required=False)
+
+
+#carga de notas en bloque para una asignación del profesor
+class BulkNoteSerializer(serializers.Serializer):
+    """Recibe una asignación y la lista de {student, note, status_note}. Las filas
+    válidas se crean o actualizan (una nota por alumno, curso y profesor) en una
+    transacción; las inválidas se devuelven en el reporte sin detener el resto.
+    """
+    assignment = serializers.PrimaryKeyRelatedField(queryset=TeacherCourseAssignment.objects.all())
+    notes = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+    def validate_assignment(self, assignment):
+        teacher = self.context['teacher']
+        if assignment.teacher_id != teacher.id:
+            raise serializers.ValidationError('La asignación no pertenece a este profesor.')
+        return assignment
+
+    def save(self):
+        assignment = self.validated_data['assignment']
+        self.report = {'created': 0, 'updated': 0, 'failed': 0, 'errors': []}
+
+        rows, positions = {}, {}
+        for position, entry in enumerate(self.validated_data['notes']):
+            row = NoteEntrySerializer(data=entry)
+            if not row.is_valid():
+                self.fail(entry.get('student'), position, row.errors)
+            elif row.validated_data['student'] in rows:
+                self.fail(row.validated_data['student'], position, {'student': 'Alumno repetido en la lista.'})
+            else:
+                rows[row.validated_data['student']] = row.validated_data
+                positions[row.validated_data['student']] = position
+
+        # matrícula de todo el listado en una consulta
+        enrolled = set(CourseRegistration.objects.filter(
+            teacher_course_assignment=assignment, student_id__in=rows
+        ).values_list('student_id', flat=True))
+        for student_id in [student_id for student_id in rows if student_id not in enrolled]:
+            rows.pop(student_id)
+            self.fail(student_id, positions[student_id], {'student': 'El estudiante no está asignado a este curso con este profesor.'})
+
+        with transaction.atomic():
+            self.upsert(assignment, rows)
+        return self.report
+
+    def upsert(self, assignment, rows):
+        existing = {}
+        # si hay notas repetidas se actualiza la más reciente
+        for note in Note.objects.filter(
+            course_id=assignment.course_id, teacher_id=assignment.teacher_id, student_id__in=rows
+        ).order_by('id'):
+            existing[note.student_id] = note
+
+        changes, new, updated = [], [], []
+        now = timezone.now()
+        for student_id, data in rows.items():
+            note = existing.get(student_id)
+            if note is None:
+                note = Note(student_id=student_id, course_id=assignment.course_id, teacher_id=assignment.teacher_id,
+                            note=data['note'], status_note=data.get('status_note', False))
+                new.append(note)
+                continue
+            previous = aggregates.snapshot(note)
+            note.note = data['note']
+            note.status_note = data.get('status_note', note.status_note)
+            note.update_date = now
+            updated.append(note)
+            changes.append((previous, aggregates.snapshot(note)))
+
+        Note.objects.bulk_create(new)
+        Note.objects.bulk_update(updated, ['note', 'status_note', 'update_date'])
+        # bulk_create/bulk_update no disparan las señales de los acumulados
+        changes.extend((None, aggregates.snapshot(note)) for note in new)
+        aggregates.notes_changed(changes)
+
+        self.report['created'] += len(new)
+        self.report['updated'] += len(updated)
+
+    def fail(self, student, position, errors):
+        self.report['failed'] += 1
+        self.report['errors'].append({'student': student, 'position': position, 'errors': errors})
@@ -0,0 +1,28 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from .models import Note
+from . import aggregates
+
+
+def remember_previous_note(sender, instance, **kwargs):
+    # valores guardados antes del cambio, para restarlos de los acumulados
+    instance._aggregate_previous = None
+    if instance.pk:
+        previous = Note.objects.filter(pk=instance.pk).first()
+        if previous:
+            instance._aggregate_previous = aggregates.snapshot(previous)
+
+
+def update_aggregates_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    aggregates.notes_changed([(getattr(instance, '_aggregate_previous', None), aggregates.snapshot(instance))])
+
+
+def update_aggregates_on_delete(sender, instance, **kwargs):
+    aggregates.notes_changed([(aggregates.snapshot(instance), None)])
+
+
+def connect():
+    pre_save.connect(remember_previous_note, sender=Note, dispatch_uid='note-aggregates-pre-save')
+    post_save.connect(update_aggregates_on_save, sender=Note, dispatch_uid='note-aggregates-save')
+    post_delete.connect(update_aggregates_on_delete, sender=Note, dispatch_uid='note-aggregates-delete')
@@ -1,3 +1,124 @@
+import io
+import json
+from decimal import Decimal
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from apps.administrator.seed import seed_school
+from apps.course.models import TeacherCourseAssignment
+from . import aggregates
+from .models import Note, NoteAggregate
+from .serializers import NoteSerializers, ShortNoteSerializer, NOTE_ROWS, SHORT_NOTE_ROWS
 
-# Create your tests here.
+
+class NoteSerializersGradeSectionTestCase(TestCase):
+    def setUp(self):
+        seed_school(students=8, courses=3, teachers=3, grades=2, sections=2)
+
+    def test_listado_resuelve_grado_y_seccion_en_bloque(self):
+        notes = NoteSerializers.setup_eager_loading(Note.objects.all())
+
+        # una consulta para las notas y otra para todas las asignaciones
+        with self.assertNumQueries(2):
+            data = NoteSerializers(notes, many=True).data
+
+        self.assertEqual(len(data), 24)
+        for item in data:
+            note = Note.objects.get(id=item['id'])
+            esperado = TeacherCourseAssignment.objects.filter(
+                teacher=note.teacher, course=note.course).order_by('id').first()
+            self.assertEqual(item['grade'], esperado.grade.name)
+            self.assertEqual(item['section'], esperado.section.name)
+
+    def test_nota_individual(self):
+        note = Note.objects.select_related('course', 'student', 'teacher').first()
+        with self.assertNumQueries(1):
+            data = NoteSerializers(note).data
+        self.assertIsNotNone(data['grade'])
+        self.assertIsNotNone(data['section'])
+
+
+class NoteAggregateTestCase(TestCase):
+    def setUp(self):
+        self.school = seed_school(students=6, courses=2, teachers=2, grades=1, sections=2)
+        self.admin = User.objects.create(username='admin', email='admin@ejemplo.com', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_seed_deja_acumulados_consistentes(self):
+        self.assertEqual(NoteAggregate.objects.count(), 12)
+        self.assertEqual(aggregates.check(), [])
+
+    def test_crear_modificar_y_borrar_nota(self):
+        note = self.school.notes[0]
+        otra = Note.objects.create(student=note.student, course=note.course, teacher=note.teacher,
+                                   note=Decimal('80'), status_note=True)
+        self.assertEqual(aggregates.check(), [])
+
+        otra.note = Decimal('40')
+        otra.status_note = False
+        otra.save()
+        self.assertEqual(aggregates.check(), [])
+
+        otra.delete()
+        note.delete()
+        self.assertEqual(aggregates.check(), [])
+        self.assertFalse(NoteAggregate.objects.filter(student=note.student, course=note.course).exists())
+
+    def test_check_y_rebuild(self):
+        NoteAggregate.objects.filter(id=NoteAggregate.objects.first().id).update(count=99)
+        with self.assertRaises(CommandError):
+            call_command('check_gradebook', stdout=io.StringIO())
+
+        call_command('rebuild_gradebook', stdout=io.StringIO())
+        self.assertEqual(aggregates.check(), [])
+
+    def test_promedio_por_curso_en_una_consulta(self):
+        course = self.school.courses[0]
+        with self.assertNumQueries(1):
+            rows = aggregates.gradebook('courses', {'course': course.id})
+
+        notes = Note.objects.filter(course=course)
+        self.assertEqual(rows[0]['notes'], notes.count())
+        self.assertEqual(rows[0]['average'], round(sum(n.note for n in notes) / notes.count(), 2))
+        self.assertEqual(rows[0]['passed'], notes.filter(status_note=True).count())
+
+    def test_endpoint_admin(self):
+        response = self.client.get('/ad/gradebook/sections/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(sum(row['notes'] for row in response.data), 12)
+
+        response = self.client.get('/ad/gradebook/otros/')
+        self.assertEqual(response.status_code, 400)
+
+    def test_endpoint_tutor_solo_sus_alumnos(self):
+        tutor = self.school.tutors[0]
+        tutor.user.groups.add(Group.objects.get_or_create(name='Tutores')[0])
+        self.client.force_authenticate(tutor.user)
+
+        response = self.client.get('/tutor/gradebook/students/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({row['student_id'] for row in response.data},
+                         set(tutor.student_set.values_list('id', flat=True)))
+
+
+class NoteFastPathTestCase(TestCase):
+    def setUp(self):
+        seed_school(students=6, courses=3, teachers=3, grades=2, sections=2)
+
+    def assertSameOutput(self, serializer_class, fast_list):
+        notes = Note.objects.order_by('id')
+        esperado = json.loads(JSONRenderer().render(serializer_class(notes, many=True).data))
+        with self.assertNumQueries(2 if fast_list is NOTE_ROWS else 1):
+            data = fast_list.build(fast_list.values(notes))
+        self.assertEqual(json.loads(JSONRenderer().render(data)), esperado)
+
+    def test_misma_salida_que_note_serializers(self):
+        self.assertSameOutput(NoteSerializers, NOTE_ROWS)
+
+    def test_misma_salida_que_short_note_serializer(self):
+        self.assertSameOutput(ShortNoteSerializer, SHORT_NOTE_ROWS)
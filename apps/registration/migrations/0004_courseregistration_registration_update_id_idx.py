@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0002_course_course_update_id_idx_and_more'),
+        ('grade', '0002_grade_grade_update_id_idx'),
+        ('registration', '0003_alter_courseregistration_unique_together_and_more'),
+        ('section', '0002_section_section_update_id_idx'),
+        ('student', '0002_student_student_update_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='courseregistration',
+            index=models.Index(fields=['update_date', 'id'], name='registration_update_id_idx'),
+        ),
+    ]
@@ -15,6 +15,7 @@ class CourseRegistration(models.Model):
 
     class Meta:
         db_table = 'course_registration'
+        indexes = [models.Index(fields=['update_date', 'id'], name='registration_update_id_idx')]
 
     
     def __str__(self):
@@ -1,20 +1,34 @@
 from rest_framework import serializers
 from django.db import transaction, IntegrityError
-from .models import CourseRegistration, Grade, Section
+from django.db.models import Prefetch, OuterRef, Subquery, Exists, Case, When, JSONField
+from .models import CourseRegistration
 from apps.course.models import TeacherCourseAssignment
-from apps.section.models import Section
 from apps.student.models import Student
+from apps.administrator.refcache import CachedPrimaryKeyRelatedField
+from school_api.sparse import SparseFieldsMixin, Eager
+from school_api import pgjson
 
-class CourseRegistrationSerializer(serializers.ModelSerializer):
+class CourseRegistrationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     student = serializers.PrimaryKeyRelatedField(queryset=Student.objects.all(), required=True)
-    teacher_course_assignment = serializers.PrimaryKeyRelatedField(queryset=TeacherCourseAssignment.objects.all(), many=True, required=True)
-    grade = serializers.PrimaryKeyRelatedField(queryset=Grade.objects.all(), required=True)
-    section = serializers.PrimaryKeyRelatedField(queryset=Section.objects.all(), required=True)
+    teacher_course_assignment = serializers.PrimaryKeyRelatedField(queryset=TeacherCourseAssignment.objects.all(), many=True, required=True, write_only=True)
+    grade = CachedPrimaryKeyRelatedField('grade', required=True)
+    section = CachedPrimaryKeyRelatedField('section', required=True)
 
     class Meta: 
         model = CourseRegistration
         fields = ['id', 'student', 'section', 'grade', 'teacher_course_assignment', 'create_date', 'update_date']
 
+    # relaciones que usa to_representation: el número de consultas no depende de la cantidad de matrículas
+    expandable_fields = {
+        'student': Eager(select=('student',)),
+        'section': Eager(select=('section',)),
+        'grade': Eager(select=('grade',)),
+        'teacher_course_assignments': Eager(prefetch=(Prefetch(
+            'teacher_course_assignment',
+            queryset=TeacherCourseAssignment.objects.select_related('teacher', 'course', 'schedule').order_by('id')
+        ),)),
+    }
+
     def validate(self, data):
         instance = self.instance
         student = data.get('student', instance.student if instance else None )
@@ -65,23 +79,48 @@ class CourseRegistrationSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         representation =  super().to_representation(instance)
 
-        if instance.student: representation['student'] = {'name': instance.student.name}
-        if instance.section: representation['section'] = {'name': instance.section.name}
-        if instance.grade: representation['grade'] = {'name': instance.grade.name}
-        if instance.teacher_course_assignment.exists():
-            assignments = []
-            for assignment in instance.teacher_course_assignment.all():
-                assignments.append({
-                    'teacher': assignment.teacher.name,  # Asegúrate de que el modelo Teacher tenga un campo 'name'
-                    'course': assignment.course.name,    # Asegúrate de que el modelo Course tenga un campo 'name'
-                    'schedule': {
-                        'start_time': assignment.schedule.start_time.strftime("%H:%M"),  # Formateo de hora
-                        'end_time': assignment.schedule.end_time.strftime("%H:%M")      # Formateo de hora
-                    }
-                })
-            representation['teacher_course_assignments'] = assignments
-        
-        if 'teacher_course_assignment' in representation:
-            del representation['teacher_course_assignment']
-    
-        return representation
\ No newline at end of file
+        for name in ['student', 'section', 'grade']:
+            related = getattr(instance, name) if self.expanded(name) else None
+            if related: representation[name] = {'name': related.name}
+        assignments = instance.teacher_course_assignment.all() if self.expanded('teacher_course_assignments') else None
+        if assignments:
+            representation['teacher_course_assignments'] = [{
+                'teacher': assignment.teacher.name,
+                'course': assignment.course.name,
+                'schedule': {
+                    'start_time': assignment.schedule.start_time.strftime("%H:%M"),  # Formateo de hora
+                    'end_time': assignment.schedule.end_time.strftime("%H:%M")      # Formateo de hora
+                }
+            } for assignment in assignments]
+
+        return representation
+
+
+def registration_document():
+    """CourseRegistrationSerializer armado por PostgreSQL (school_api/pgjson.py):
+    las asignaciones en un json_agg por matrícula y la clave
+    teacher_course_assignments solo si tiene alguna."""
+    through = CourseRegistration.teacher_course_assignment.through.objects.filter(courseregistration=OuterRef('pk'))
+    assignments = through.values('courseregistration').annotate(docs=pgjson.JSONAgg(pgjson.JSONBuild(
+        teacher='teachercourseassignment__teacher__name',
+        course='teachercourseassignment__course__name',
+        schedule=pgjson.JSONBuild(
+            start_time=pgjson.to_char('teachercourseassignment__schedule__start_time', pgjson.TIME_FORMAT),
+            end_time=pgjson.to_char('teachercourseassignment__schedule__end_time', pgjson.TIME_FORMAT),
+        ),
+    ), order_by='teachercourseassignment_id')).values('docs')
+    fields = dict(
+        id='id',
+        student=pgjson.JSONBuild(name='student__name'),
+        section=pgjson.JSONBuild(name='section__name'),
+        grade=pgjson.JSONBuild(name='grade__name'),
+        create_date=pgjson.iso('create_date'),
+        update_date=pgjson.iso('update_date'),
+    )
+    return Case(
+        When(Exists(through), then=pgjson.JSONBuild(
+            **fields, teacher_course_assignments=Subquery(assignments, output_field=JSONField())
+        )),
+        default=pgjson.JSONBuild(**fields),
+        output_field=JSONField(),
+    )
@@ -1,3 +1,87 @@
+from datetime import date, time
 from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from apps.teacher.models import Teacher, Speciality
+from apps.tutor.models import Tutor
+from apps.student.models import Student
+from apps.grade.models import Grade
+from apps.section.models import Section
+from apps.course.models import Course, CourseSchedule, TeacherCourseAssignment
+from .models import CourseRegistration
 
-# Create your tests here.
+
+class RegistrationListQueryCountTestCase(TestCase):
+    """El listado de matrículas debe usar un número fijo de consultas."""
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', email='admin@ejemplo.com', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        especialidad = Speciality.objects.create(name='Matemáticas')
+        self.grado = Grade.objects.create(name='1° básico')
+        self.seccion = Section.objects.create(name='A')
+        self.tutor = Tutor.objects.create(
+            user=User.objects.create(username='tutor', email='tutor@ejemplo.com'),
+            name='Tutor', phone='5555', address='zona 1'
+        )
+
+        # dos profesores con un curso y horario cada uno
+        self.asignaciones = []
+        for i in range(2):
+            profesor = Teacher.objects.create(
+                user=User.objects.create(username=f'profesor{i}', email=f'profesor{i}@ejemplo.com'),
+                name=f'Profesor {i}', phone='5555'
+            )
+            profesor.speciality.add(especialidad)
+            self.asignaciones.append(TeacherCourseAssignment.objects.create(
+                teacher=profesor,
+                course=Course.objects.create(name=f'Curso {i}', speciality=especialidad),
+                grade=self.grado,
+                section=self.seccion,
+                schedule=CourseSchedule.objects.create(start_time=time(7 + i, 0), end_time=time(8 + i, 0))
+            ))
+
+    def crear_matriculas(self, cantidad):
+        inicio = Student.objects.count()
+        for i in range(inicio, inicio + cantidad):
+            alumno = Student.objects.create(
+                user=User.objects.create(username=f'alumno{i}', email=f'alumno{i}@ejemplo.com'),
+                name=f'Alumno {i}', phone='5555', birthdate=date(2010, 1, 1),
+                address='zona 1', emergency_contact='5555', tutor=self.tutor
+            )
+            matricula = CourseRegistration.objects.create(student=alumno, grade=self.grado, section=self.seccion)
+            matricula.teacher_course_assignment.set(self.asignaciones)
+
+    def consultas_listado(self):
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.get('/ad/student-registration/')
+        self.assertEqual(response.status_code, 200)
+        return len(contexto.captured_queries), response.data['results']
+
+    def test_consultas_constantes_al_crecer_matriculas(self):
+        self.crear_matriculas(1)
+        consultas_pocas, data = self.consultas_listado()
+        self.assertEqual(len(data), 1)
+
+        self.crear_matriculas(20)
+        consultas_muchas, data = self.consultas_listado()
+        self.assertEqual(len(data), 21)
+        self.assertEqual(consultas_pocas, consultas_muchas)
+
+    def test_representacion_de_asignaciones(self):
+        self.crear_matriculas(1)
+        _, data = self.consultas_listado()
+
+        matricula = data[0]
+        self.assertEqual(matricula['student'], {'name': 'Alumno 0'})
+        self.assertEqual(matricula['grade'], {'name': '1° básico'})
+        self.assertEqual(matricula['section'], {'name': 'A'})
+        self.assertNotIn('teacher_course_assignment', matricula)
+        self.assertEqual(matricula['teacher_course_assignments'], [
+            {'teacher': 'Profesor 0', 'course': 'Curso 0', 'schedule': {'start_time': '07:00', 'end_time': '08:00'}},
+            {'teacher': 'Profesor 1', 'course': 'Curso 1', 'schedule': {'start_time': '08:00', 'end_time': '09:00'}},
+        ])
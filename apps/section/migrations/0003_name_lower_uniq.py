@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:30
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('section', '0002_section_section_update_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='section',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='section_name_lower_uniq'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 
 class Section(models.Model):
     name = models.CharField(max_length=1)
@@ -8,5 +9,7 @@ class Section(models.Model):
 
     class Meta:
         db_table = "section"
+        indexes = [models.Index(fields=['update_date', 'id'], name='section_update_id_idx')]
+        constraints = [models.UniqueConstraint(Lower('name'), name='section_name_lower_uniq')]
     
     def __str__(self): return self.name
\ No newline at end of file
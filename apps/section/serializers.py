@@ -1,8 +1,10 @@
 from rest_framework import serializers
 from django.db import IntegrityError, transaction
 from .models import Section
+from apps.administrator.integrity import violates
+from school_api.sparse import SparseFieldsMixin
 
-class SectionSerializer(serializers.ModelSerializer):
+class SectionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Section
         fields = ['id', 'name']
@@ -12,12 +14,7 @@ class SectionSerializer(serializers.ModelSerializer):
         }
 
 
-    def validate(self, data):
-        name = data.get('name')
-        if name and Section.objects.filter(name__iexact=name).exists():
-            raise serializers.ValidationError({'name': f'la seccion {name} ya existe'})
-        return data
-
+    # el nombre único (sin importar mayúsculas) lo garantiza section_name_lower_uniq
     @transaction.atomic
     def create(self, validated_data):
         try:
@@ -25,9 +22,19 @@ class SectionSerializer(serializers.ModelSerializer):
             return section
         
         except IntegrityError as e:
+            if violates(e, 'section_name_lower_uniq'):
+                raise serializers.ValidationError({'name': f"la seccion {validated_data['name']} ya existe"})
             raise serializers.ValidationError({'error': 'Error de integridad: ' + str(e)})    
         except ValueError: 
             raise serializers.ValidationError({'error': 'Error de valor: ' + str(e)})
         except Exception as e:
             raise serializers.ValidationError({'error': 'Error inesperado: ' + str(e)})
-        
\ No newline at end of file
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError as e:
+            if violates(e, 'section_name_lower_uniq'):
+                raise serializers.ValidationError({'name': f"la seccion {validated_data['name']} ya existe"})
+            raise serializers.ValidationError({'error': 'Error de integridad: ' + str(e)})
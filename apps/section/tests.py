@@ -1,3 +1,23 @@
 from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+from .models import Section
+from .serializers import SectionSerializer
 
-# Create your tests here.
+
+class SectionNameUniqueTestCase(TestCase):
+    def setUp(self):
+        Section.objects.create(name='A')
+
+    def test_nombre_repetido_sin_importar_mayusculas(self):
+        serializer = SectionSerializer(data={'name': 'a'})
+        self.assertTrue(serializer.is_valid())
+
+        with self.assertRaisesMessage(ValidationError, 'la seccion a ya existe'):
+            serializer.save()
+        self.assertEqual(Section.objects.count(), 1)
+
+    def test_nombre_distinto(self):
+        serializer = SectionSerializer(data={'name': 'B'})
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        self.assertEqual(Section.objects.count(), 2)
@@ -0,0 +1,47 @@
+from school_api.async_views import AsyncReadView
+from apps.administrator import namesGroup
+from apps.course.models import TeacherCourseAssignment
+from apps.note.models import Note
+from apps.teacher.models import Teacher
+from apps.tutor.models import Tutor
+from .models import Student
+
+
+class StudentReadView(AsyncReadView):
+    allowed_roles = [namesGroup.STUDENT]
+    profile = Student
+    not_found = 'El usuario no está asignado a ningún alumno.'
+
+
+class NotesView(StudentReadView):
+    fields = dict(
+        id='id', course='course__name', teacher='teacher__name', note='note',
+        status_note='status_note', creation_date='creation_date',
+    )
+
+    def queryset(self, student):
+        return Note.objects.filter(student=student)
+
+
+class CoursesView(StudentReadView):
+    fields = dict(
+        id='id', course='course__name', teacher='teacher__name', grade='grade__name',
+        section='section__name', start_time='schedule__start_time', end_time='schedule__end_time',
+    )
+
+    def queryset(self, student):
+        return TeacherCourseAssignment.objects.filter(courseregistration__student=student)
+
+
+class TeachersView(StudentReadView):
+    fields = dict(id='id', name='name', phone='phone', email='user__email')
+
+    def queryset(self, student):
+        return Teacher.objects.filter(teachercourseassignment__courseregistration__student=student).distinct()
+
+
+class TutorView(StudentReadView):
+    fields = dict(name='name', phone='phone', address='address', email='user__email')
+
+    def queryset(self, student):
+        return Tutor.objects.filter(id=student.tutor_id)
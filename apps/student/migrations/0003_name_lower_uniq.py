@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:30
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0002_student_student_update_id_idx'),
+        ('tutor', '0003_name_lower_uniq'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='student',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='student_name_lower_uniq'),
+        ),
+    ]
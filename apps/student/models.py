@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 
 
@@ -14,7 +15,10 @@ class Student(models.Model):
     update_date = models.DateTimeField(auto_now=True)
     suspended_student = models.BooleanField(default=False) 
 
-    class Meta: db_table = "student"
+    class Meta:
+        db_table = "student"
+        indexes = [models.Index(fields=['update_date', 'id'], name='student_update_id_idx')]
+        constraints = [models.UniqueConstraint(Lower('name'), name='student_name_lower_uniq')]
     
     def __str__(self) -> str: return self.name
     
@@ -1,12 +1,16 @@
 from rest_framework import serializers
 from .models import Student
 from apps.tutor.models import Tutor
-from apps.administrator.namesGroup import StudentNames
+from apps.administrator.namesGroup import ROLE_NAMES, STUDENT
+from apps.administrator.integrity import violates
 from django.db import transaction, IntegrityError
 from django.contrib.auth.models import User
 from apps.registration.serializers import CourseRegistration
 from apps.teacher.serializers import TeacherSerializer
 from apps.tutor.serializers import Tutor
+from school_api.sparse import SparseFieldsMixin, Eager
+from school_api.fastpath import FastList, Column
+from school_api import pgjson
 
 #información del estudiante desde la persepectiva del profesor
 class StudentForTeacher(serializers.ModelSerializer):
@@ -37,22 +41,40 @@ class StudentForTeacher(serializers.ModelSerializer):
         teacher_ids = registrations.values_list('teacher_course_assignment__teacher', flat=True)
         return TeacherSerializer(teacher_ids, many=True).data
 
-class StudentShortSerializer(serializers.ModelSerializer):
+class StudentShortSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     tutor = serializers.SerializerMethodField()
+    expandable_fields = {'tutor': Eager(select=('tutor',))}
+    eager_fields = {'email': Eager(select=('user',))}
+
     class Meta: 
         model = Student 
         fields = ['id', 'name', 'suspended_student', 'email', 'phone', 'emergency_contact', 'address', 'tutor']
 
     def get_tutor(self, obj):
+        if not self.expanded('tutor'):
+            return obj.tutor_id
         if obj.tutor: 
             return {
                 'name': obj.tutor.name
             }
 
+# misma salida que StudentShortSerializer, para listados (school_api/fastpath.py)
+STUDENT_SHORT_ROWS = FastList(
+    Column('id'),
+    Column('name'),
+    Column('suspended_student'),
+    Column('email', 'user__email'),
+    Column('phone'),
+    Column('emergency_contact'),
+    Column('address'),
+    Column('tutor', 'tutor__name', lambda name: {'name': name}, collapsed='tutor_id'),
+)
+
 
-class StudentAllSerializer(serializers.ModelSerializer):
+class StudentAllSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=True) 
     tutor = serializers.PrimaryKeyRelatedField(queryset=Tutor.objects.all(), required=True)
+    expandable_fields = {'user': Eager(select=('user',)), 'tutor': Eager(select=('tutor',))}
 
     class Meta:    
         model = Student
@@ -75,14 +97,14 @@ class StudentAllSerializer(serializers.ModelSerializer):
         super(StudentAllSerializer, self).__init__(*args, **kwargs)
 
         if self.instance:
-            for field in  ["name", "phone", "birthdate", "address", "emergency_contact", "user", "tutor"]:
+            # con ?fields= algunos campos no están
+            for field in [name for name in ["name", "phone", "birthdate", "address", "emergency_contact", "user", "tutor"] if name in self.fields]:
                 self.fields[field].required = False
                 self.fields[field].allow_blank = True
 
     def validate(self, data):
         instance = self.instance
         user = data.get('user')
-        name = data.get('name')
 
         if not instance:
 
@@ -92,14 +114,10 @@ class StudentAllSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError({'error': 'Error inesperado: ' + str(e)})
 
 
-            if name and Student.objects.filter(name__iexact=name).exists():
-                raise serializers.ValidationError({"Error": "alumno existente"})
-
             if not groupname:
                 raise serializers.ValidationError(f"El usuario no pertenece a ningún grupo.")
 
-            NAMES_STUDENTS_SET = {name.lower() for name in StudentNames()}
-            if groupname.lower() not in NAMES_STUDENTS_SET:
+            if groupname.casefold() not in ROLE_NAMES[STUDENT]:
                 raise serializers.ValidationError(f"El grupo no es correcto para este usuario: {user}. Se encontró: {groupname}")
 
             if Student.objects.filter(user=user).exists():
@@ -113,13 +131,9 @@ class StudentAllSerializer(serializers.ModelSerializer):
                 if not groupname:
                     raise serializers.ValidationError(f"El usuario no pertenece a ningún grupo.")
                 
-                NAMES_STUDENTS_SET = {name.lower() for name in StudentNames()}
-                if groupname.lower() not in NAMES_STUDENTS_SET:
+                if groupname.casefold() not in ROLE_NAMES[STUDENT]:
                     raise serializers.ValidationError(f"El grupo no es correcto para este usuario: {user}. Se encontró: {groupname}")
 
-            if name and Student.objects.filter(name__iexact=name).exclude(id=instance.id).exists():
-                raise serializers.ValidationError({"Error": "alumno existente"})
-
             if Student.objects.filter(user=user).exclude(id=instance.id).exists():
                 raise serializers.ValidationError(f"El usuario ya está asignado a otro alumno.")
 
@@ -134,6 +148,8 @@ class StudentAllSerializer(serializers.ModelSerializer):
             return student
         
         except IntegrityError as e:
+            if violates(e, 'student_name_lower_uniq'):
+                raise serializers.ValidationError({"Error": "alumno existente"})
             raise serializers.ValidationError({'error': 'Error de integridad: ' + str(e)})
         except ValueError: 
             raise serializers.ValidationError({'error': 'Error de valor: ' + str(e)})
@@ -144,27 +160,51 @@ class StudentAllSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-            instance.save()
+        try:
+            with transaction.atomic():
+                instance.save()
+        except IntegrityError as e:
+            if violates(e, 'student_name_lower_uniq'):
+                raise serializers.ValidationError({"Error": "alumno existente"})
+            raise serializers.ValidationError({'error': 'Error de integridad: ' + str(e)})
         return instance
 
     def to_representation(self, instance):
         respresentation = super().to_representation(instance)
         
-        user = instance.user
+        user = instance.user if self.expanded('user') else None
         if user:
             respresentation['user'] = {
                 'username': user.username,
                 'email': user.email
             }
 
-        tutor = instance.tutor
+        tutor = instance.tutor if self.expanded('tutor') else None
         if tutor:
             respresentation['tutor'] = {
                 'tutor': tutor.name
             }
 
-        respresentation['creation_date'] = instance.creation_date.strftime('%Y-%m-%d %H:%M:%S')
-        respresentation['update_date'] = instance.update_date.strftime('%Y-%m-%d %H:%M:%S')
-
-
-        return respresentation
\ No newline at end of file
+        for date in ['creation_date', 'update_date']:
+            if date in respresentation:
+                respresentation[date] = getattr(instance, date).strftime('%Y-%m-%d %H:%M:%S')
+
+
+        return respresentation
+
+
+def student_document():
+    """StudentAllSerializer armado por PostgreSQL (school_api/pgjson.py)."""
+    return pgjson.JSONBuild(
+        id='id',
+        name='name',
+        phone='phone',
+        birthdate=pgjson.to_char('birthdate', pgjson.DAY_FORMAT),
+        address='address',
+        emergency_contact='emergency_contact',
+        creation_date=pgjson.to_char('creation_date', pgjson.DATE_FORMAT),
+        update_date=pgjson.to_char('update_date', pgjson.DATE_FORMAT),
+        suspended_student='suspended_student',
+        user=pgjson.JSONBuild(username='user__username', email='user__email'),
+        tutor=pgjson.JSONBuild(tutor='tutor__name'),
+    )
@@ -0,0 +1,153 @@
+"""Resumen del portal del alumno (student/me/).
+
+Junta en una respuesta lo que devuelven showteacher/, showcourse/, showtutor/
+y shownote/: perfil, tutor, cada asignación en la que está matriculado (curso,
+profesor, horario, grado y sección) y sus notas, con tres consultas con join.
+
+El resumen se guarda en la caché por alumno bajo una versión que sale de una
+sola consulta agregada (última modificación y cantidad de filas del alumno,
+su tutor, matrículas, asignaciones, cursos, profesores y notas) más las
+versiones de la caché de referencia. Si nada cambió, la siguiente carga cuesta
+esa consulta y una lectura de la caché; la misma versión sirve de ETag.
+"""
+import hashlib
+from collections import Counter
+from dataclasses import dataclass
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Max
+from apps.administrator import refcache
+from apps.note.models import Note
+from apps.registration.models import CourseRegistration
+from .models import Student
+
+TIMEOUT = 60 * 60
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+ASSIGNMENT = 'courseregistration__teacher_course_assignment'
+
+# aciertos y fallos de la caché de resúmenes
+stats = Counter()
+
+
+@dataclass(frozen=True)
+class Version:
+    student_id: int
+    token: str
+
+    @property
+    def key(self):
+        return f'student-snapshot:{self.student_id}:{self.token}'
+
+
+def version_for(user):
+    """Versión del resumen del alumno del usuario, o None si no es alumno."""
+    data = Student.objects.filter(user=user).aggregate(
+        student=Max('id'),
+        updated=Max('update_date'),
+        tutor=Max('tutor__update_date'),
+        registrations=Max('courseregistration__update_date'),
+        registration_count=Count('courseregistration', distinct=True),
+        assignments=Max(f'{ASSIGNMENT}__update_time'),
+        assignment_count=Count(ASSIGNMENT, distinct=True),
+        courses=Max(f'{ASSIGNMENT}__course__update_date'),
+        teachers=Max(f'{ASSIGNMENT}__teacher__update_date'),
+        notes=Max('note__update_date'),
+        note_count=Count('note', distinct=True),
+    )
+    if data['student'] is None:
+        return None
+
+    parts = [f'{name}={data[name]}' for name in sorted(data)]
+    parts += [f'{label}={refcache.version(label)}' for label in ('grade', 'section', 'schedule')]
+    return Version(
+        student_id=data['student'],
+        token=hashlib.sha1('|'.join(parts).encode()).hexdigest(),
+    )
+
+
+def _date(value):
+    return value.strftime(DATE_FORMAT) if value else None
+
+
+def build(student_id):
+    """Arma el resumen desde la base (tres consultas)."""
+    student = Student.objects.select_related('user', 'tutor__user').get(pk=student_id)
+    grades, sections, schedules = refcache.table('grade'), refcache.table('section'), refcache.table('schedule')
+
+    through = CourseRegistration.teacher_course_assignment.through
+    rows = through.objects.filter(courseregistration__student_id=student_id).order_by(
+        'courseregistration_id', 'teachercourseassignment_id'
+    ).values_list(
+        'courseregistration_id', 'teachercourseassignment_id',
+        'teachercourseassignment__course_id', 'teachercourseassignment__course__name',
+        'teachercourseassignment__teacher_id', 'teachercourseassignment__teacher__name',
+        'teachercourseassignment__schedule_id', 'teachercourseassignment__grade_id',
+        'teachercourseassignment__section_id',
+    )
+    notes = Note.objects.filter(student_id=student_id).order_by('id').values_list(
+        'id', 'course__name', 'teacher__name', 'note', 'status_note', 'creation_date'
+    )
+
+    tutor = student.tutor
+    return {
+        'profile': {
+            'id': student.id,
+            'name': student.name,
+            'email': student.user.email,
+            'phone': student.phone,
+            'birthdate': student.birthdate.isoformat(),
+            'address': student.address,
+            'emergency_contact': student.emergency_contact,
+            'suspended_student': student.suspended_student,
+        },
+        'tutor': {
+            'name': tutor.name,
+            'phone': tutor.phone,
+            'address': tutor.address,
+            'email': tutor.user.email,
+        },
+        'courses': [
+            {
+                'registration': registration_id,
+                'assignment': assignment_id,
+                'course': {'id': course_id, 'name': course},
+                'teacher': {'id': teacher_id, 'name': teacher},
+                'schedule': str(schedules[schedule_id]) if schedule_id in schedules else None,
+                'grade': grades[grade_id].name if grade_id in grades else None,
+                'section': sections[section_id].name if section_id in sections else None,
+            }
+            for registration_id, assignment_id, course_id, course, teacher_id, teacher,
+            schedule_id, grade_id, section_id in rows
+        ],
+        'notes': [
+            {
+                'id': pk,
+                'course': course,
+                'teacher': teacher,
+                'note': str(value),
+                'status_note': status_note,
+                'creation_date': _date(creation_date),
+            }
+            for pk, course, teacher, value, status_note, creation_date in notes
+        ],
+    }
+
+
+def get(version):
+    """Resumen de la versión dada, desde la caché si ya se armó.
+
+    Dentro de una transacción abierta se arma sin guardar: la versión podría
+    corresponder a cambios que todavía no se confirman.
+    """
+    if connection.in_atomic_block:
+        stats['bypass'] += 1
+        return build(version.student_id)
+
+    data = cache.get(version.key)
+    if data is None:
+        stats['miss'] += 1
+        data = build(version.student_id)
+        cache.set(version.key, data, TIMEOUT)
+    else:
+        stats['hit'] += 1
+    return data
@@ -1,3 +1,235 @@
-from django.test import TestCase
+import json
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, AsyncClient
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from apps.administrator import refcache, namesGroup
+from apps.authentication.roles import issue_tokens, bump_role_epoch
+from apps.administrator.seed import seed_school
+from . import snapshot
+from .models import Student
+from .serializers import StudentShortSerializer, STUDENT_SHORT_ROWS
 
-# Create your tests here.
+
+class StudentConditionalGetTestCase(TestCase):
+    def setUp(self):
+        self.school = seed_school(students=2, courses=2, teachers=1, grades=1, sections=1)
+        self.student = self.school.students[0]
+        self.student.user.groups.add(Group.objects.create(name='Alumnos'))
+        self.client = APIClient()
+        self.client.force_authenticate(self.student.user)
+
+    def test_notas_propias_sin_cambios(self):
+        response = self.client.get('/student/shownote/')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get('/student/shownote/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_nota_modificada(self):
+        etag = self.client.get('/student/shownote/')['ETag']
+        note = self.school.notes[0]
+        note.note = 99
+        note.save()
+
+        response = self.client.get('/student/shownote/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class SnapshotTestCase(TestCase):
+    def setUp(self):
+        self.school = seed_school(students=4, courses=3, teachers=2, grades=1, sections=2)
+        self.student = self.school.students[0]
+        self.student.user.groups.add(Group.objects.create(name='Alumnos'))
+        self.client = APIClient()
+        self.client.force_authenticate(self.student.user)
+
+    def test_resumen_completo(self):
+        response = self.client.get('/student/me/')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(response.data['profile']['id'], self.student.id)
+        self.assertEqual(response.data['tutor']['name'], self.student.tutor.name)
+        assignments = self.student.courseregistration_set.get().teacher_course_assignment.all()
+        self.assertEqual([row['assignment'] for row in response.data['courses']],
+                         sorted(assignment.id for assignment in assignments))
+        first = assignments.order_by('id').select_related('course', 'teacher', 'schedule', 'grade', 'section')[0]
+        self.assertEqual(response.data['courses'][0]['course']['name'], first.course.name)
+        self.assertEqual(response.data['courses'][0]['teacher']['name'], first.teacher.name)
+        self.assertEqual(response.data['courses'][0]['schedule'], str(first.schedule))
+        self.assertEqual(response.data['courses'][0]['section'], first.section.name)
+        self.assertEqual(len(response.data['notes']), self.student.note_set.count())
+
+    def test_sin_cambios_responde_304(self):
+        etag = self.client.get('/student/me/')['ETag']
+
+        response = self.client.get('/student/me/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        note = self.student.note_set.first()
+        note.note = 1
+        note.save()
+        response = self.client.get('/student/me/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_usuario_sin_alumno(self):
+        self.client.force_authenticate(self.school.tutors[0].user)
+        self.school.tutors[0].user.groups.add(Group.objects.get(name='Alumnos'))
+        response = self.client.get('/student/me/')
+        self.assertEqual(response.status_code, 404)
+
+
+class SnapshotCacheTestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        refcache._local.clear()
+        snapshot.stats.clear()
+        self.school = seed_school(students=2, courses=3, teachers=2, grades=1, sections=1)
+        self.student = self.school.students[0]
+
+    def test_segunda_carga_desde_la_cache(self):
+        version = snapshot.version_for(self.student.user)
+        primera = snapshot.get(version)
+
+        with self.assertNumQueries(1):
+            version = snapshot.version_for(self.student.user)
+            self.assertEqual(snapshot.get(version), primera)
+        self.assertEqual(snapshot.stats['miss'], 1)
+        self.assertEqual(snapshot.stats['hit'], 1)
+
+    def test_cambio_cambia_la_version(self):
+        anterior = snapshot.version_for(self.student.user)
+        snapshot.get(anterior)
+
+        note = self.student.note_set.first()
+        note_id = note.id
+        note.delete()
+        version = snapshot.version_for(self.student.user)
+        self.assertNotEqual(version.token, anterior.token)
+        self.assertNotIn(note_id, [row['id'] for row in snapshot.get(version)['notes']])
+
+        # los nombres de sección salen de la caché de referencia
+        section = self.school.sections[0]
+        section.name = 'Z'
+        section.save()
+        self.assertNotEqual(snapshot.version_for(self.student.user).token, version.token)
+
+
+class AsyncReadTestCase(TestCase):
+    def setUp(self):
+        self.school = seed_school(students=4, courses=3, teachers=2, grades=1, sections=2)
+        self.student = self.school.students[0]
+        self.client = AsyncClient()
+        # los tokens se emiten fuera del loop: issue_tokens consulta la base de forma síncrona
+        self.tokens = {
+            'alumno': self.token(self.student.user, namesGroup.STUDENT),
+            'otro rol': self.token(self.student.user, namesGroup.TEACHER),
+            'sin alumno': self.token(self.school.tutors[0].user, namesGroup.STUDENT),
+        }
+
+    def token(self, user, role):
+        return f'Bearer {issue_tokens(user, role).access_token}'
+
+    async def test_notas_y_cursos_del_alumno(self):
+        token = self.tokens['alumno']
+
+        response = await self.client.get('/student/async/notes/', headers={'Authorization': token})
+        self.assertEqual(response.status_code, 200)
+        notes = response.json()['results']
+        # mismo orden que la paginación por cursor de los endpoints síncronos
+        expected = [pk async for pk in self.student.note_set.order_by('-update_date', '-id').values_list('id', flat=True)]
+        self.assertEqual([note['id'] for note in notes], expected)
+
+        response = await self.client.get('/student/async/courses/', headers={'Authorization': token})
+        self.assertEqual(len(response.json()['results']), 3)
+
+        response = await self.client.get('/student/async/tutor/', headers={'Authorization': token})
+        self.assertEqual(response.json()['results'][0]['name'], self.school.tutors[0].name)
+
+    async def test_sin_token_o_con_otro_rol(self):
+        response = await self.client.get('/student/async/notes/')
+        self.assertEqual(response.status_code, 401)
+
+        token = self.tokens['otro rol']
+        response = await self.client.get('/student/async/notes/', headers={'Authorization': token})
+        self.assertEqual(response.status_code, 403)
+
+    async def test_paginado_por_cursor(self):
+        token = self.tokens['alumno']
+        ids, url = [], '/student/async/notes/?page_size=2'
+        while url:
+            response = await self.client.get(url, headers={'Authorization': token})
+            data = response.json()
+            self.assertLessEqual(len(data['results']), 2)
+            ids += [note['id'] for note in data['results']]
+            url = data['next']
+        self.assertEqual(sorted(ids), [pk async for pk in self.student.note_set.order_by('id').values_list('id', flat=True)])
+
+    async def test_misma_autenticacion_que_drf(self):
+        response = await self.client.get('/student/async/notes/', headers={'Authorization': 'Bearer invalido'})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'token_not_valid')
+
+        # un cambio de rol invalida el token también en las vistas async
+        await sync_to_async(bump_role_epoch)(self.student.user)
+        response = await self.client.get('/student/async/notes/', headers={'Authorization': self.tokens['alumno']})
+        self.assertEqual(response.status_code, 403)
+
+    async def test_usuario_sin_alumno(self):
+        token = self.tokens['sin alumno']
+        response = await self.client.get('/student/async/notes/', headers={'Authorization': token})
+        self.assertEqual(response.status_code, 404)
+
+
+class StudentShortFastPathTestCase(TestCase):
+    def setUp(self):
+        self.school = seed_school(students=5, courses=2, teachers=1, grades=1, sections=1, with_groups=True)
+
+    def test_misma_salida_que_el_serializer(self):
+        students = Student.objects.order_by('id')
+        esperado = json.loads(JSONRenderer().render(StudentShortSerializer(students, many=True).data))
+        with self.assertNumQueries(1):
+            data = STUDENT_SHORT_ROWS.build(STUDENT_SHORT_ROWS.values(students))
+        self.assertEqual(json.loads(JSONRenderer().render(data)), esperado)
+
+    def test_listado_del_profesor_paginado(self):
+        client = APIClient()
+        client.force_authenticate(self.school.teachers[0].user)
+        ids = []
+        url = '/teacher/students/?page_size=2'
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(sorted(ids), sorted(student.id for student in self.school.students))
+
+    def test_fields_y_expand_recortan_el_listado(self):
+        client = APIClient()
+        client.force_authenticate(self.school.teachers[0].user)
+        rows = client.get('/teacher/students/?fields=id,name').data['results']
+        self.assertEqual(set(rows[0]), {'id', 'name'})
+        rows = client.get('/teacher/students/?expand=').data['results']
+        self.assertIsInstance(rows[0]['tutor'], int)
+
+    def test_fields_no_vuelve_al_serializer(self):
+        client = APIClient()
+        client.force_authenticate(self.school.students[0].user)
+
+        def queries(url):
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            return response, len(context)
+
+        full, full_queries = queries('/student/shownote/')
+        trimmed, trimmed_queries = queries('/student/shownote/?fields=note')
+        self.assertEqual([set(row) for row in trimmed.data['results']], [{'note'}] * len(full.data['results']))
+        self.assertEqual([row['note'] for row in trimmed.data['results']], [row['note'] for row in full.data['results']])
+        self.assertLessEqual(trimmed_queries, full_queries)
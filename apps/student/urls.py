@@ -1,9 +1,16 @@
 from django.urls import path
-from .views import ShowTeacherListApiView, ShowCourseListApiView, ShowTutorListApiView, ShowNotaListApiView
+from . import async_views
+from .views import ShowTeacherListApiView, ShowCourseListApiView, ShowTutorListApiView, ShowNotaListApiView, SnapshotApiView
 
 urlpatterns = [
     path('showteacher/', ShowTeacherListApiView.as_view(), name="showteacher"),
     path('showcourse/', ShowCourseListApiView.as_view(), name="showcourse"),
     path('showtutor/', ShowTutorListApiView.as_view(), name="showtutor"),
-    path('shownote/', ShowNotaListApiView.as_view(), name="shownote")
+    path('shownote/', ShowNotaListApiView.as_view(), name="shownote"),
+    path('me/', SnapshotApiView.as_view(), name="student-me"),
+    # lectura async (ASGI)
+    path('async/notes/', async_views.NotesView.as_view(), name="async-student-notes"),
+    path('async/courses/', async_views.CoursesView.as_view(), name="async-student-courses"),
+    path('async/teachers/', async_views.TeachersView.as_view(), name="async-student-teachers"),
+    path('async/tutor/', async_views.TutorView.as_view(), name="async-student-tutor")
 ]
\ No newline at end of file
@@ -1,6 +1,11 @@
-from rest_framework.generics import ListAPIView 
+import hashlib
+from rest_framework import status
+from rest_framework.generics import ListAPIView, GenericAPIView
+from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from apps.note.serializers import NoteSerializers, Note
+from school_api.conditional import ConditionalGetMixin
+from school_api.fastpath import FastListMixin
+from apps.note.serializers import NoteSerializers
 from apps.teacher.serializers import TeacherSerializer, Teacher
 from apps.authentication.permissions import IsInGroup 
 from apps.administrator import namesGroup
@@ -8,13 +13,14 @@ from apps.student.models import Student
 from apps.course.serializers import TeacherCourseAssignment, CourseofStudent, Course
 from apps.registration.serializers import CourseRegistration
 from apps.tutor.serializers import Tutor, ShortTutorSerializer
-from apps.note.serializers import Note, ShortNoteSerializer
+from apps.note.serializers import Note, ShortNoteSerializer, SHORT_NOTE_ROWS
+from . import snapshot
 
-class ShowTeacherListApiView(ListAPIView):
+class ShowTeacherListApiView(ConditionalGetMixin, ListAPIView):
     authentication_classes = [JWTAuthentication]
     serializer_class = TeacherSerializer
     permission_classes = [IsInGroup]
-    allowed_groups = namesGroup.StudentNames()
+    allowed_roles = [namesGroup.STUDENT]
 
     def get_queryset(self):
         user = self.request.user
@@ -43,11 +49,11 @@ class ShowTeacherListApiView(ListAPIView):
 
 
 
-class ShowCourseListApiView(ListAPIView):
+class ShowCourseListApiView(ConditionalGetMixin, ListAPIView):
     authentication_classes = [JWTAuthentication]
     serializer_class = CourseofStudent
     permission_classes = [IsInGroup]
-    allowed_groups = namesGroup.StudentNames()
+    allowed_roles = [namesGroup.STUDENT]
 
 
     def get_queryset(self):
@@ -66,10 +72,10 @@ class ShowCourseListApiView(ListAPIView):
 
 
     
-class ShowCourseAssignmentListApiView(ListAPIView):
+class ShowCourseAssignmentListApiView(ConditionalGetMixin, ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsInGroup]
-    allowed_groups = namesGroup.StudentNames()
+    allowed_roles = [namesGroup.STUDENT]
 
     def get_queryset(self):
         user = self.request.user
@@ -79,10 +85,10 @@ class ShowCourseAssignmentListApiView(ListAPIView):
 
         return CourseRegistration.objects.filter(student=student)
 
-class ShowTutorListApiView(ListAPIView): 
+class ShowTutorListApiView(ConditionalGetMixin, ListAPIView): 
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsInGroup]
-    allowed_groups = namesGroup.StudentNames()
+    allowed_roles = [namesGroup.STUDENT]
     serializer_class = ShortTutorSerializer
 
     def get_queryset(self):
@@ -93,23 +99,43 @@ class ShowTutorListApiView(ListAPIView):
 
         return Tutor.objects.filter(id=student.tutor.id)
 
-class ShowNotaListApiView(ListAPIView):
+class ShowNotaListApiView(ConditionalGetMixin, FastListMixin, ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsInGroup]
-    allowed_groups = namesGroup.StudentNames()
+    allowed_roles = [namesGroup.STUDENT]
     serializer_class = ShortNoteSerializer
+    fast_list = SHORT_NOTE_ROWS
 
     def get_queryset(self):
         user = self.request.user
         try:
             student = Student.objects.get(user=user)
-        except Student.DoesNotExist: return Student.objects.none()
+        except Student.DoesNotExist: return Note.objects.none()
 
         return Note.objects.filter(student=student)
-    
+
+
+class SnapshotApiView(ConditionalGetMixin, GenericAPIView):
+    """
+    perfil, tutor, cursos y notas del alumno en una sola respuesta
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsInGroup]
+    allowed_roles = [namesGroup.STUDENT]
+
+    def conditional_validators(self, request, queryset):
+        token = f'{self.conditional_scope(request)}|{self.version.token}'
+        return '"%s"' % hashlib.sha1(token.encode()).hexdigest(), None
+
+    def get(self, request):
+        self.version = snapshot.version_for(request.user)
+        if self.version is None:
+            return Response({'error': 'El usuario no está asignado a ningún alumno.'}, status=status.HTTP_404_NOT_FOUND)
+        return self.conditional(request, None, lambda: Response(snapshot.get(self.version), status=status.HTTP_200_OK))
+
 
 #ver nota de los cursos 
-class AlumnoNotaListView(ListAPIView):
+class AlumnoNotaListView(ConditionalGetMixin, ListAPIView):
     """
     para alumnos -> Read
     """
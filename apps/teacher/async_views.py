@@ -0,0 +1,42 @@
+from school_api.async_views import AsyncReadView
+from apps.administrator import namesGroup
+from apps.course.models import TeacherCourseAssignment
+from apps.note.models import Note
+from apps.student.models import Student
+from .models import Teacher
+
+
+class TeacherReadView(AsyncReadView):
+    allowed_roles = [namesGroup.TEACHER]
+    profile = Teacher
+    not_found = 'profesor no encontrado'
+
+
+class CoursesView(TeacherReadView):
+    fields = dict(
+        id='id', course='course__name', grade='grade__name', section='section__name',
+        start_time='schedule__start_time', end_time='schedule__end_time',
+    )
+
+    def queryset(self, teacher):
+        return TeacherCourseAssignment.objects.filter(teacher=teacher)
+
+
+class StudentsView(TeacherReadView):
+    fields = dict(
+        id='id', name='name', suspended_student='suspended_student', email='user__email',
+        phone='phone', tutor='tutor__name',
+    )
+
+    def queryset(self, teacher):
+        return Student.objects.filter(courseregistration__teacher_course_assignment__teacher=teacher).distinct()
+
+
+class NotesView(TeacherReadView):
+    fields = dict(
+        id='id', student='student__name', course='course__name', teacher='teacher__name',
+        note='note', status_note='status_note', creation_date='creation_date',
+    )
+
+    def queryset(self, teacher):
+        return Note.objects.filter(student__courseregistration__teacher_course_assignment__teacher=teacher).distinct()
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:30
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teacher', '0002_teacher_teacher_update_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='teacher',
+            name='name',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='teacher',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='teacher_name_lower_uniq'),
+        ),
+    ]
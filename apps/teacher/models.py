@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 
 class Speciality(models.Model):
@@ -12,13 +13,15 @@ class Speciality(models.Model):
 class Teacher(models.Model):
     user = models.OneToOneField(User, on_delete=models.PROTECT)
     speciality = models.ManyToManyField(Speciality) 
-    name = models.CharField(max_length=255, unique=True)
+    name = models.CharField(max_length=255)
     phone = models.CharField(max_length=11)
     create_date = models.DateTimeField(auto_now_add=True)
     update_date = models.DateTimeField(auto_now=True)
 
     class Meta: 
         db_table = "teacher"
+        indexes = [models.Index(fields=['update_date', 'id'], name='teacher_update_id_idx')]
+        constraints = [models.UniqueConstraint(Lower('name'), name='teacher_name_lower_uniq')]
 
     def __str__(self): return self.name
     
@@ -2,11 +2,15 @@ from rest_framework import serializers
 from .models import Speciality, Teacher
 from django.contrib.auth.models import User
 from django.db import IntegrityError, transaction
-from apps.administrator.namesGroup import TeacherNames
+from apps.administrator.namesGroup import ROLE_NAMES, TEACHER
+from apps.administrator.integrity import violates
 from apps.registration.serializers import CourseRegistration, TeacherCourseAssignment
+from apps.administrator import refcache
+from apps.administrator.refcache import CachedPrimaryKeyRelatedField
+from school_api.sparse import SparseFieldsMixin, Eager
 
 #serializador para especialidad
-class SpecialitySerializer(serializers.ModelSerializer):
+class SpecialitySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta: 
         model = Speciality
         fields = ['id', 'name']
@@ -19,10 +23,7 @@ class SpecialitySerializer(serializers.ModelSerializer):
         return speciality
 
     def to_representation(self, instance):
-        return {
-            'id': instance.id,
-            'name': instance.name,
-        }
+        return {name: getattr(instance, name) for name in ['id', 'name'] if self.includes(name)}
         
 class ShortTeacherSerializer(serializers.ModelSerializer):
     class Meta:
@@ -43,7 +44,7 @@ class TeacherOfCourseAssignmentSerializer(serializers.ModelSerializer):
 #información completa para profesor de asignación
 class TeacherForAdminSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=True)
-    speciality = serializers.PrimaryKeyRelatedField(many=True, queryset=Speciality.objects.all(), required=True)
+    speciality = CachedPrimaryKeyRelatedField('speciality', many=True, required=True)
     course_assignments = TeacherOfCourseAssignmentSerializer(source='teachercourseassignment_set', many=True, read_only=True)
     
     class Meta:
@@ -53,7 +54,7 @@ class TeacherForAdminSerializer(serializers.ModelSerializer):
 #serializador de profesor para tutor
 class TeacherForTutorSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
-    speciality = serializers.PrimaryKeyRelatedField(many=True, queryset=Speciality.objects.all())
+    speciality = CachedPrimaryKeyRelatedField('speciality', many=True)
     grade = serializers.SerializerMethodField()
     section = serializers.SerializerMethodField()
 
@@ -64,13 +65,13 @@ class TeacherForTutorSerializer(serializers.ModelSerializer):
     def get_grade(self, obj):
         teacher_assignmet = TeacherCourseAssignment.objects.filter(teacher=obj).first()
         if teacher_assignmet:
-            return teacher_assignmet.grade.name
+            return refcache.get('grade', teacher_assignmet.grade_id).name
         return None
     
     def get_section(self, obj):
         teacher_assignment = TeacherCourseAssignment.objects.filter(teacher=obj).first()
         if teacher_assignment:
-            return teacher_assignment.section.name
+            return refcache.get('section', teacher_assignment.section_id).name
         return None
     
     def to_representation(self, instance):
@@ -83,9 +84,12 @@ class TeacherForTutorSerializer(serializers.ModelSerializer):
         return representation
     
 #serializador para profesor
-class TeacherSerializer(serializers.ModelSerializer):
+class TeacherSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=True)
-    speciality = serializers.PrimaryKeyRelatedField(many=True, queryset=Speciality.objects.all())
+    speciality = CachedPrimaryKeyRelatedField('speciality', many=True)
+    expandable_fields = {'user': Eager(select=('user',))}
+    # los ids y los nombres salen de la misma consulta
+    eager_fields = {'speciality': Eager(prefetch=('speciality',))}
 
     class Meta:
         model = Teacher
@@ -102,13 +106,13 @@ class TeacherSerializer(serializers.ModelSerializer):
         super(TeacherSerializer, self).__init__(*args, **kwargs)
         
         if self.instance:
-            for field in ['name', 'phone', 'speciality', 'user']:
+            # con ?fields= algunos campos no están
+            for field in [name for name in ['name', 'phone', 'speciality', 'user'] if name in self.fields]:
                 self.fields[field].required = False 
                 self.fields[field].allow_blank = True
 
     def validate(self, data):
         instance = self.instance
-        name = data.get('name')
         speciality = data.get('speciality')
         user = data.get('user')
 
@@ -118,17 +122,14 @@ class TeacherSerializer(serializers.ModelSerializer):
             except Exception as e:
                 raise serializers.ValidationError({'error': 'Error inesperado: ' + str(e)})
 
-            if name and Teacher.objects.filter(name__iexact=name).exists():
-                raise serializers.ValidationError({"Error": f"profesor {name} ya existente"})
-
             if not groupname:
                 raise serializers.ValidationError(f"El usuario no pertenece a ningún grupo.")
 
-            if groupname.lower() not in {namest.lower() for namest in TeacherNames()}:
+            if groupname.casefold() not in ROLE_NAMES[TEACHER]:
                 raise serializers.ValidationError(f"El grupo no es correcto para este usuario. Se encontró: {groupname}")
             
             for spec in speciality:
-                if not Speciality.objects.filter(id=spec.id).exists():
+                if refcache.get('speciality', spec.id) is None:
                     raise serializers.ValidationError(f"La especialidad con ID {spec.id} no existe.")
             
             if Teacher.objects.filter(user=user).exists():
@@ -149,22 +150,34 @@ class TeacherSerializer(serializers.ModelSerializer):
             return teacher
         
         except IntegrityError as e:
+            if violates(e, 'teacher_name_lower_uniq'):
+                raise serializers.ValidationError({"Error": f"profesor {validated_data['name']} ya existente"})
             raise serializers.ValidationError({'error': 'Error de integridad: ' + str(e)})
         except ValueError: 
             raise serializers.ValidationError({'error': 'Error de valor: ' + str(e)})
         except Exception as e:
             raise serializers.ValidationError({'error': 'Error inesperado: ' + str(e)})
 
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError as e:
+            if violates(e, 'teacher_name_lower_uniq'):
+                raise serializers.ValidationError({"Error": f"profesor {validated_data.get('name', instance.name)} ya existente"})
+            raise serializers.ValidationError({'error': 'Error de integridad: ' + str(e)})
+
     def to_representation(self, instance):
         representation = super().to_representation(instance)
 
-        specialities = instance.speciality.all()
+        specialities = instance.speciality.all() if self.expanded('speciality') else None
         if specialities:
             representation['speciality'] = {speciality.name for speciality in specialities}
         
-        if instance.user: representation['user'] = {instance.user.email}
-        representation['create_date'] = instance.create_date.strftime('%Y-%m-%d %H:%M:%S')  # Ajusta el formato según necesites
-        representation['update_date'] = instance.update_date.strftime('%Y-%m-%d %H:%M:%S')  # Ajusta el formato según necesites
+        if self.expanded('user') and instance.user: representation['user'] = {instance.user.email}
+        for date in ['create_date', 'update_date']:
+            if date in representation:
+                representation[date] = getattr(instance, date).strftime('%Y-%m-%d %H:%M:%S')
 
         return representation  
 
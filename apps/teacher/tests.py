@@ -1,3 +1,68 @@
+from decimal import Decimal
+from django.contrib.auth.models import Group
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from apps.administrator.seed import seed_school
+from apps.note import aggregates
+from apps.note.models import Note
+from apps.registration.models import CourseRegistration
 
-# Create your tests here.
+
+class BulkNoteTestCase(TestCase):
+    def setUp(self):
+        self.school = seed_school(students=12, courses=2, teachers=2, grades=1, sections=1, with_notes=False)
+        self.assignment = self.school.assignments[0]
+        self.teacher = self.assignment.teacher
+        self.teacher.user.groups.add(Group.objects.create(name='Profesores'))
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher.user)
+        self.students = list(CourseRegistration.objects.filter(
+            teacher_course_assignment=self.assignment).values_list('student_id', flat=True))
+
+    def enviar(self, notes, assignment=None):
+        return self.client.post('/teacher/note/bulk/', {
+            'assignment': (assignment or self.assignment).id, 'notes': notes
+        }, format='json')
+
+    def test_crea_y_actualiza_en_bloque(self):
+        response = self.enviar([{'student': student, 'note': 70, 'status_note': True} for student in self.students])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 12)
+
+        response = self.enviar([{'student': self.students[0], 'note': 40, 'status_note': False}])
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(Note.objects.filter(course=self.assignment.course).count(), 12)
+        self.assertEqual(Note.objects.get(student_id=self.students[0]).note, Decimal('40'))
+        self.assertEqual(aggregates.check(), [])
+
+    def test_errores_por_alumno_sin_detener_el_resto(self):
+        notes = [
+            {'student': self.students[0], 'note': 90},
+            {'student': self.students[1], 'note': 150},
+            {'student': self.students[0], 'note': 80},
+            {'student': 999999, 'note': 80},
+        ]
+        response = self.enviar(notes)
+
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['failed'], 3)
+        errores = {error['position']: error['errors'] for error in response.data['errors']}
+        self.assertIn('note', errores[1])
+        self.assertIn('student', errores[2])
+        self.assertIn('student', errores[3])
+
+    def test_consultas_no_dependen_del_listado(self):
+        def consultas(students):
+            with CaptureQueriesContext(connection) as contexto:
+                self.enviar([{'student': student, 'note': 75} for student in students])
+            return len(contexto.captured_queries)
+
+        self.assertEqual(consultas(self.students[:2]), consultas(self.students[2:]))
+
+    def test_asignacion_de_otro_profesor(self):
+        ajena = next(a for a in self.school.assignments if a.teacher_id != self.teacher.id)
+        response = self.enviar([{'student': self.students[0], 'note': 75}], assignment=ajena)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('assignment', response.data)
@@ -1,9 +1,15 @@
 from django.urls import path, include
-from .views import TeacherApiView, CoursesApiView, NoteStudentApiView, ShowStudentsApiview
+from . import async_views
+from .views import TeacherApiView, CoursesApiView, NoteStudentApiView, ShowStudentsApiview, BulkNoteApiView
 
 urlpatterns = [
     path('teacher/', TeacherApiView.as_view()),
     path('courses/', CoursesApiView.as_view(), name='courses'),
     path('note/', NoteStudentApiView.as_view(), name='students-courses'),
+    path('note/bulk/', BulkNoteApiView.as_view(), name='notes-bulk'),
     path('students/', ShowStudentsApiview.as_view(), name='students'),
+    # lectura async (ASGI)
+    path('async/courses/', async_views.CoursesView.as_view(), name='async-teacher-courses'),
+    path('async/students/', async_views.StudentsView.as_view(), name='async-teacher-students'),
+    path('async/notes/', async_views.NotesView.as_view(), name='async-teacher-notes'),
 ]
\ No newline at end of file
@@ -2,22 +2,27 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from apps.authentication.permissions import IsInGroup
 from .models import Teacher
 from .serializers import TeacherSerializer
-from rest_framework.generics import ListAPIView
+from rest_framework.generics import ListAPIView, GenericAPIView
+from rest_framework.response import Response
+from rest_framework import status
+from school_api.conditional import ConditionalGetMixin
+from school_api.fastpath import FastListMixin
+from school_api.pgjson import DocumentListMixin
 from apps.administrator import namesGroup
 from apps.course.serializers import Course, TeacherCourseAssignment
 from apps.registration.serializers import CourseRegistration
 from apps.teacher.serializers import TeacherSerializer, TeacherOfCourseAssignmentSerializer
-from apps.student.serializers import Student, StudentShortSerializer
-from apps.note.serializers import Note, NoteSerializers
+from apps.student.serializers import Student, StudentShortSerializer, STUDENT_SHORT_ROWS
+from apps.note.serializers import Note, NoteSerializers, BulkNoteSerializer, NOTE_ROWS, note_document
 
-class TeacherApiView(ListAPIView):
+class TeacherApiView(ConditionalGetMixin, ListAPIView):
     """
     El profesor puede ver su información
     """
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsInGroup]
     serializer_class = TeacherSerializer
-    allowed_groups = namesGroup.TeacherNames()
+    allowed_roles = [namesGroup.TEACHER]
     
     def get_queryset(self):
         user = self.request.user
@@ -27,14 +32,14 @@ class TeacherApiView(ListAPIView):
             return Teacher.objects.none()
         return teacher
 
-class CoursesApiView(ListAPIView):
+class CoursesApiView(ConditionalGetMixin, ListAPIView):
     """
     El profesor puede ver los cursos que tiene asignados
     """
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsInGroup]
     serializer_class = TeacherOfCourseAssignmentSerializer
-    allowed_groups = namesGroup.TeacherNames()
+    allowed_roles = [namesGroup.TEACHER]
 
     def get_queryset(self):
         user = self.request.user
@@ -47,14 +52,14 @@ class CoursesApiView(ListAPIView):
         return teacher_course_assignment
     
 
-class ShowStudentCoursesApiView(ListAPIView):
+class ShowStudentCoursesApiView(ConditionalGetMixin, ListAPIView):
     """
     El profesor puede ver los alumnos asignados
     """
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsInGroup]
     serializer_class = Course
-    allowed_groups = namesGroup.TeacherNames()
+    allowed_roles = [namesGroup.TEACHER]
 
     def get_queryset(self):
         user=self.request.user
@@ -65,35 +70,58 @@ class ShowStudentCoursesApiView(ListAPIView):
         registrations = CourseRegistration.objects.filter(teacher=teacher)
         return registrations
 
-class ShowStudentsApiview(ListAPIView):
+class ShowStudentsApiview(ConditionalGetMixin, FastListMixin, ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsInGroup]
-    allowed_groups = namesGroup.TeacherNames()
+    allowed_roles = [namesGroup.TEACHER]
     serializer_class = StudentShortSerializer
+    fast_list = STUDENT_SHORT_ROWS
 
     def get_queryset(self):
         user=self.request.user
         try:
             teacher=Teacher.objects.get(user=user)
-        except Teacher.DoesNotExist: return Teacher.objects.none()
+        except Teacher.DoesNotExist: return Student.objects.none()
 
         teacher_assignments = TeacherCourseAssignment.objects.filter(teacher=teacher)
         return Student.objects.filter(courseregistration__teacher_course_assignment__in=teacher_assignments).distinct()
 
-class NoteStudentApiView(ListAPIView):
+class NoteStudentApiView(ConditionalGetMixin, DocumentListMixin, FastListMixin, ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsInGroup]
-    allowed_groups = namesGroup.TeacherNames()
+    allowed_roles = [namesGroup.TEACHER]
     serializer_class = NoteSerializers
+    fast_list = NOTE_ROWS
+    document = staticmethod(note_document)
 
     def get_queryset(self):
         user=self.request.user
         try:
             teacher = Teacher.objects.get(user=user)
-        except Teacher.DoesNotExist: Note.objects.none()
+        except Teacher.DoesNotExist: return Note.objects.none()
 
         teacher_assignments = TeacherCourseAssignment.objects.filter(teacher=teacher)
-        return Note.objects.filter(student__courseregistration__teacher_course_assignment__in=teacher_assignments).distinct()
-    
+        notes = Note.objects.filter(student__courseregistration__teacher_course_assignment__in=teacher_assignments).distinct()
+        return NoteSerializers.setup_eager_loading(notes)
+
+
+class BulkNoteApiView(GenericAPIView):
+    """
+    El profesor carga las notas de una asignación en un solo POST:
+    {"assignment": id, "notes": [{"student": id, "note": 85, "status_note": true}]}
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsInGroup]
+    allowed_roles = [namesGroup.TEACHER]
+    serializer_class = BulkNoteSerializer
+
+    def post(self, request):
+        try:
+            teacher = Teacher.objects.get(user=request.user)
+        except Teacher.DoesNotExist:
+            return Response({'error': 'profesor no encontrado'}, status=status.HTTP_404_NOT_FOUND)
 
+        serializer = self.get_serializer(data=request.data, context={**self.get_serializer_context(), 'teacher': teacher})
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save(), status=status.HTTP_200_OK)
 
@@ -0,0 +1,43 @@
+from school_api.async_views import AsyncReadView
+from apps.administrator import namesGroup
+from apps.course.models import TeacherCourseAssignment
+from apps.note.models import Note
+from apps.student.models import Student
+from .models import Tutor
+
+
+class TutorReadView(AsyncReadView):
+    allowed_roles = [namesGroup.TUTOR]
+    profile = Tutor
+    not_found = 'El usuario no está asignado a ningún tutor.'
+
+
+class StudentsView(TutorReadView):
+    fields = dict(
+        id='id', name='name', suspended_student='suspended_student', email='user__email',
+        phone='phone', emergency_contact='emergency_contact', address='address',
+    )
+
+    def queryset(self, tutor):
+        return Student.objects.filter(tutor=tutor)
+
+
+class CoursesView(TutorReadView):
+    fields = dict(
+        student='courseregistration__student__name', id='id', course='course__name',
+        teacher='teacher__name', grade='grade__name', section='section__name',
+        start_time='schedule__start_time', end_time='schedule__end_time',
+    )
+
+    def queryset(self, tutor):
+        return TeacherCourseAssignment.objects.filter(courseregistration__student__tutor=tutor)
+
+
+class NotesView(TutorReadView):
+    fields = dict(
+        id='id', student='student__name', course='course__name', teacher='teacher__name',
+        note='note', status_note='status_note', creation_date='creation_date',
+    )
+
+    def queryset(self, tutor):
+        return Note.objects.filter(student__tutor=tutor)
@@ -0,0 +1,152 @@
+"""Resumen completo de un tutor en una sola respuesta.
+
+Reúne lo que devuelven tutor/student/, tutor/courses/, tutor/notes/ y
+tutor/teacher/ para todos sus alumnos. La respuesta está normalizada: cada
+alumno, matrícula, asignación, curso, profesor y nota aparece una sola vez y
+las relaciones se expresan con ids. Grados, secciones, horarios y
+especialidades salen de la caché de referencia, así que el número de consultas
+es fijo (a lo sumo nueve, más la carga de la caché si está vacía) sin importar
+cuántos alumnos tenga el tutor.
+"""
+from collections import defaultdict
+from apps.administrator import refcache
+from apps.course.models import Course, TeacherCourseAssignment
+from apps.note.models import Note
+from apps.registration.models import CourseRegistration
+from apps.student.models import Student
+from apps.teacher.models import Teacher
+from .models import Tutor
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _name(table, pk):
+    instance = table.get(pk)
+    return instance.name if instance else None
+
+
+def _date(value):
+    return value.strftime(DATE_FORMAT) if value else None
+
+
+def build_dashboard(tutor):
+    """Diccionario con el tutor y las listas de alumnos, matrículas,
+    asignaciones, cursos, profesores y notas de sus alumnos (ordenadas por id)."""
+    # una lectura por tabla: dentro de una transacción cada lectura va a la base
+    grades, sections = refcache.table('grade'), refcache.table('section')
+    schedules, speciality_names = refcache.table('schedule'), refcache.table('speciality')
+
+    students = list(Student.objects.filter(tutor_id=tutor.id).order_by('id').values(
+        'id', 'name', 'suspended_student', 'phone', 'emergency_contact', 'address', 'user__email'
+    ))
+
+    registrations = list(CourseRegistration.objects.filter(student__tutor_id=tutor.id).order_by('id').values_list(
+        'id', 'student_id', 'grade_id', 'section_id', 'create_date', 'update_date'
+    ))
+    through = CourseRegistration.teacher_course_assignment.through
+    links = defaultdict(list)
+    for registration_id, assignment_id in through.objects.filter(
+        courseregistration__student__tutor_id=tutor.id
+    ).order_by('teachercourseassignment_id').values_list('courseregistration_id', 'teachercourseassignment_id'):
+        links[registration_id].append(assignment_id)
+
+    notes = list(Note.objects.filter(student__tutor_id=tutor.id).order_by('id').values_list(
+        'id', 'student_id', 'course_id', 'teacher_id', 'note', 'status_note', 'creation_date'
+    ))
+
+    assignment_ids = {assignment_id for ids in links.values() for assignment_id in ids}
+    assignments = []
+    if assignment_ids:
+        assignments = list(TeacherCourseAssignment.objects.filter(id__in=assignment_ids).order_by('id').values_list(
+            'id', 'course_id', 'teacher_id', 'grade_id', 'section_id', 'schedule_id'
+        ))
+
+    course_ids = {row[1] for row in assignments} | {row[2] for row in notes}
+    teacher_ids = {row[2] for row in assignments} | {row[3] for row in notes}
+    courses = []
+    if course_ids:
+        courses = list(Course.objects.filter(id__in=course_ids).order_by('id').values_list('id', 'name', 'speciality_id'))
+    teachers = []
+    specialities = defaultdict(list)
+    if teacher_ids:
+        teachers = list(Teacher.objects.filter(id__in=teacher_ids).order_by('id').values_list(
+            'id', 'name', 'phone', 'user__email'
+        ))
+        for teacher_id, speciality_id in Teacher.speciality.through.objects.filter(
+            teacher_id__in=teacher_ids
+        ).order_by('speciality_id').values_list('teacher_id', 'speciality_id'):
+            specialities[teacher_id].append(_name(speciality_names, speciality_id))
+
+    registrations_by_student = defaultdict(list)
+    for registration in registrations:
+        registrations_by_student[registration[1]].append(registration[0])
+    notes_by_student = defaultdict(list)
+    for note in notes:
+        notes_by_student[note[1]].append(note[0])
+
+    return {
+        'tutor': {'id': tutor.id, 'name': tutor.name},
+        'students': [
+            {
+                'id': student['id'],
+                'name': student['name'],
+                'suspended_student': student['suspended_student'],
+                'email': student['user__email'],
+                'phone': student['phone'],
+                'emergency_contact': student['emergency_contact'],
+                'address': student['address'],
+                'registrations': registrations_by_student[student['id']],
+                'notes': notes_by_student[student['id']],
+            }
+            for student in students
+        ],
+        'registrations': [
+            {
+                'id': pk,
+                'student': student_id,
+                'grade': _name(grades, grade_id),
+                'section': _name(sections, section_id),
+                'assignments': links[pk],
+                'create_date': _date(create_date),
+                'update_date': _date(update_date),
+            }
+            for pk, student_id, grade_id, section_id, create_date, update_date in registrations
+        ],
+        'assignments': [
+            {
+                'id': pk,
+                'course': course_id,
+                'teacher': teacher_id,
+                'grade': _name(grades, grade_id),
+                'section': _name(sections, section_id),
+                'schedule': str(schedules[schedule_id]) if schedule_id in schedules else None,
+            }
+            for pk, course_id, teacher_id, grade_id, section_id, schedule_id in assignments
+        ],
+        'courses': [
+            {'id': pk, 'name': name, 'speciality': _name(speciality_names, speciality_id)}
+            for pk, name, speciality_id in courses
+        ],
+        'teachers': [
+            {'id': pk, 'name': name, 'phone': phone, 'email': email, 'speciality': specialities[pk]}
+            for pk, name, phone, email in teachers
+        ],
+        'notes': [
+            {
+                'id': pk,
+                'student': student_id,
+                'course': course_id,
+                'teacher': teacher_id,
+                'note': str(value),
+                'status_note': status_note,
+                'creation_date': _date(creation_date),
+            }
+            for pk, student_id, course_id, teacher_id, value, status_note, creation_date in notes
+        ],
+    }
+
+
+def dashboard_for_user(user):
+    """Resumen del tutor asociado al usuario, o None si no es tutor."""
+    tutor = Tutor.objects.filter(user=user).only('id', 'name').first()
+    return build_dashboard(tutor) if tutor else None
@@ -0,0 +1,54 @@
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.administrator.bench import rollback, measure, report
+from apps.administrator.seed import seed_school
+from apps.tutor.views import (
+    StudentListApiView, ShowCoursesApiView, ShowNotesApiView, ShowTeachersApiView, DashboardApiView
+)
+
+SEPARATE = [
+    ('/tutor/student/', StudentListApiView),
+    ('/tutor/courses/', ShowCoursesApiView),
+    ('/tutor/notes/', ShowNotesApiView),
+    ('/tutor/teacher/', ShowTeachersApiView),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compara las cuatro llamadas del tutor (alumnos, cursos, notas, profesores) contra tutor/dashboard/.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--children', type=int, default=20, help='alumnos a cargo del tutor medido')
+        parser.add_argument('--courses', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+
+        # la paginación arma enlaces absolutos con el host de la petición simulada
+        with rollback(), override_settings(ALLOWED_HOSTS=['testserver']):
+            school = seed_school(students=options['children'] * 5, courses=options['courses'],
+                                 teachers=options['courses'], students_per_tutor=options['children'])
+            tutor = school.tutors[0]
+            tutor.user.groups.add(Group.objects.get_or_create(name='Tutores')[0])
+
+            def call(url, view):
+                request = factory.get(url)
+                force_authenticate(request, user=tutor.user)
+                response = view.as_view()(request)
+                response.render()
+                return response
+
+            def separate():
+                for url, view in SEPARATE:
+                    call(url, view)
+
+            def dashboard():
+                call('/tutor/dashboard/', DashboardApiView)
+
+            report(self.stdout, f"{tutor.student_set.count()} alumnos a cargo, {options['courses']} cursos", [
+                ('cuatro llamadas (antes)', *measure(separate, options['repeat'])),
+                ('tutor/dashboard/', *measure(dashboard, options['repeat'])),
+            ])
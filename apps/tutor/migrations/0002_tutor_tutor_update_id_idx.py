@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutor', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tutor',
+            index=models.Index(fields=['update_date', 'id'], name='tutor_update_id_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:30
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutor', '0002_tutor_tutor_update_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='tutor',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='tutor_name_lower_uniq'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 
 #modelo para el tutor
@@ -12,6 +13,8 @@ class Tutor(models.Model):
 
     class Meta:
         db_table = "tutor"
+        indexes = [models.Index(fields=['update_date', 'id'], name='tutor_update_id_idx')]
+        constraints = [models.UniqueConstraint(Lower('name'), name='tutor_name_lower_uniq')]
 
     def __str__(self): return self.name
 
@@ -2,22 +2,25 @@ from rest_framework import serializers
 from django.db import transaction, IntegrityError
 from .models import Tutor
 from django.contrib.auth.models import User
-from apps.student.models import Student
-from apps.administrator.namesGroup import TutorNames
+from apps.administrator.namesGroup import ROLE_NAMES, TUTOR
+from apps.administrator.integrity import violates
+from school_api.sparse import SparseFieldsMixin, Eager
 
-class TutorStudentSerializer(serializers.ModelSerializer):
+class TutorStudentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     student = serializers.SerializerMethodField()
+    expandable_fields = {'user': Eager(select=('user',))}
+    eager_fields = {'student': Eager(prefetch=('student_set',))}
+
     class Meta:
         model = Tutor
         fields = ['name', 'phone', 'address','user', 'student']
     
     def get_student(self, obj):
-        students = Student.objects.filter(tutor=obj)
-        return [student.name for student in students]
+        return [student.name for student in obj.student_set.all()]
     
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        if instance.user: representation['user'] = {'email': instance.user.email}
+        if self.expanded('user') and instance.user: representation['user'] = {'email': instance.user.email}
         return representation
 
 class ShortTutorSerializer(serializers.ModelSerializer):
@@ -68,7 +71,6 @@ class TutorSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         instance = self.instance
-        name = data.get('name')
         user = data.get('user')
         
 
@@ -78,23 +80,16 @@ class TutorSerializer(serializers.ModelSerializer):
             except Exception as e: 
                 raise serializers.ValidationError({'error': 'Error inesperado: ' + str(e)})
             
-            if name and Tutor.objects.filter(name__iexact=name).exists():
-                raise serializers.ValidationError({"Error": "tutor '{name}' ya existente"})
-
             if not groupname:
                 raise serializers.ValidationError(f"El usuario no pertenece a ningún grupo.")
 
-            if groupname.lower() not in {name.lower() for name in TutorNames()}:
+            if groupname.casefold() not in ROLE_NAMES[TUTOR]:
                 raise serializers.ValidationError(f"El grupo no es correcto para este usuario. Se encontró: {groupname}")
 
             if Tutor.objects.filter(user=user).exists():
                 raise serializers.ValidationError(f"El usuario ya está asignado a otro tutor.")
 
         else:
-            #validamos si se esta cambian el nombre, que este nuevo nombre no exista ya en la db
-            if name and Tutor.objects.filter(name__iexact=name).exclude(id=instance.id).exists():
-                raise serializers.ValidationError({"Error": "tutor '{name}' ya existente"})
-
             #validar nuevo usuario
             if 'user' in data and instance.user != user:
                 groupname = user.groups.first().name if user.groups.exists() else None
@@ -102,8 +97,7 @@ class TutorSerializer(serializers.ModelSerializer):
                 if not groupname:
                     raise serializers.ValidationError(f"El usuario no pertenece a ningún grupo.")
                 
-                TUTOR_NAMES_SET = {name.lower() for name in TutorNames()}
-                if groupname.lower() not in TUTOR_NAMES_SET:
+                if groupname.casefold() not in ROLE_NAMES[TUTOR]:
                     raise serializers.ValidationError(f"El grupo no es correcto para este usuario. Se encontró: {groupname}")
 
             if Tutor.objects.filter(user=user).exclude(id=instance.id).exists():
@@ -122,8 +116,19 @@ class TutorSerializer(serializers.ModelSerializer):
             return tutor
         
         except IntegrityError as e:
+            if violates(e, 'tutor_name_lower_uniq'):
+                raise serializers.ValidationError({"Error": f"tutor '{validate_data['name']}' ya existente"})
             raise serializers.ValidationError({'error': 'Error de integridad: ' + str(e)})
         except ValueError: 
             raise serializers.ValidationError({'error': 'Error de valor: ' + str(e)})
         except Exception as e:
             raise serializers.ValidationError({'error': 'Error inesperado: ' + str(e)})
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError as e:
+            if violates(e, 'tutor_name_lower_uniq'):
+                raise serializers.ValidationError({"Error": f"tutor '{validated_data.get('name', instance.name)}' ya existente"})
+            raise serializers.ValidationError({'error': 'Error de integridad: ' + str(e)})
@@ -1,3 +1,80 @@
-from django.test import TestCase
+from django.test import TestCase, AsyncClient
+from django.contrib.auth.models import User, Group
+from rest_framework.test import APIClient
+from apps.administrator import namesGroup
+from apps.administrator.seed import seed_school
+from apps.authentication.roles import issue_tokens
+from apps.note.models import Note
 
-# Create your tests here.
+
+class DashboardTestCase(TestCase):
+    def setUp(self):
+        self.school = seed_school(students=8, courses=3, teachers=2, students_per_tutor=4)
+        self.tutor = self.school.tutors[0]
+        self.tutor.user.groups.add(Group.objects.get_or_create(name='Tutores')[0])
+        self.client = APIClient()
+        self.client.force_authenticate(self.tutor.user)
+
+    def test_solo_sus_alumnos_normalizado(self):
+        response = self.client.get('/tutor/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+
+        children = set(self.tutor.student_set.values_list('id', flat=True))
+        self.assertEqual({student['id'] for student in data['students']}, children)
+        self.assertEqual({note['student'] for note in data['notes']}, children)
+        self.assertEqual(len(data['notes']), Note.objects.filter(student__tutor=self.tutor).count())
+
+        # cada entidad una sola vez y todas las referencias resuelven
+        for key in ('registrations', 'assignments', 'courses', 'teachers', 'notes'):
+            ids = [row['id'] for row in data[key]]
+            self.assertEqual(len(ids), len(set(ids)), key)
+        assignments = {row['id'] for row in data['assignments']}
+        courses = {row['id'] for row in data['courses']}
+        teachers = {row['id'] for row in data['teachers']}
+        for registration in data['registrations']:
+            self.assertTrue(set(registration['assignments']) <= assignments)
+        for row in data['assignments'] + data['notes']:
+            self.assertIn(row['course'], courses)
+            self.assertIn(row['teacher'], teachers)
+
+    def test_consultas_acotadas(self):
+        # 9 del resumen, 4 tablas de referencia (dentro de la transacción del test
+        # no se usa la caché) y los grupos del usuario para el permiso
+        with self.assertNumQueries(14):
+            self.client.get('/tutor/dashboard/')
+
+        # más alumnos a cargo no agregan consultas
+        seed_school(students=12, courses=3, teachers=2, students_per_tutor=12, prefix='otro')
+        tutor = User.objects.get(username='otro-tutor-0')
+        tutor.groups.add(Group.objects.get(name='Tutores'))
+        self.client.force_authenticate(tutor)
+        with self.assertNumQueries(14):
+            response = self.client.get('/tutor/dashboard/')
+        self.assertEqual(len(response.data['students']), 12)
+
+    def test_usuario_sin_tutor(self):
+        user = User.objects.create(username='sin-tutor')
+        user.groups.add(Group.objects.get(name='Tutores'))
+        self.client.force_authenticate(user)
+
+        response = self.client.get('/tutor/dashboard/')
+        self.assertEqual(response.status_code, 404)
+
+
+class AsyncReadTestCase(TestCase):
+    def setUp(self):
+        self.school = seed_school(students=8, courses=3, teachers=2, students_per_tutor=4)
+        self.tutor = self.school.tutors[0]
+        self.token = f'Bearer {issue_tokens(self.tutor.user, namesGroup.TUTOR).access_token}'
+        self.client = AsyncClient()
+
+    async def test_solo_sus_alumnos(self):
+        response = await self.client.get('/tutor/async/students/', headers={'Authorization': self.token})
+        self.assertEqual(response.status_code, 200)
+        children = [pk async for pk in self.tutor.student_set.order_by('-update_date', '-id').values_list('id', flat=True)]
+        self.assertEqual([student['id'] for student in response.json()['results']], children)
+
+        response = await self.client.get('/tutor/async/notes/', headers={'Authorization': self.token})
+        self.assertEqual(len(response.json()['results']),
+                         await Note.objects.filter(student__tutor=self.tutor).acount())
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import StudentListApiView, ShowCoursesApiView, ShowNotesApiView, ShowTeachersApiView
+from . import async_views
+from .views import StudentListApiView, ShowCoursesApiView, ShowNotesApiView, ShowTeachersApiView, GradebookApiView, DashboardApiView
 
 router = DefaultRouter()
 
@@ -8,5 +9,11 @@ urlpatterns = [
     path('student/', StudentListApiView.as_view(), name="tutor-student"),
     path('courses/', ShowCoursesApiView.as_view(), name='courses-students'),
     path('notes/', ShowNotesApiView.as_view(), name='notes-students'),
-    path('teacher/', ShowTeachersApiView.as_view(), name='teacher-students')
+    path('teacher/', ShowTeachersApiView.as_view(), name='teacher-students'),
+    path('gradebook/<str:dimension>/', GradebookApiView.as_view(), name='tutor-gradebook'),
+    path('dashboard/', DashboardApiView.as_view(), name='tutor-dashboard'),
+    # lectura async (ASGI)
+    path('async/students/', async_views.StudentsView.as_view(), name='async-tutor-students'),
+    path('async/courses/', async_views.CoursesView.as_view(), name='async-tutor-courses'),
+    path('async/notes/', async_views.NotesView.as_view(), name='async-tutor-notes')
 ]
\ No newline at end of file
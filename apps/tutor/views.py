@@ -1,70 +1,81 @@
-from rest_framework.generics import ListAPIView
+from rest_framework.generics import ListAPIView, GenericAPIView
+from rest_framework.response import Response
+from rest_framework import status
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from school_api.conditional import ConditionalGetMixin
+from school_api.fastpath import FastListMixin
+from school_api.pgjson import DocumentListMixin
 from apps.administrator import namesGroup
 from apps.authentication.permissions import IsInGroup
 from .models import Tutor
 from apps.student.models import Student
-from apps.student.serializers import StudentShortSerializer
-from apps.registration.serializers import CourseRegistrationSerializer, CourseRegistration
+from apps.student.serializers import StudentShortSerializer, STUDENT_SHORT_ROWS
+from apps.registration.serializers import CourseRegistrationSerializer, CourseRegistration, registration_document
 from apps.course.models import TeacherCourseAssignment
-from apps.note.serializers import NoteSerializers, Note
+from apps.note.serializers import NoteSerializers, Note, NOTE_ROWS
+from apps.note.models import NoteAggregate
+from apps.note.aggregates import gradebook, GradebookError
 from apps.teacher.serializers import TeacherForTutorSerializer, Teacher
+from .dashboard import dashboard_for_user
 
-class StudentListApiView(ListAPIView): 
+class StudentListApiView(ConditionalGetMixin, FastListMixin, ListAPIView): 
     """Para tutor: 
     permission READ para ver alumnos a su cargo
     """
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsInGroup]
-    allowed_groups = namesGroup.TutorNames()
+    allowed_roles = [namesGroup.TUTOR]
     serializer_class = StudentShortSerializer
+    fast_list = STUDENT_SHORT_ROWS
 
     def get_queryset(self):
         user = self.request.user
         try:
             tutor = Tutor.objects.get(user=user)
-        except Tutor.DoesNotExist: return Tutor.objects.none()
+        except Tutor.DoesNotExist: return Student.objects.none()
 
         students = Student.objects.filter(tutor=tutor)
         return students
         
-class ShowCoursesApiView(ListAPIView):
+class ShowCoursesApiView(ConditionalGetMixin, DocumentListMixin, ListAPIView):
     """
     ver cursos de sus alumnos a cargo
     """
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsInGroup]
-    allowed_groups = namesGroup.TutorNames()
+    allowed_roles = [namesGroup.TUTOR]
     serializer_class = CourseRegistrationSerializer
+    document = staticmethod(registration_document)
 
     def get_queryset(self):
         user=self.request.user
         try:
             tutor = Tutor.objects.get(user=user)
-        except: CourseRegistration.objects.none()
+        except Tutor.DoesNotExist: return CourseRegistration.objects.none()
 
         students = Student.objects.filter(tutor=tutor)
-        return CourseRegistration.objects.filter(student__in=students)
+        return CourseRegistrationSerializer.setup_eager_loading(CourseRegistration.objects.filter(student__in=students))
 
-class ShowNotesApiView(ListAPIView):
+class ShowNotesApiView(ConditionalGetMixin, FastListMixin, ListAPIView):
     permission_classes = [IsInGroup]
     authentication_classes =[JWTAuthentication]
-    allowed_groups = namesGroup.TutorNames()
+    allowed_roles = [namesGroup.TUTOR]
     serializer_class = NoteSerializers
+    fast_list = NOTE_ROWS
 
     def get_queryset(self):
         user=self.request.user
         try:
             tutor = Tutor.objects.get(user=user)
-        except Note.DoesNotExist: return Note.objects.none()
+        except Tutor.DoesNotExist: return Note.objects.none()
 
         students = Student.objects.filter(tutor=tutor)
-        return Note.objects.filter(student__in=students)
+        return NoteSerializers.setup_eager_loading(Note.objects.filter(student__in=students))
 
-class ShowTeachersApiView(ListAPIView):
+class ShowTeachersApiView(ConditionalGetMixin, ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsInGroup]
-    allowed_groups = namesGroup.TutorNames()
+    allowed_roles = [namesGroup.TUTOR]
     serializer_class = TeacherForTutorSerializer
 
     def get_queryset(self):
@@ -78,3 +89,35 @@ class ShowTeachersApiView(ListAPIView):
         registrations = CourseRegistration.objects.filter(student__in=students)
        
         return Teacher.objects.filter(teachercourseassignment__in=TeacherCourseAssignment.objects.filter(course__in=registrations.values_list('grade', flat=True))).distinct()
+
+class GradebookApiView(GenericAPIView):
+    """
+    promedios y aprobación de sus alumnos a cargo por dimensión
+    (students, courses o sections)
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsInGroup]
+    allowed_roles = [namesGroup.TUTOR]
+
+    def get(self, request, dimension):
+        queryset = NoteAggregate.objects.filter(student__tutor__user=request.user)
+        try:
+            rows = gradebook(dimension, request.query_params, queryset=queryset)
+        except GradebookError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(rows, status=status.HTTP_200_OK)
+
+
+class DashboardApiView(GenericAPIView):
+    """
+    alumnos a cargo con sus matrículas, cursos, profesores y notas en una sola respuesta
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsInGroup]
+    allowed_roles = [namesGroup.TUTOR]
+
+    def get(self, request):
+        data = dashboard_for_user(request.user)
+        if data is None:
+            return Response({'error': 'El usuario no está asignado a ningún tutor.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(data, status=status.HTTP_200_OK)
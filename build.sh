@@ -5,6 +5,9 @@ set -o errexit
 # Instalar dependencias
 pip install -r requirements.txt
 
+# Esquema OpenAPI estático (school_api/openapi.py)
+python manage.py build_openapi
+
 # Recolectar archivos estáticos
 python manage.py collectstatic --no-input
 
@@ -0,0 +1,74 @@
+"""Vistas de lectura async (ASGI) para los portales de alumno, profesor y tutor.
+
+DRF solo ejecuta vistas síncronas, así que bajo uvicorn cada request ocupa un
+hilo mientras espera a la base. Estas vistas son vistas async de Django: el
+perfil se busca con el ORM async y mientras una consulta espera, el mismo
+worker atiende otras requests.
+
+La autenticación y el permiso son los de las vistas de DRF (`authorize`:
+JWTAuthentication + IsInGroup) y los listados se paginan con la paginación
+por cursor por defecto, igual que los endpoints síncronos. Ambos corren con
+sync_to_async, que es lo mismo que hace el ORM async de Django por dentro.
+"""
+from datetime import datetime
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+from apps.authentication.permissions import authorize
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _error(exc):
+    # como el exception handler de DRF
+    detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return JsonResponse(detail, status=exc.status_code, safe=False)
+
+
+class AsyncReadView(View):
+    """GET async autenticado por JWT, restringido a `allowed_roles` y paginado.
+
+    Las subclases definen `profile` (modelo con campo user: Student, Teacher o
+    Tutor), `fields` ({nombre en la respuesta: lookup}, por ejemplo
+    course='course__name') y `queryset(self, profile)`.
+    """
+    http_method_names = ['get', 'options']
+    allowed_roles = []
+    profile = None
+    fields = {}
+    pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+    # mensaje si el usuario no tiene perfil del tipo pedido
+    not_found = 'Perfil no encontrado.'
+
+    def queryset(self, profile):
+        raise NotImplementedError
+
+    def page(self, request, queryset):
+        """Página de filas {nombre: valor} con los enlaces del cursor (una consulta)."""
+        paginator = self.pagination_class()
+        # la paginación por cursor lee sus columnas de cada fila
+        ordering = [name.lstrip('-') for name in paginator.get_ordering(request, queryset, self)]
+        columns = dict.fromkeys([*self.fields.values(), *ordering])
+        rows = paginator.paginate_queryset(queryset.values(*columns), request, self)
+        return {
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'results': [{
+                name: row[lookup].strftime(DATE_FORMAT) if isinstance(row[lookup], datetime) else row[lookup]
+                for name, lookup in self.fields.items()
+            } for row in rows],
+        }
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            request = await sync_to_async(authorize)(request, self)
+        except exceptions.APIException as exc:
+            return _error(exc)
+
+        try:
+            profile = await self.profile.objects.aget(user=request.user)
+        except self.profile.DoesNotExist:
+            return JsonResponse({'error': self.not_found}, status=404)
+        return JsonResponse(await sync_to_async(self.page)(request, self.queryset(profile)))
@@ -0,0 +1,178 @@
+import hashlib
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Prefetch
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.db.models.sql import Query
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from .db_router import shared_cache
+from .pagination import KEYSET_FIELDS
+
+
+def update_field(model):
+    names = {field.name for field in model._meta.concrete_fields}
+    for name in KEYSET_FIELDS:
+        if name in names:
+            return name
+    return None
+
+
+def _version_key(table):
+    return f'conditional:{table}:version'
+
+
+def table_versions(tables):
+    """Marca de cambios de cada tabla: cambia con cada guardado o borrado confirmado.
+    Sin caché compartida vence a los CONDITIONAL_LOCAL_TIMEOUT segundos, así los
+    workers que no vieron el cambio lo notan en ese plazo."""
+    keys = {_version_key(table): table for table in tables}
+    current = cache.get_many(keys)
+    missing = keys.keys() - current.keys()
+    if missing:
+        timeout = None if shared_cache() else getattr(settings, 'CONDITIONAL_LOCAL_TIMEOUT', 60)
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, timeout)
+        current.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in current.items()}
+
+
+def _expressions(node):
+    if isinstance(node, Query):
+        yield node
+        yield from _expressions(node.where)
+        for annotation in node.annotations.values():
+            yield from _expressions(annotation)
+        return
+    children = node.children if hasattr(node, 'children') else node.get_source_expressions()
+    for child in children:
+        if hasattr(child, 'get_source_expressions') or isinstance(child, Query):
+            yield from _expressions(child)
+
+
+def _relation(model, name):
+    # los prefetch usan el nombre de acceso (student_set) de las relaciones inversas
+    for field in model._meta.get_fields():
+        accessor = field.get_accessor_name() if field.auto_created and field.is_relation else field.name
+        if field.is_relation and name in (field.name, accessor):
+            return field
+    return None
+
+
+def _prefetched(model, lookups):
+    for lookup in lookups:
+        if isinstance(lookup, Prefetch):
+            if lookup.queryset is not None:
+                yield from queryset_tables(lookup.queryset)
+            lookup = lookup.prefetch_through
+        current = model
+        for name in lookup.split('__'):
+            field = _relation(current, name)
+            if field is None or field.related_model is None:
+                break
+            if field.many_to_many:
+                # ManyToManyRel (inverso) tiene through; el campo lo tiene en remote_field
+                yield (getattr(field, 'through', None) or field.remote_field.through)._meta.db_table
+            current = field.related_model
+            yield current._meta.db_table
+
+
+def queryset_tables(queryset):
+    """Tablas que lee el queryset: joins de filtros y select_related,
+    subconsultas (Exists, Subquery, __in) y prefetch_related."""
+    query = queryset.query.clone()
+    # preparar el SELECT agrega los joins de select_related
+    query.get_compiler(queryset.db).setup_query()
+    # como get_from_clause: los alias sin referencias no entran en el SQL
+    tables = {
+        join.table_name for inner in _expressions(query)
+        for alias, join in inner.alias_map.items() if inner.alias_refcount[alias]
+    }
+    tables.add(queryset.model._meta.db_table)
+    tables.update(_prefetched(queryset.model, queryset._prefetch_related_lookups))
+    return tables
+
+
+def _bump(table):
+    key = _version_key(table)
+    # al confirmar: antes, otra request podría guardar un ETag nuevo con los datos viejos
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def _changed(sender, **kwargs):
+    _bump(sender._meta.db_table)
+
+
+def _m2m_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        _bump(sender._meta.db_table)
+
+
+def connect():
+    post_save.connect(_changed, dispatch_uid='conditional-save')
+    post_delete.connect(_changed, dispatch_uid='conditional-delete')
+    m2m_changed.connect(_m2m_changed, dispatch_uid='conditional-m2m')
+
+
+class ConditionalGetMixin:
+    """GET condicional (ETag / Last-Modified) para listados y detalle.
+
+    El validador sale de max(fecha de modificación) del queryset ya filtrado
+    (sobre el índice, sin COUNT) y de las marcas de cambios de todas las tablas
+    que lee el queryset, que cubren los borrados y los cambios en tablas
+    relacionadas, más el usuario, su rol y la consulta pedida. Si el cliente ya
+    tiene esa versión se responde 304 sin serializar. Las escrituras sin
+    señales (update, bulk_create) y las tablas que solo lee el serializer no
+    cambian las marcas.
+
+    Last-Modified solo se envía en el detalle de una fila que no depende de
+    otras tablas: en los listados la fecha máxima no ve los borrados.
+    """
+
+    def conditional_scope(self, request):
+        role = request.auth.get('role') if hasattr(request.auth, 'get') else None
+        query = '&'.join(f'{key}={value}' for key, value in sorted(request.query_params.lists()))
+        return f'{request.path}|{getattr(request.user, "pk", None)}|{role}|{query}'
+
+    def conditional_validators(self, request, queryset):
+        """(etag, last_modified) del queryset, o (None, None) si el modelo no tiene fecha de modificación."""
+        field = update_field(queryset.model)
+        if field is None:
+            return None, None
+        last = queryset.order_by().aggregate(last=Max(field))['last']
+        versions = table_versions(queryset_tables(queryset))
+        token = '|'.join([self.conditional_scope(request), last.isoformat() if last else '',
+                          *(f'{table}={versions[table]}' for table in sorted(versions))])
+        etag = '"%s"' % hashlib.sha1(token.encode()).hexdigest()
+        alone = versions.keys() == {queryset.model._meta.db_table}
+        return etag, int(last.timestamp()) if last and alone else None
+
+    def conditional(self, request, queryset, respond, detail=False):
+        etag, last_modified = self.conditional_validators(request, queryset)
+        if etag is None:
+            return respond()
+        if not detail:
+            last_modified = None
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        response = not_modified if not_modified is not None else respond()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional(request, queryset, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        return self.conditional(request, queryset, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+                                detail=True)
@@ -0,0 +1,180 @@
+"""Lecturas en réplicas y escrituras en la base principal.
+
+Con DATABASE_REPLICA_URLS (urls separadas por coma) settings agrega los alias
+replica1, replica2, ... a DATABASES. ReplicaMiddleware decide por request:
+
+- GET/HEAD/OPTIONS leen de una réplica (elegida al azar entre las disponibles
+  y la misma durante toda la request).
+- Cualquier escritura manda el resto de la request a la principal y además
+  fija al usuario en la principal por REPLICA_PIN_SECONDS, para que lea lo que
+  acaba de escribir aunque la réplica vaya atrasada. El usuario sale del JWT
+  (o de la sesión) y la marca vive en la caché, que debe ser compartida entre
+  workers (REDIS_URL): con réplicas y la caché local del proceso el middleware
+  no arranca.
+- Las requests no seguras, las transacciones abiertas y todo lo que corre
+  fuera de una request (comandos, workers) usan la principal.
+
+Una réplica que no acepta conexión se marca caída por REPLICA_RETRY_SECONDS y
+se usa otra o la principal.
+"""
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache, caches, DEFAULT_CACHE_ALIAS
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+@dataclass
+class RequestState:
+    use_replicas: bool
+    wrote: bool = False
+    # réplica elegida para la request
+    alias: str = None
+
+
+_state = ContextVar('replica_state', default=None)
+# alias -> instante (monotónico) hasta el que se considera caída
+_down = {}
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def shared_cache():
+    """True si la caché por defecto la ven todos los procesos (no es local ni dummy)."""
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+class ReplicaRouter:
+    def available(self, alias):
+        until = _down.get(alias)
+        if until and until > time.monotonic():
+            return False
+        try:
+            connections[alias].ensure_connection()
+        except Exception:
+            _down[alias] = time.monotonic() + getattr(settings, 'REPLICA_RETRY_SECONDS', 30)
+            return False
+        _down.pop(alias, None)
+        return True
+
+    def replica_for(self, state):
+        if state.alias is None:
+            candidates = replicas()
+            random.shuffle(candidates)
+            state.alias = next((alias for alias in candidates if self.available(alias)), DEFAULT_DB_ALIAS)
+        return state.alias
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replicas or state.wrote:
+            return DEFAULT_DB_ALIAS
+        # dentro de una transacción se lee lo que la misma transacción escribió
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return self.replica_for(state)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # las réplicas tienen los mismos datos que la principal
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def token_user_id(request):
+    parts = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if len(parts) == 2 and parts[0] in api_settings.AUTH_HEADER_TYPES:
+        try:
+            return AccessToken(parts[1]).get(api_settings.USER_ID_CLAIM)
+        except TokenError:
+            pass
+    return None
+
+
+def _pin_key(user_id, user):
+    if user_id is None and user is not None and user.is_authenticated:
+        user_id = user.pk
+    return f'replica-pin:{user_id}' if user_id is not None else None
+
+
+def pin_key(request):
+    """Clave de la marca de lectura en la principal para el usuario de la request, o None."""
+    user_id = token_user_id(request)
+    return _pin_key(user_id, getattr(request, 'user', None) if user_id is None else None)
+
+
+async def apin_key(request):
+    user_id = token_user_id(request)
+    user = None
+    if user_id is None and hasattr(request, 'auser'):
+        user = await request.auser()
+    return _pin_key(user_id, user)
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if replicas() and not shared_cache():
+            raise ImproperlyConfigured(
+                'DATABASE_REPLICA_URLS requiere una caché compartida (REDIS_URL) para fijar '
+                'en la principal a quien acaba de escribir desde cualquier worker.'
+            )
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replicas():
+            return self.get_response(request)
+
+        key = pin_key(request)
+        safe = request.method in SAFE_METHODS
+        state = RequestState(use_replicas=safe and not (key and cache.get(key)))
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        if key and (state.wrote or not safe):
+            cache.set(key, True, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+        return response
+
+    async def __acall__(self, request):
+        if not replicas():
+            return await self.get_response(request)
+
+        key = await apin_key(request)
+        safe = request.method in SAFE_METHODS
+        state = RequestState(use_replicas=safe and not (key and await cache.aget(key)))
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        if key and (state.wrote or not safe):
+            await cache.aset(key, True, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+        return response
@@ -0,0 +1,125 @@
+"""Listados de solo lectura sin ModelSerializer.
+
+Un FastList describe las columnas de la respuesta de un serializer: nombre,
+lookup para values_list (puede cruzar relaciones: 'course__name') y un
+formateador opcional. Las filas salen de una sola consulta como tuplas
+(values_list con named=True, así la paginación por cursor lee la posición
+de la última fila) y cada tupla se convierte en el dict de la respuesta con
+índices y formateadores resueltos una vez, sin instanciar modelos ni campos
+por fila.
+
+Cada FastList vive junto al serializer que reproduce; las pruebas comparan
+ambas salidas. FastListMixin reemplaza `list` en vistas ListAPIView y aplica
+`?fields=` y `?expand=` (school_api/sparse.py) a las columnas: solo se leen
+las pedidas y las relaciones sin expandir salen con su lookup `collapsed`.
+"""
+import operator
+from rest_framework.response import Response
+from rest_framework import serializers
+from rest_framework.serializers import ModelSerializer
+from .metrics import serializing
+from .pagination import ordering_fields
+from .sparse import requested
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+# to_representation escribe datetime.strftime(DATE_FORMAT)
+strftime = operator.methodcaller('strftime', DATE_FORMAT)
+# campos cuyo to_representation devuelve el mismo valor que trae la base
+PASSTHROUGH = {serializers.IntegerField, serializers.BooleanField, serializers.CharField, serializers.EmailField}
+
+
+def as_set(value):
+    """Los serializers devuelven {valor}, que el JSONRenderer escribe como lista."""
+    return None if value is None else [value]
+
+
+def field_format(model, name):
+    """to_representation del campo que ModelSerializer genera para model.name
+    (fechas ISO, decimales como texto); None si el valor se copia tal cual."""
+    field_class, kwargs = ModelSerializer().build_standard_field(name, model._meta.get_field(name))
+    if field_class in PASSTHROUGH:
+        return None
+    kwargs.pop('validators', None)
+    return field_class(**kwargs).to_representation
+
+
+class Column:
+    __slots__ = ('name', 'lookup', 'format', 'collapsed')
+
+    def __init__(self, name, lookup=None, format=None, collapsed=None):
+        self.name = name
+        self.lookup = lookup or name
+        self.format = format
+        # lookup sin formato si la relación no se expande (?expand= sin el campo)
+        self.collapsed = collapsed
+
+    def resolve(self, expand):
+        """(lookup, formato) según ?expand=."""
+        if self.collapsed and expand is not None and self.name not in expand:
+            return self.collapsed, None
+        return self.lookup, self.format
+
+
+class Computed(Column):
+    """Columna sin lookup: queda en None y la completa `FastList.complete`."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.lookup = None
+
+
+class FastList:
+    def __init__(self, *columns, hidden=()):
+        self.columns = columns
+        # lookups que se leen pero no salen en la respuesta
+        self.hidden = tuple(hidden)
+
+    def selected(self, fields=None):
+        return [column for column in self.columns if fields is None or column.name in fields]
+
+    def lookups(self, extra=(), fields=None, expand=None):
+        names = [column.resolve(expand)[0] for column in self.selected(fields) if column.lookup]
+        return tuple(dict.fromkeys(names + list(self.hidden) + list(extra)))
+
+    def values(self, queryset, extra=(), fields=None, expand=None):
+        """values_list con las columnas pedidas y los campos extra (por ejemplo los del orden de paginación)."""
+        return queryset.values_list(*self.lookups(extra, fields, expand), named=True)
+
+    def complete(self, rows, data):
+        """Llena las columnas Computed de toda la página; `rows` son las tuplas
+        y `data` los dicts de la respuesta (solo con los campos pedidos), en el
+        mismo orden."""
+
+    def build(self, rows, fields=None, expand=None):
+        rows = list(rows)
+        if not rows:
+            return []
+        with serializing():
+            index = {lookup: position for position, lookup in enumerate(rows[0]._fields)}
+            plan = []
+            for column in self.selected(fields):
+                lookup, format = column.resolve(expand)
+                plan.append((column.name, index.get(lookup) if column.lookup else None, format))
+            data = [
+                {name: None if position is None else row[position] if format is None else format(row[position])
+                 for name, position, format in plan}
+                for row in rows
+            ]
+            self.complete(rows, data)
+        return data
+
+
+class FastListMixin:
+    """`fast_list` arma la respuesta del listado sin pasar por serializer_class
+    (que se mantiene para OpenAPI y para el resto de los métodos)."""
+    fast_list = None
+
+    def list(self, request, *args, **kwargs):
+        fields, expand = requested(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = self.fast_list.values(queryset, ordering_fields(self, request, queryset), fields, expand)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.fast_list.build(page, fields, expand))
+        return Response(self.fast_list.build(rows, fields, expand))
@@ -0,0 +1,330 @@
+"""Métricas por request: tiempos, consultas y bytes, con histogramas por ruta.
+
+MetricsMiddleware mide cada request y agrega la cabecera Server-Timing:
+
+- db: tiempo dentro de las consultas (todas las conexiones) y su cantidad.
+- serialize: `serializer.data` de DRF (la llamada más externa) o el armado
+  de filas de los listados rápidos (fastpath), sin las consultas perezosas
+  que dispara, que ya cuentan en db.
+- app: el resto del tiempo de la vista.
+- render: el render de la respuesta (JSONRenderer de DRF o plantilla).
+- total: la request completa desde este middleware.
+
+En las respuestas en streaming (exportaciones, documentos de pgjson) las
+consultas y los bytes se producen al recorrer el cuerpo, después de enviar
+las cabeceras: Server-Timing solo cubre hasta la primera respuesta, pero los
+histogramas se registran al terminar el cuerpo e incluyen esas consultas,
+los bytes enviados y el total hasta el último fragmento.
+
+El middleware funciona en WSGI y en ASGI sin cambiar de hilo.
+
+Los valores se acumulan en histogramas por ruta y método dentro del proceso
+(cada worker de gunicorn/uvicorn expone los suyos, como en un exportador de
+Prometheus por proceso). La ruta sale del nombre de la url resuelta: en los
+urlconfs de ad/, student/, teacher/ y tutor/ se antepone el prefijo
+(`student:shownote`, `ad:course-detail`); si la url no tiene nombre se usa el
+patrón, nunca la ruta con ids.
+
+`/metrics` devuelve los histogramas en formato de texto de Prometheus a
+usuarios staff o a direcciones de METRICS_ALLOWED_NETWORKS.
+"""
+import ipaddress
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework.permissions import BasePermission
+from rest_framework.serializers import BaseSerializer
+from rest_framework.views import APIView
+
+URLCONFS = ('ad', 'student', 'teacher', 'tutor')
+SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+BYTES = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+# nombre -> (ayuda, límites de los buckets)
+HISTOGRAMS = {
+    'school_request_duration_seconds': ('Duración total de la request.', SECONDS),
+    'school_request_db_seconds': ('Tiempo en consultas a la base.', SECONDS),
+    'school_request_serialize_seconds': ('Tiempo de serialización (serializer.data o filas del fastpath) sin consultas.', SECONDS),
+    'school_request_app_seconds': ('Tiempo de vista sin consultas, serialización ni render.', SECONDS),
+    'school_request_render_seconds': ('Tiempo de render de la respuesta.', SECONDS),
+    'school_request_queries': ('Consultas por request.', QUERIES),
+    'school_response_bytes': ('Tamaño del cuerpo de la respuesta.', BYTES),
+}
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * len(bounds)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.buckets[index] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (métrica, ruta, método) -> Histogram
+        self.histograms = {}
+        # (ruta, método, estado) -> requests
+        self.requests = {}
+
+    def observe(self, labels, status, values):
+        with self.lock:
+            for name, value in values.items():
+                if value is None:
+                    continue
+                key = (name,) + labels
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(HISTOGRAMS[name][1])
+                self.histograms[key].observe(value)
+            key = labels + (str(status),)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+            self.requests.clear()
+
+    def render(self):
+        """Texto de exposición de Prometheus (versión 0.0.4)."""
+        with self.lock:
+            lines = ['# HELP school_requests_total Requests por ruta, método y estado.',
+                     '# TYPE school_requests_total counter']
+            for (route, method, status), count in sorted(self.requests.items()):
+                lines.append(f'school_requests_total{_labels(route=route, method=method, status=status)} {count}')
+
+            for name, (help_text, _) in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (metric, route, method), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.bounds, histogram.buckets):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_labels(route=route, method=method, le=_number(bound))} '
+                                     f'{cumulative}')
+                    lines.append(f'{name}_bucket{_labels(route=route, method=method, le="+Inf")} {histogram.count}')
+                    lines.append(f'{name}_sum{_labels(route=route, method=method)} {_number(histogram.sum)}')
+                    lines.append(f'{name}_count{_labels(route=route, method=method)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def route_label(match):
+    """Etiqueta de ruta a partir del ResolverMatch (None si la url no existe)."""
+    if match is None:
+        return 'unmatched'
+    name = match.url_name or match.route
+    prefix = match.route.split('/', 1)[0]
+    return f'{prefix}:{name}' if prefix in URLCONFS else name
+
+
+@dataclass
+class RequestTimer:
+    db: float = 0
+    queries: int = 0
+    render_start: float = None
+    render: float = 0
+    serialize: float = 0
+    serializing: bool = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - start
+            self.queries += 1
+
+    def rendered(self, response):
+        self.render = time.perf_counter() - self.render_start
+
+
+_timer = ContextVar('metrics_timer', default=None)
+
+
+@contextmanager
+def serializing():
+    """Suma el bloque al tiempo de serialización de la request, sin sus
+    consultas; también lo usan los listados que no pasan por serializer.data."""
+    timer = _timer.get()
+    # solo el bloque más externo: los serializers anidados ya están dentro
+    if timer is None or timer.serializing:
+        yield
+        return
+    timer.serializing = True
+    start, db = time.perf_counter(), timer.db
+    try:
+        yield
+    finally:
+        timer.serializing = False
+        timer.serialize += max(time.perf_counter() - start - (timer.db - db), 0)
+
+
+def _timed(data):
+    """Propiedad `data` que suma su tiempo al RequestTimer de la request."""
+    def get(serializer):
+        with serializing():
+            return data.fget(serializer)
+    get.timed = True
+    return property(get)
+
+
+def install():
+    """Mide BaseSerializer.data (Serializer y ListSerializer lo llaman con super())."""
+    if not getattr(BaseSerializer.data.fget, 'timed', False):
+        BaseSerializer.data = _timed(BaseSerializer.data)
+
+
+@contextmanager
+def _wrapped(timer):
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(timer))
+        yield
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        install()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer, start, token = self.start(request)
+        try:
+            with _wrapped(timer):
+                response = self.get_response(request)
+        finally:
+            _timer.reset(token)
+        return self.finish(request, response, timer, start)
+
+    async def __acall__(self, request):
+        timer, start, token = self.start(request)
+        try:
+            with _wrapped(timer):
+                response = await self.get_response(request)
+        finally:
+            _timer.reset(token)
+        return self.finish(request, response, timer, start)
+
+    def start(self, request):
+        timer = request.metrics_timer = RequestTimer()
+        return timer, time.perf_counter(), _timer.set(timer)
+
+    def finish(self, request, response, timer, start):
+        total = time.perf_counter() - start
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={timer.db * 1000:.1f};desc="{timer.queries} consultas"',
+            f'serialize;dur={timer.serialize * 1000:.1f}',
+            f'app;dur={self.app(timer, total) * 1000:.1f}',
+            f'render;dur={timer.render * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+        if response.streaming:
+            # se registra al terminar el cuerpo
+            response.streaming_content = (self.astream if response.is_async else self.stream)(
+                response.streaming_content, request, response, timer, start)
+        else:
+            self.observe(request, response, timer, total, len(response.content))
+        return response
+
+    def stream(self, content, request, response, timer, start):
+        size = 0
+        try:
+            with _wrapped(timer):
+                for chunk in content:
+                    size += len(chunk)
+                    yield chunk
+        finally:
+            self.observe(request, response, timer, time.perf_counter() - start, size)
+
+    async def astream(self, content, request, response, timer, start):
+        size = 0
+        try:
+            with _wrapped(timer):
+                async for chunk in content:
+                    size += len(chunk)
+                    yield chunk
+        finally:
+            self.observe(request, response, timer, time.perf_counter() - start, size)
+
+    @staticmethod
+    def app(timer, total):
+        return max(total - timer.db - timer.render - timer.serialize, 0)
+
+    def observe(self, request, response, timer, total, size):
+        registry.observe(
+            (route_label(getattr(request, 'resolver_match', None)), request.method),
+            response.status_code,
+            {
+                'school_request_duration_seconds': total,
+                'school_request_db_seconds': timer.db,
+                'school_request_serialize_seconds': timer.serialize,
+                'school_request_app_seconds': self.app(timer, total),
+                'school_request_render_seconds': timer.render,
+                'school_request_queries': timer.queries,
+                'school_response_bytes': size,
+            },
+        )
+
+    def process_template_response(self, request, response):
+        # Django renderiza la respuesta después de este hook
+        timer = request.metrics_timer
+        timer.render_start = time.perf_counter()
+        response.add_post_render_callback(timer.rendered)
+        return response
+
+
+def internal_address(address):
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in ipaddress.ip_network(network) for network in getattr(settings, 'METRICS_ALLOWED_NETWORKS', []))
+
+
+class IsStaffOrInternal(BasePermission):
+    def has_permission(self, request, view):
+        if request.user.is_authenticated and request.user.is_staff:
+            return True
+        return internal_address(request.META.get('REMOTE_ADDR', ''))
+
+
+class MetricsApiView(APIView):
+    permission_classes = [IsStaffOrInternal]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
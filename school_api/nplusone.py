@@ -0,0 +1,164 @@
+"""Detector de consultas N+1 para desarrollo y pruebas.
+
+Cada consulta se reduce a su plantilla (el SQL con %s, sin parámetros y con
+las listas IN colapsadas). Si una plantilla se repite NPLUSONE_THRESHOLD
+veces o más en la misma request se informa junto con el lugar del código
+que la dispara: la primera línea del proyecto en la pila y, si viene de un
+serializer, la clase y el campo (`TutorStudentSerializer.get_student`,
+`StudentShortSerializer.email`).
+
+- NPlusOneMiddleware (activo con NPLUSONE_ENABLED; si no se define, en
+  DEBUG, que el runner de pruebas apaga) registra los hallazgos en el logger
+  school_api.nplusone y agrega la cabecera X-NPlusOne. Con NPLUSONE_RAISE
+  lanza NPlusOneError y la prueba que pide esa ruta falla:
+  `NPLUSONE_ENABLED=1 NPLUSONE_RAISE=1 python manage.py test` corre toda la
+  suite con el detector.
+- NPlusOneTestMixin agrega a un TestCase `assertNoNPlusOne()`, que falla la
+  prueba si el bloque tiene consultas repetidas.
+"""
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+# argumentos de un execute_wrapper (este detector, métricas, contadores de bench)
+_WRAPPER_ARGS = {'execute', 'sql', 'params', 'many', 'context'}
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def fingerprint(sql):
+    return _IN_LIST.sub('IN (...)', _SPACES.sub(' ', sql.strip()))
+
+
+def _own_code(code):
+    filename = code.co_filename
+    return (filename.startswith(str(settings.BASE_DIR)) and not _WRAPPER_ARGS <= set(code.co_varnames)
+            and 'site-packages' not in filename and f'{os.sep}.venv' not in filename)
+
+
+def call_site(frame):
+    """(línea del proyecto, serializer.campo) más cercanos a la consulta."""
+    site = serializer = None
+    while frame is not None and not (site and serializer):
+        code = frame.f_code
+        if site is None and _own_code(code):
+            site = f'{os.path.relpath(code.co_filename, settings.BASE_DIR)}:{frame.f_lineno} in {code.co_name}'
+        owner = frame.f_locals.get('self')
+        if serializer is None and isinstance(owner, BaseSerializer):
+            field = frame.f_locals.get('field')
+            if _own_code(code):
+                serializer = f'{type(owner).__name__}.{code.co_name}'
+            elif code.co_name == 'to_representation' and hasattr(field, 'field_name'):
+                # Serializer.to_representation de DRF recorre los campos con la variable `field`
+                serializer = f'{type(owner).__name__}.{field.field_name}'
+        frame = frame.f_back
+    return site, serializer
+
+
+@dataclass
+class Finding:
+    template: str
+    count: int
+    site: str
+    serializer: str
+
+    def __str__(self):
+        where = ' / '.join(filter(None, [self.serializer, self.site])) or 'origen desconocido'
+        return f'{self.count} consultas iguales desde {where}: {self.template}'
+
+
+class Detector:
+    """Cuenta plantillas de consulta en todas las conexiones mientras está activo."""
+
+    def __init__(self, threshold=None):
+        self.threshold = threshold or getattr(settings, 'NPLUSONE_THRESHOLD', 5)
+        self.counts = Counter()
+        # plantilla -> (línea, serializer) de la primera repetición
+        self.sites = {}
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        template = fingerprint(sql)
+        self.counts[template] += 1
+        if self.counts[template] == 2:
+            self.sites[template] = call_site(sys._getframe(1))
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def findings(self):
+        return [
+            Finding(template, count, *self.sites[template])
+            for template, count in self.counts.most_common()
+            if count >= self.threshold
+        ]
+
+
+def report(findings):
+    return '\n'.join(str(finding) for finding in findings)
+
+
+class NPlusOneMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        enabled = getattr(settings, 'NPLUSONE_ENABLED', None)
+        if not (settings.DEBUG if enabled is None else enabled):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with Detector() as detector:
+            response = self.get_response(request)
+        return self.finish(request, response, detector)
+
+    async def __acall__(self, request):
+        with Detector() as detector:
+            response = await self.get_response(request)
+        return self.finish(request, response, detector)
+
+    def finish(self, request, response, detector):
+        findings = detector.findings()
+        if findings:
+            message = f'N+1 en {request.method} {request.path}:\n{report(findings)}'
+            if getattr(settings, 'NPLUSONE_RAISE', False):
+                raise NPlusOneError(message)
+            logger.warning(message)
+            response['X-NPlusOne'] = str(len(findings))
+        return response
+
+
+class NPlusOneTestMixin:
+    @contextmanager
+    def assertNoNPlusOne(self, threshold=None):
+        with Detector(threshold) as detector:
+            yield detector
+        findings = detector.findings()
+        if findings:
+            self.fail(f'Consultas N+1:\n{report(findings)}')
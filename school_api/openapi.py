@@ -0,0 +1,38 @@
+"""Documentación OpenAPI (drf_yasg) generada una sola vez.
+
+`manage.py build_openapi` escribe el esquema en OPENAPI_SCHEMA_FILE antes de
+collectstatic (build.sh) y WhiteNoise lo sirve como archivo estático; si el
+archivo existe, Swagger UI y ReDoc lo cargan desde ahí (SPEC_URL) en lugar de
+pedir ?format=openapi, que recorre todos los serializers en cada visita.
+Sin el archivo se genera como antes.
+
+drf_yasg solo se importa con API_DOCS_ENABLED: los workers sin
+documentación no cargan el paquete.
+"""
+from django.urls import path
+
+TITLE = 'API SCHOOL'
+VERSION = 'v1'
+DESCRIPTION = 'Documentación de la API'
+
+
+def info():
+    from drf_yasg import openapi
+    return openapi.Info(title=TITLE, default_version=VERSION, description=DESCRIPTION)
+
+
+def generate():
+    """Esquema completo como JSON (bytes), igual al de ?format=openapi."""
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+    schema = OpenAPISchemaGenerator(info(), VERSION).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def docs_urlpatterns():
+    from drf_yasg.views import get_schema_view
+    schema_view = get_schema_view(info(), public=True)
+    return [
+        path('api/docs/', schema_view.with_ui('swagger', cache_timeout=0), name='swagger-ui'),
+        path('api/docs/redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    ]
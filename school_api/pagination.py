@@ -0,0 +1,39 @@
+from rest_framework.pagination import CursorPagination
+
+# columnas de última modificación, en orden de preferencia
+KEYSET_FIELDS = ('update_date', 'update_time')
+
+
+def keyset_ordering(model):
+    """Orden estable para paginar por cursor: (fecha de modificación, id)
+    cuando el modelo la tiene, si no solo por id."""
+    names = {field.name for field in model._meta.concrete_fields}
+    for name in KEYSET_FIELDS:
+        if name in names:
+            return ('-' + name, '-id')
+    return ('-id',)
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Paginación por cursor para todos los listados.
+
+    Cada página filtra sobre el índice (update_date, id) en lugar de usar
+    OFFSET, por lo que una página profunda cuesta lo mismo que la primera, y
+    no se ejecuta COUNT(*). Las vistas pueden fijar `pagination_ordering`.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'pagination_ordering', None)
+        if ordering is None:
+            ordering = keyset_ordering(queryset.model)
+        return tuple(ordering)
+
+
+def ordering_fields(view, request, queryset):
+    """Campos que la paginación por cursor lee de cada fila (sin el signo)."""
+    paginator = view.paginator
+    if paginator is None or not hasattr(paginator, 'get_ordering'):
+        return ()
+    return tuple(name.lstrip('-') for name in paginator.get_ordering(request, queryset, view))
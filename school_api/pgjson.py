@@ -0,0 +1,128 @@
+"""Documentos JSON armados por PostgreSQL para los listados más pesados.
+
+Con PG_JSON_RESPONSES y una base PostgreSQL, DocumentListMixin pide a la base
+una columna `doc` por fila con el objeto ya serializado (json_build_object,
+json_agg para las relaciones anidadas, to_char para las fechas) como texto, y
+la respuesta se escribe concatenando esos fragmentos sin crear modelos ni
+serializers. Con SQLite, sin la opción o con ?fields= / ?expand= se usa el
+listado normal.
+
+Cada expresión de documento vive junto al serializer que reproduce y devuelve
+el mismo JSON (las claves conservan el orden: se usa json y no jsonb). Si el
+documento lee una relación que no es una clave foránea de la fila, la une una
+vez por consulta con un FilteredRelation (`joins`) en lugar de una subconsulta
+por fila.
+"""
+import json
+from django.conf import settings
+from django.db import connections
+from django.db.models import Aggregate, CharField, F, Func, JSONField, TextField, Value
+from django.db.models.functions import Cast
+from django.http import StreamingHttpResponse
+from .pagination import ordering_fields
+
+DATE_FORMAT = 'YYYY-MM-DD HH24:MI:SS'
+# DateField de DRF
+DAY_FORMAT = 'YYYY-MM-DD'
+# DateTimeField de DRF (ISO 8601 en UTC)
+ISO_FORMAT = 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'
+TIME_FORMAT = 'HH24:MI'
+
+
+def enabled(queryset):
+    return getattr(settings, 'PG_JSON_RESPONSES', False) and connections[queryset.db].vendor == 'postgresql'
+
+
+def joins(relations):
+    """Decorador de documentos: `relations()` devuelve los {alias: FilteredRelation}
+    que la expresión usa; `annotate` los agrega al queryset."""
+    def decorate(document):
+        document.joins = relations
+        return document
+    return decorate
+
+
+def annotate(queryset, document):
+    """queryset con la columna `doc` como texto (el driver no decodifica el JSON
+    y DISTINCT puede compararlo)."""
+    relations = getattr(document, 'joins', dict)()
+    return queryset.alias(**relations).annotate(doc=Cast(document(), TextField()))
+
+
+def _expression(value):
+    return F(value) if isinstance(value, str) else value
+
+
+class JSONBuild(Func):
+    """json_build_object(clave, valor, ...) en el orden de los argumentos."""
+    function = 'JSON_BUILD_OBJECT'
+    output_field = JSONField()
+
+    def __init__(self, **fields):
+        expressions = []
+        for key, value in fields.items():
+            # como JSONObject de Django: las claves como text para que el driver no las deje sin tipo
+            expressions += [Cast(Value(key), TextField()), _expression(value)]
+        super().__init__(*expressions)
+
+
+def as_set(value):
+    """{valor} de los serializers: un arreglo de un elemento."""
+    return Func(_expression(value), function='JSON_BUILD_ARRAY', output_field=JSONField())
+
+
+def to_char(value, format):
+    return Func(_expression(value), Value(format), function='TO_CHAR', output_field=CharField())
+
+
+def iso(value):
+    """DateTimeField de DRF: isoformat() omite los microsegundos cuando son 0."""
+    return Func(to_char(value, ISO_FORMAT), Value('.000000Z'), Value('Z'), function='REPLACE', output_field=CharField())
+
+
+def as_text(value):
+    """Decimales como texto ('15.00'), igual que DecimalField de DRF."""
+    return Cast(_expression(value), CharField())
+
+
+class JSONAgg(Aggregate):
+    """json_agg(expresión ORDER BY orden)."""
+    function = 'JSON_AGG'
+    output_field = JSONField()
+
+    def __init__(self, expression, order_by, **extra):
+        super().__init__(_expression(expression), _expression(order_by), **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        expression, order_by = self.source_expressions
+        sql, params = compiler.compile(expression)
+        order_sql, order_params = compiler.compile(order_by)
+        return f'{self.function}({sql} ORDER BY {order_sql})', (*params, *order_params)
+
+
+def _stream(fragments, head=b'', tail=b''):
+    yield head + b'['
+    for index, fragment in enumerate(fragments):
+        yield (b',' if index else b'') + fragment.encode()
+    yield b']' + tail
+
+
+class DocumentListMixin:
+    """`document()` devuelve la expresión del objeto de cada fila; el listado
+    la usa cuando `enabled` y si no cae al `list` siguiente en el MRO."""
+    document = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not enabled(queryset) or 'fields' in request.query_params or 'expand' in request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        rows = annotate(queryset, type(self).document).values_list(
+            'doc', *ordering_fields(self, request, queryset), named=True)
+        page = self.paginate_queryset(rows)
+        if page is None:
+            body = _stream(row.doc for row in rows.iterator())
+        else:
+            links = {'next': self.paginator.get_next_link(), 'previous': self.paginator.get_previous_link()}
+            body = _stream((row.doc for row in page), head=json.dumps(links, separators=(',', ':'))[:-1].encode() + b',"results":', tail=b'}')
+        return StreamingHttpResponse(body, content_type='application/json')
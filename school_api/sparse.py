@@ -0,0 +1,97 @@
+"""Campos a pedido (`?fields=`) y expansión de relaciones (`?expand=`).
+
+- `?fields=id,name,user` deja en la respuesta solo esos campos.
+- `?expand=user,tutor` anida solo esas relaciones; las demás salen como id
+  (o se omiten si no son un campo del modelo). Sin `expand` se anidan todas,
+  como hasta ahora; `?expand=` vacío no anida ninguna.
+
+El serializer declara qué carga necesita cada campo: `expandable_fields` al
+anidarlo y `eager_fields` con solo estar en la respuesta. SparseQuerysetMixin
+aplica a la consulta de la vista únicamente los select_related /
+prefetch_related de los campos pedidos, así una respuesta recortada también
+recorta el SQL. Solo aplica a GET/HEAD/OPTIONS; las escrituras responden la
+forma completa.
+"""
+from dataclasses import dataclass
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer
+
+
+@dataclass(frozen=True)
+class Eager:
+    select: tuple = ()
+    # nombres o Prefetch
+    prefetch: tuple = ()
+
+
+def _names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def requested(request):
+    """(campos, expandidos) pedidos en la query; None significa sin restricción."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, None
+    params = request.query_params if hasattr(request, 'query_params') else request.GET
+    fields = _names(params['fields']) if 'fields' in params else None
+    expand = _names(params['expand']) if 'expand' in params else None
+    return fields, expand
+
+
+class SparseFieldsMixin:
+    # campo -> Eager necesario para anidarlo
+    expandable_fields = {}
+    # campo -> Eager necesario si el campo está en la respuesta, anidado o no
+    eager_fields = {}
+
+    def sparse(self):
+        if not hasattr(self, '_sparse'):
+            # solo el serializer de la vista (o el hijo de su ListSerializer), no los anidados
+            parent = self.parent
+            if parent is not None and not (isinstance(parent, ListSerializer) and parent.parent is None):
+                self._sparse = (None, None)
+            else:
+                self._sparse = requested(self.context.get('request'))
+        return self._sparse
+
+    def includes(self, name):
+        fields, _ = self.sparse()
+        return fields is None or name in fields
+
+    def expanded(self, name):
+        _, expand = self.sparse()
+        return self.includes(name) and (expand is None or name in expand)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested_fields, _ = self.sparse()
+        if requested_fields is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in requested_fields}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None, expand=None):
+        """Aplica al queryset la carga de los campos pedidos (todos por defecto)."""
+        select, prefetch = [], []
+        for name in set(cls.expandable_fields) | set(cls.eager_fields):
+            if fields is not None and name not in fields:
+                continue
+            if name in cls.expandable_fields and (expand is None or name in expand):
+                eager = cls.expandable_fields[name]
+            else:
+                eager = cls.eager_fields.get(name, Eager())
+            select += eager.select
+            prefetch += eager.prefetch
+        if select:
+            queryset = queryset.select_related(*sorted(set(select)))
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+class SparseQuerysetMixin:
+    """Vista cuyo serializer usa SparseFieldsMixin: carga solo lo que se pide."""
+
+    def get_queryset(self):
+        fields, expand = requested(self.request)
+        return self.get_serializer_class().setup_eager_loading(super().get_queryset(), fields, expand)